@@ -0,0 +1,78 @@
+"""Cost of building and serializing list_tickets results, old path versus new.
+
+"before" is what the tool did previously: ``Ticket(**dict(row))``, ``dataclasses.asdict``
+and ``json.dumps(default=str)``. "after" is ``Ticket.from_row``, ``to_dict`` and
+``serialization.dumps`` (orjson when installed).
+
+Usage: python benchmarks/bench_serialization.py [--rows 50 5000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import timeit
+from dataclasses import asdict, fields
+
+from it_agent import serialization
+from it_agent.db.models import Ticket
+
+
+def make_rows(n: int) -> list[sqlite3.Row]:
+    db = sqlite3.connect(":memory:")
+    db.row_factory = sqlite3.Row
+    columns = [f.name for f in fields(Ticket)]
+    db.execute(f"CREATE TABLE tickets ({', '.join(columns)})")
+    db.executemany(
+        f"INSERT INTO tickets VALUES ({', '.join('?' * len(columns))})",
+        [
+            (
+                i,
+                f"Laptop {i} will not boot",
+                "Black screen after the BIOS logo. " * 4,
+                "open",
+                "high",
+                "hardware",
+                "U012345",
+                "",
+                "2025-01-01T09:00:00+00:00",
+                "2025-01-01T09:00:00+00:00",
+                None,
+            )
+            for i in range(n)
+        ],
+    )
+    return db.execute(f"SELECT {', '.join(columns)} FROM tickets").fetchall()
+
+
+def before(rows) -> str:
+    tickets = [Ticket(**dict(row)) for row in rows]
+    result = {"tickets": [asdict(t) for t in tickets], "count": len(tickets)}
+    return json.dumps(result, default=str)
+
+
+def after(rows) -> str:
+    tickets = [Ticket.from_row(row) for row in rows]
+    result = {"tickets": [t.to_dict() for t in tickets], "count": len(tickets)}
+    return serialization.dumps(result)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[50, 5000])
+    args = parser.parse_args()
+
+    backend = "orjson" if serialization.orjson is not None else "json"
+    print(f"serializer backend: {backend}")
+    for n in args.rows:
+        rows = make_rows(n)
+        assert json.loads(before(rows)) == json.loads(after(rows))
+        number = max(1, 20_000 // n)
+        for name, fn in (("before", before), ("after", after)):
+            seconds = min(timeit.repeat(lambda: fn(rows), number=number, repeat=5)) / number
+            print(f"  {n:>6} rows  {name:<6} {seconds * 1000:9.3f} ms  ({len(fn(rows)):,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Query plans and timings for the hot ticket queries before and after the v2 indexes.
+
+Usage: python benchmarks/bench_ticket_queries.py [--tickets 100000 1000000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import aiosqlite
+
+from it_agent.db.migrations import LATEST_VERSION, migrate
+
+STATUSES = ["open", "in_progress", "waiting", "resolved", "closed"]
+PRIORITIES = ["low", "medium", "high", "critical"]
+
+QUERIES = {
+    "list by status": (
+        "SELECT * FROM tickets WHERE status = ? ORDER BY created_at DESC LIMIT 10",
+        ("open",),
+    ),
+    "list by priority": (
+        "SELECT * FROM tickets WHERE priority = ? ORDER BY created_at DESC LIMIT 10",
+        ("critical",),
+    ),
+    "list by requester": (
+        "SELECT * FROM tickets WHERE requester_id = ? ORDER BY created_at DESC LIMIT 10",
+        ("U00042",),
+    ),
+    "list recent": ("SELECT * FROM tickets ORDER BY created_at DESC LIMIT 10", ()),
+    "comments for ticket": (
+        "SELECT * FROM ticket_comments WHERE ticket_id = ? ORDER BY created_at",
+        (12345,),
+    ),
+}
+
+
+async def populate(db: aiosqlite.Connection, n: int) -> None:
+    rng = random.Random(0)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    batch = 50_000
+    for offset in range(0, n, batch):
+        tickets = []
+        comments = []
+        for i in range(offset, min(n, offset + batch)):
+            created = (start + timedelta(seconds=i * 30)).isoformat()
+            tickets.append(
+                (
+                    f"Ticket {i}",
+                    "generated",
+                    rng.choice(STATUSES),
+                    rng.choice(PRIORITIES),
+                    "hardware",
+                    f"U{rng.randrange(5000):05d}",
+                    created,
+                    created,
+                )
+            )
+            comments.append((i + 1, "U00001", "comment", created))
+        await db.executemany(
+            """INSERT INTO tickets (title, description, status, priority, category,
+                                    requester_id, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            tickets,
+        )
+        await db.executemany(
+            """INSERT INTO ticket_comments (ticket_id, author_id, content, created_at)
+               VALUES (?, ?, ?, ?)""",
+            comments,
+        )
+        await db.commit()
+
+
+async def measure(db: aiosqlite.Connection, repeat: int) -> None:
+    for name, (sql, params) in QUERIES.items():
+        cursor = await db.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        plan = "; ".join(row[3] for row in await cursor.fetchall())
+        started = time.perf_counter()
+        for _ in range(repeat):
+            cursor = await db.execute(sql, params)
+            await cursor.fetchall()
+        elapsed_ms = (time.perf_counter() - started) / repeat * 1000
+        print(f"  {name:<22} {elapsed_ms:9.3f} ms   {plan}")
+
+
+async def run(n: int, repeat: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        async with aiosqlite.connect(Path(tmp) / "bench.db") as db:
+            await migrate(db, target=1)
+            await populate(db, n)
+            print(f"\n{n:,} tickets, schema v1 (no indexes)")
+            await measure(db, repeat)
+            started = time.perf_counter()
+            await migrate(db)
+            print(
+                f"\n{n:,} tickets, schema v{LATEST_VERSION} "
+                f"(migration took {time.perf_counter() - started:.1f}s)"
+            )
+            await measure(db, repeat)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickets", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    for n in args.tickets:
+        asyncio.run(run(n, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
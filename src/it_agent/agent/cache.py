@@ -0,0 +1,214 @@
+"""Result caching for read-only tools."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable
+from typing import Callable, TypeVar
+
+from it_agent.agent.tools import TOOLS
+
+_MISSING = object()
+T = TypeVar("T")
+
+# Defaults and types from the tool schemas, used to normalize cache keys
+_SCHEMA_PROPERTIES = {t["name"]: t["input_schema"]["properties"] for t in TOOLS}
+# Arguments whose case does not change the result
+_CASE_INSENSITIVE_ARGS = {"host", "hostname", "record_type"}
+
+
+class TTLCache:
+    """Bounded LRU mapping whose entries expire ``ttl`` seconds after being set."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, object]] = OrderedDict()
+
+    def get(self, key: str, default=_MISSING):
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class ToolResultCache:
+    """Per-tool TTL caches of JSON tool results, keyed on normalized arguments.
+
+    Each tool has a generation that every invalidation bumps. A caller reads it before
+    running the tool and passes it to ``set``, so a result computed while a write
+    landed is never stored.
+    """
+
+    def __init__(self, policies: dict[str, tuple[float, int]]) -> None:
+        """``policies`` maps a tool name to its ``(ttl_seconds, max_entries)``."""
+        self._caches = {name: TTLCache(size, ttl) for name, (ttl, size) in policies.items()}
+        self._generations = dict.fromkeys(policies, 0)
+        self._hits = dict.fromkeys(policies, 0)
+        self._misses = dict.fromkeys(policies, 0)
+
+    def cacheable(self, tool_name: str) -> bool:
+        return tool_name in self._caches
+
+    def get(self, tool_name: str, key: str) -> str | None:
+        value = self._caches[tool_name].get(key, None)
+        if value is None:
+            self._misses[tool_name] += 1
+        else:
+            self._hits[tool_name] += 1
+        return value
+
+    def generation(self, tool_name: str) -> int:
+        return self._generations[tool_name]
+
+    def set(self, tool_name: str, key: str, result: str, generation: int | None = None) -> bool:
+        """Store ``result`` unless ``tool_name`` was invalidated since ``generation``."""
+        if generation is not None and generation != self._generations[tool_name]:
+            return False
+        self._caches[tool_name].set(key, result)
+        return True
+
+    def invalidate(self, tool_name: str, tool_input: dict | None = None) -> None:
+        """Drop one cached call of ``tool_name``, or all of them if ``tool_input`` is None."""
+        cache = self._caches.get(tool_name)
+        if cache is None:
+            return
+        self._generations[tool_name] += 1
+        if tool_input is None:
+            cache.clear()
+        else:
+            cache.pop(cache_key(tool_name, tool_input))
+
+    def clear(self) -> None:
+        """Drop all entries and reset the statistics."""
+        for name, cache in self._caches.items():
+            cache.clear()
+            self._hits[name] = 0
+            self._misses[name] = 0
+
+    def stats(self) -> dict:
+        """Hit/miss counts and current size per tool, plus totals."""
+        tools = {
+            name: {
+                "hits": self._hits[name],
+                "misses": self._misses[name],
+                "size": len(cache),
+            }
+            for name, cache in self._caches.items()
+        }
+        hits = sum(self._hits.values())
+        misses = sum(self._misses.values())
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "tools": tools,
+        }
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Future) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key onto one in-flight task.
+
+    The first caller starts the task; callers arriving before it finishes await the
+    same task and receive the same result (or exception). The task is cancelled only
+    when every caller waiting on it has been cancelled.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[str, _Call] = {}
+        self._started = 0
+        self._coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._inflight.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._inflight[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self._started += 1
+        else:
+            self._coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Forget it first: a caller arriving before the task finishes cancelling
+                # must start a fresh call, not join this one and get CancelledError
+                self._forget(key, call)
+                call.task.cancel()
+
+    def _forget(self, key: str, call: _Call) -> None:
+        if self._inflight.get(key) is call:
+            del self._inflight[key]
+
+    def reset_stats(self) -> None:
+        self._started = 0
+        self._coalesced = 0
+
+    def stats(self) -> dict:
+        """Calls that started work, calls that joined an in-flight one, and current load."""
+        return {
+            "started": self._started,
+            "coalesced": self._coalesced,
+            "in_flight": len(self._inflight),
+        }
+
+
+def cache_key(tool_name: str, tool_input: dict) -> str:
+    """Build a cache key that is identical for equivalent calls.
+
+    Injected ``_``-prefixed arguments are ignored, schema defaults are filled in,
+    strings are stripped, case-insensitive arguments are lowercased and integer
+    arguments are coerced, so ``ping_host(host=" VPN.corp")`` and
+    ``ping_host(host="vpn.corp", count=4)`` share an entry.
+    """
+    properties = _SCHEMA_PROPERTIES.get(tool_name, {})
+    args = {name: spec["default"] for name, spec in properties.items() if "default" in spec}
+    for name, value in tool_input.items():
+        if name.startswith("_") or value is None:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+            if name in _CASE_INSENSITIVE_ARGS:
+                value = value.lower()
+        if properties.get(name, {}).get("type") == "integer":
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                pass
+        args[name] = value
+    return json.dumps(args, sort_keys=True, default=str)
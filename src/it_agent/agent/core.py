@@ -2,65 +2,147 @@
 
 from __future__ import annotations
 
+import functools
 import json
 import logging
+from collections.abc import Awaitable
+from dataclasses import dataclass, field
+from typing import Callable
 
 import anthropic
 
-from it_agent.agent.executor import execute_tool
+from it_agent.agent.executor import execute_tools
+from it_agent.agent.history import compact_tool_result, estimate_tokens
+from it_agent.agent.scheduler import PRIORITY_NORMAL, RequestScheduler
 from it_agent.agent.tools import TOOLS
 from it_agent.config import Settings
 
 logger = logging.getLogger(__name__)
 
+# Streaming callbacks: text deltas as they arrive, and tool calls about to be executed
+TextCallback = Callable[[str], Awaitable[None]]
+ToolCallback = Callable[[str, dict], Awaitable[None]]
+
 SYSTEM_PROMPT = """\
 You are an IT Support Agent. You help employees with technical issues, manage support tickets, \
 and search the company knowledge base for solutions.
 
 Your capabilities:
 - **Diagnostics**: Ping hosts, DNS lookups, check disk usage, check service status
-- **Ticket Management**: Create, view, update, and list IT support tickets
+- **Ticket Management**: Create, view, update, list, and search IT support tickets
 - **Knowledge Base**: Search internal IT documentation for solutions and procedures
 
 Guidelines:
 - Be helpful, concise, and professional.
 - When a user reports an issue, try to diagnose it first using diagnostic tools before escalating.
 - Search the knowledge base for common issues before creating tickets.
+- Search existing tickets before creating one, to avoid duplicates.
 - When creating tickets, extract a clear title and description from the conversation.
 - Always confirm actions with the user (e.g., "I've created ticket #5 for your issue").
 - If you can't resolve an issue, create a ticket and let the user know.
 - Format responses for Slack using markdown (*bold*, `code`, bullet points).
 """
 
+_CACHE_CONTROL = {"type": "ephemeral"}
+# Tools render before the system prompt, so one breakpoint here caches both
+_CACHED_SYSTEM = [{"type": "text", "text": SYSTEM_PROMPT, "cache_control": _CACHE_CONTROL}]
+# Estimated tokens of the system prompt and tool schemas sent with every request
+PREFIX_TOKENS = (len(SYSTEM_PROMPT) + len(json.dumps(TOOLS))) // 4
+_USAGE_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+)
+
+
+class StreamInterruptedError(Exception):
+    """A streamed response failed after some of its text was already forwarded.
+
+    Not retried by the scheduler: a retry would stream the partial answer again.
+    """
+
+
+@dataclass
+class AgentResult:
+    """Outcome of one agent run.
+
+    ``transcript`` holds the messages the run added to the conversation — assistant
+    ``tool_use`` turns, compacted ``tool_result`` turns and the final answer — ready to
+    be appended to the thread history.
+    """
+
+    text: str
+    transcript: list[dict] = field(default_factory=list)
+
 
 class Agent:
     """Claude-powered IT support agent with tool use."""
 
     def __init__(self, settings: Settings) -> None:
         self.settings = settings
-        self.client = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key)
+        # Retries are handled by the shared scheduler, which also applies rate limits
+        self.client = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key, max_retries=0)
+        self.scheduler = RequestScheduler(
+            requests_per_minute=settings.anthropic_requests_per_minute,
+            input_tokens_per_minute=settings.anthropic_input_tokens_per_minute,
+            output_tokens_per_minute=settings.anthropic_output_tokens_per_minute,
+            max_retries=settings.anthropic_max_retries,
+        )
         self.model = settings.claude_model
         self.max_loops = settings.max_tool_loops
+        self.tool_timeout = settings.tool_turn_timeout
+        self.prompt_caching = settings.prompt_caching
+        self.transcript_result_chars = settings.transcript_tool_result_chars
+        # Cumulative token usage across all requests made by this agent
+        self.usage = dict.fromkeys(_USAGE_FIELDS, 0)
 
-    async def run(self, messages: list[dict], user_id: str = "unknown") -> str:
-        """Run the agent tool loop and return the final text response."""
+    async def run(
+        self,
+        messages: list[dict],
+        user_id: str = "unknown",
+        on_text: TextCallback | None = None,
+        on_tool: ToolCallback | None = None,
+        priority: int = PRIORITY_NORMAL,
+    ) -> AgentResult:
+        """Run the agent tool loop and return the final text response and transcript.
+
+        When ``on_text`` or ``on_tool`` is given, responses are streamed and the callbacks
+        are awaited with each text delta and before each tool call respectively.
+        ``priority`` orders this run's API calls in the shared scheduler queue.
+        """
+        stream = on_text is not None or on_tool is not None
         # Build messages for Claude (only role + content)
         claude_messages = [{"role": m["role"], "content": m["content"]} for m in messages]
+        transcript: list[dict] = []
 
         for loop_idx in range(self.max_loops):
             logger.debug("Agent loop %d, sending %d messages", loop_idx, len(claude_messages))
 
-            response = await self.client.messages.create(
-                model=self.model,
-                max_tokens=4096,
-                system=SYSTEM_PROMPT,
-                tools=TOOLS,
-                messages=claude_messages,
+            params = {
+                "model": self.model,
+                "max_tokens": 4096,
+                "system": SYSTEM_PROMPT,
+                "tools": TOOLS,
+                "messages": claude_messages,
+            }
+            if self.prompt_caching:
+                params["system"] = _CACHED_SYSTEM
+                params["messages"] = _with_cache_breakpoints(claude_messages)
+            if stream:
+                request = functools.partial(self._stream, params, on_text)
+            else:
+                request = functools.partial(self.client.messages.create, **params)
+            response = await self.scheduler.submit(
+                request,
+                input_tokens=PREFIX_TOKENS + estimate_tokens(claude_messages),
+                priority=priority,
             )
+            self._record_usage(response)
 
             # If the model wants to stop, extract text and return
             if response.stop_reason == "end_turn":
-                return _extract_text(response)
+                return self._finish(_extract_text(response), transcript)
 
             # If the model wants to use tools, execute them
             if response.stop_reason == "tool_use":
@@ -71,31 +153,137 @@ class Agent:
                         "content": response.content,
                     }
                 )
+                transcript.append(
+                    {
+                        "role": "assistant",
+                        "content": [
+                            block.model_dump(exclude_none=True) for block in response.content
+                        ],
+                    }
+                )
 
-                # Execute each tool call and build tool results
-                tool_results = []
-                for block in response.content:
-                    if block.type == "tool_use":
-                        logger.info("Executing tool: %s(%s)", block.name, json.dumps(block.input))
-                        result = await execute_tool(block.name, block.input, self.settings, user_id)
-                        tool_results.append(
-                            {
-                                "type": "tool_result",
-                                "tool_use_id": block.id,
-                                "content": result,
-                            }
-                        )
+                # Execute this turn's tool calls concurrently and build tool results
+                tool_blocks = [block for block in response.content if block.type == "tool_use"]
+                for block in tool_blocks:
+                    logger.info("Executing tool: %s(%s)", block.name, json.dumps(block.input))
+                    if on_tool is not None:
+                        await on_tool(block.name, block.input)
+                results = await execute_tools(
+                    [(block.name, block.input) for block in tool_blocks],
+                    self.settings,
+                    user_id,
+                    timeout=self.tool_timeout,
+                )
+                tool_results = [
+                    {
+                        "type": "tool_result",
+                        "tool_use_id": block.id,
+                        "content": result,
+                    }
+                    for block, result in zip(tool_blocks, results)
+                ]
 
                 claude_messages.append({"role": "user", "content": tool_results})
+                transcript.append(
+                    {
+                        "role": "user",
+                        "content": [
+                            {
+                                **r,
+                                "content": compact_tool_result(
+                                    r["content"], self.transcript_result_chars
+                                ),
+                            }
+                            for r in tool_results
+                        ],
+                    }
+                )
             else:
                 # Unexpected stop reason, return whatever text we have
-                return _extract_text(response)
+                return self._finish(_extract_text(response), transcript)
 
         # Safety: max loops reached
-        return (
+        return self._finish(
             "I've reached my processing limit for this request. "
-            "Please try breaking your question into smaller parts."
+            "Please try breaking your question into smaller parts.",
+            transcript,
+        )
+
+    @staticmethod
+    def _finish(text: str, transcript: list[dict]) -> AgentResult:
+        transcript.append({"role": "assistant", "content": text})
+        return AgentResult(text=text, transcript=transcript)
+
+    async def count_tokens(self, messages: list[dict]) -> int:
+        """Count the input tokens of a request for ``messages`` with the count-tokens API.
+
+        The system prompt and tool schemas are included, as in every real request; the
+        API also needs the tools to accept ``tool_use`` blocks in the history.
+        """
+        result = await self.client.messages.count_tokens(
+            model=self.model, system=SYSTEM_PROMPT, tools=TOOLS, messages=messages
         )
+        return result.input_tokens
+
+    async def _stream(self, params: dict, on_text: TextCallback | None):
+        """Send a request with the streaming API, forwarding text deltas to ``on_text``.
+
+        Failures before any text was forwarded propagate unchanged, so the scheduler can
+        retry them; later ones raise ``StreamInterruptedError``.
+        """
+        forwarded = False
+        try:
+            async with self.client.messages.stream(**params) as stream:
+                async for event in stream:
+                    if event.type == "text" and on_text is not None:
+                        forwarded = True
+                        await on_text(event.text)
+                return await stream.get_final_message()
+        except Exception as e:
+            if forwarded:
+                raise StreamInterruptedError("Response stream was interrupted") from e
+            raise
+
+    def _record_usage(self, response) -> None:
+        """Accumulate token usage, including prompt-cache reads and writes."""
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        counts = {name: getattr(usage, name, None) or 0 for name in _USAGE_FIELDS}
+        for name, count in counts.items():
+            self.usage[name] += count
+        logger.info(
+            "Claude usage: input=%d output=%d cache_write=%d cache_read=%d",
+            counts["input_tokens"],
+            counts["output_tokens"],
+            counts["cache_creation_input_tokens"],
+            counts["cache_read_input_tokens"],
+        )
+
+
+def _with_cache_breakpoints(messages: list[dict]) -> list[dict]:
+    """Return a copy of ``messages`` with cache breakpoints on the last two user turns.
+
+    The newest user message writes the cache entry the next request will read; the one
+    before it is where the previous request wrote its entry, so it is read back here.
+    """
+    marked = list(messages)
+    user_indices = [i for i, m in enumerate(messages) if m["role"] == "user"]
+    for i in user_indices[-2:]:
+        marked[i] = {"role": "user", "content": _mark_last_block(messages[i]["content"])}
+    return marked
+
+
+def _mark_last_block(content) -> list[dict]:
+    """Convert message content to blocks with ``cache_control`` on the last one."""
+    if isinstance(content, str):
+        return [{"type": "text", "text": content, "cache_control": _CACHE_CONTROL}]
+    blocks = list(content)
+    last = blocks[-1]
+    if not isinstance(last, dict):
+        last = last.model_dump(exclude_none=True)
+    blocks[-1] = {**last, "cache_control": _CACHE_CONTROL}
+    return blocks
 
 
 def _extract_text(response) -> str:
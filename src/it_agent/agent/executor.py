@@ -2,13 +2,22 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
 
+from it_agent import serialization
+from it_agent.agent.cache import SingleFlight, ToolResultCache, cache_key
 from it_agent.config import Settings
 from it_agent.tools.diagnostics import check_disk_usage, check_service_status, dns_lookup, ping_host
 from it_agent.tools.knowledge import search_knowledge_base
-from it_agent.tools.tickets import create_ticket, get_ticket, list_tickets, update_ticket
+from it_agent.tools.tickets import (
+    create_ticket,
+    get_ticket,
+    list_tickets,
+    search_tickets,
+    ticket_stats,
+    update_ticket,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -22,9 +31,66 @@ _TOOL_HANDLERS = {
     "get_ticket": get_ticket,
     "update_ticket": update_ticket,
     "list_tickets": list_tickets,
+    "search_tickets": search_tickets,
+    "ticket_stats": ticket_stats,
     "search_knowledge_base": search_knowledge_base,
 }
 
+# Max concurrent executions per tool across all agent turns. Subprocess-backed diagnostics
+# are capped lower so a burst of tool calls cannot fork an unbounded number of processes.
+_TOOL_CONCURRENCY = {
+    "ping_host": 4,
+    "dns_lookup": 4,
+    "check_disk_usage": 2,
+    "check_service_status": 2,
+    "create_ticket": 4,
+    "get_ticket": 8,
+    "update_ticket": 4,
+    "list_tickets": 8,
+    "search_tickets": 8,
+    "ticket_stats": 8,
+    "search_knowledge_base": 4,
+}
+_DEFAULT_CONCURRENCY = 4
+
+# (ttl_seconds, max_entries) for read-only tools whose results may be reused
+_CACHE_POLICIES = {
+    "ping_host": (30.0, 256),
+    "dns_lookup": (60.0, 256),
+    "check_disk_usage": (30.0, 32),
+    "check_service_status": (15.0, 128),
+    "get_ticket": (10.0, 512),
+    "list_tickets": (10.0, 128),
+    "search_tickets": (10.0, 128),
+    "ticket_stats": (10.0, 128),
+    "search_knowledge_base": (300.0, 256),
+}
+
+# Cached ticket reads that each write tool makes stale
+_INVALIDATES = {
+    "create_ticket": ("list_tickets", "search_tickets", "ticket_stats"),
+    "update_ticket": ("get_ticket", "list_tickets", "search_tickets", "ticket_stats"),
+}
+
+# Tools that change state. They are never cancelled at the turn deadline: the write may
+# already be committing, and reporting it as timed out invites a duplicate retry.
+_WRITE_TOOLS = frozenset(_INVALIDATES)
+
+_result_cache = ToolResultCache(_CACHE_POLICIES)
+# Identical read-only calls already running are joined rather than started again
+_inflight = SingleFlight()
+
+# Semaphores are created lazily so they bind to the running event loop
+_semaphores: dict[str, asyncio.Semaphore] = {}
+
+
+def _get_semaphore(tool_name: str) -> asyncio.Semaphore:
+    sem = _semaphores.get(tool_name)
+    if sem is None:
+        sem = asyncio.Semaphore(_TOOL_CONCURRENCY.get(tool_name, _DEFAULT_CONCURRENCY))
+        _semaphores[tool_name] = sem
+    return sem
+
 
 async def execute_tool(
     tool_name: str, tool_input: dict, settings: Settings, user_id: str = "unknown"
@@ -32,20 +98,110 @@ async def execute_tool(
     """Execute a tool by name and return the JSON result string."""
     handler = _TOOL_HANDLERS.get(tool_name)
     if handler is None:
-        return json.dumps({"error": f"Unknown tool: {tool_name}"})
+        return serialization.dumps({"error": f"Unknown tool: {tool_name}"})
+
+    if not _result_cache.cacheable(tool_name):
+        output, _ = await _run_handler(handler, tool_name, tool_input, settings, user_id)
+        _invalidate_for(tool_name, tool_input)
+        return output
+
+    key = cache_key(tool_name, tool_input)
+    if settings.tool_cache_enabled:
+        cached = _result_cache.get(tool_name, key)
+        if cached is not None:
+            logger.debug("Tool cache hit: %s %s", tool_name, key)
+            return cached
+
+    # A write that lands while this call runs bumps the generation: the result is then
+    # not cached, and later callers start a fresh call instead of joining this one
+    generation = _result_cache.generation(tool_name)
+
+    async def run() -> str:
+        output, ok = await _run_handler(handler, tool_name, tool_input, settings, user_id)
+        if ok and settings.tool_cache_enabled:
+            _result_cache.set(tool_name, key, output, generation)
+        return output
+
+    return await _inflight.do(f"{tool_name}:{generation}:{key}", run)
+
+
+async def _run_handler(
+    handler, tool_name: str, tool_input: dict, settings: Settings, user_id: str
+) -> tuple[str, bool]:
+    """Call a tool handler; return its JSON result and whether it succeeded."""
+    # Copy so injected arguments never leak back into the tool_use block sent to Claude
+    tool_input = dict(tool_input)
 
     try:
         # Inject settings and user_id for tools that need them
         if tool_name in ("create_ticket", "update_ticket"):
             tool_input["_settings"] = settings
             tool_input["_user_id"] = user_id
-        elif tool_name in ("get_ticket", "list_tickets"):
+        elif tool_name in ("get_ticket", "list_tickets", "search_tickets", "ticket_stats"):
             tool_input["_settings"] = settings
         elif tool_name == "search_knowledge_base":
             tool_input["_settings"] = settings
 
-        result = await handler(**tool_input)
-        return json.dumps(result, default=str)
+        async with _get_semaphore(tool_name):
+            result = await handler(**tool_input)
+        return serialization.dumps(result), "error" not in result
     except Exception as e:
         logger.exception("Tool execution error: %s", tool_name)
-        return json.dumps({"error": str(e)})
+        return serialization.dumps({"error": str(e)}), False
+
+
+def _invalidate_for(tool_name: str, tool_input: dict) -> None:
+    """Drop cached reads made stale by a write tool."""
+    for stale in _INVALIDATES.get(tool_name, ()):
+        if stale == "get_ticket":
+            _result_cache.invalidate(stale, {"ticket_id": tool_input.get("ticket_id")})
+        else:
+            _result_cache.invalidate(stale)
+
+
+def cache_stats() -> dict:
+    """Hit/miss statistics of the tool result cache and in-flight coalescing."""
+    return {**_result_cache.stats(), "single_flight": _inflight.stats()}
+
+
+async def execute_tools(
+    calls: list[tuple[str, dict]],
+    settings: Settings,
+    user_id: str = "unknown",
+    timeout: float | None = None,
+) -> list[str]:
+    """Execute several tool calls concurrently.
+
+    Results are returned in the same order as ``calls``. Read-only calls still running
+    when ``timeout`` expires are cancelled and reported as errors; write calls are
+    waited for.
+    """
+    tasks = [
+        asyncio.ensure_future(execute_tool(name, tool_input, settings, user_id))
+        for name, tool_input in calls
+    ]
+    if not tasks:
+        return []
+
+    done, pending = await asyncio.wait(tasks, timeout=timeout)
+    writes = {task for (name, _), task in zip(calls, tasks) if name in _WRITE_TOOLS}
+    overdue = pending - writes
+    for task in overdue:
+        task.cancel()
+    if overdue:
+        await asyncio.gather(*overdue, return_exceptions=True)
+        logger.warning("%d tool call(s) exceeded the %.1fs turn deadline", len(overdue), timeout)
+    if pending & writes:
+        logger.warning("Waiting for %d write(s) past the turn deadline", len(pending & writes))
+        await asyncio.wait(pending & writes)
+        done |= pending & writes
+
+    results = []
+    for (name, _), task in zip(calls, tasks):
+        if task in done:
+            results.append(task.result())
+        else:
+            results.append(
+                serialization.dumps({"error": f"Tool {name} timed out after {timeout:.0f}s"})
+            )
+    return results
@@ -0,0 +1,224 @@
+"""Token-budgeted conversation history with a rolling summary of older turns."""
+
+from __future__ import annotations
+
+import json
+import logging
+from collections.abc import Awaitable
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# Local estimate used when the count-tokens API is unavailable
+_CHARS_PER_TOKEN = 4
+_MESSAGE_TOKEN_OVERHEAD = 4
+# Only ask the API when the local estimate says the budget might actually be at risk
+_API_COUNT_THRESHOLD = 0.5
+_SUMMARY_SNIPPET_CHARS = 200
+# Limits applied to individual fields when compacting stored tool results
+_COMPACT_STRING_CHARS = 300
+_COMPACT_LIST_ITEMS = 10
+SUMMARY_HEADER = "Summary of earlier conversation in this thread:"
+
+TokenCounter = Callable[[list[dict]], Awaitable[int]]
+
+
+def estimate_tokens(messages: list[dict]) -> int:
+    """Roughly estimate the input tokens of ``messages`` (about four characters per token)."""
+    total = 0
+    for message in messages:
+        content = message["content"]
+        if not isinstance(content, str):
+            content = json.dumps(content, default=str)
+        total += len(content) // _CHARS_PER_TOKEN + _MESSAGE_TOKEN_OVERHEAD
+    return total
+
+
+def split_turns(messages: list[dict]) -> list[list[dict]]:
+    """Group messages into turns, each starting at a user message that is not a tool result.
+
+    A turn holds the user's message plus every assistant and ``tool_result`` message that
+    followed it, so ``tool_use``/``tool_result`` pairs never straddle a turn boundary.
+    """
+    turns: list[list[dict]] = []
+    for message in messages:
+        if not turns or (message["role"] == "user" and not _is_tool_result(message)):
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return turns
+
+
+def with_summary(messages: list[dict], summary: str) -> list[dict]:
+    """Return ``messages`` with the rolling summary prepended to the first user message."""
+    if not summary or not messages:
+        return messages
+    first = messages[0]
+    prefix = f"{SUMMARY_HEADER}\n{summary}\n\n"
+    content = first["content"]
+    if isinstance(content, str):
+        content = prefix + content
+    else:
+        content = [{"type": "text", "text": prefix}, *content]
+    return [{"role": first["role"], "content": content}, *messages[1:]]
+
+
+def compact_tool_result(content: str, max_chars: int) -> str:
+    """Shrink a JSON tool result for storage in the thread history.
+
+    Results under ``max_chars`` are kept verbatim. Larger ones keep their structure but
+    long strings (raw command output) and long lists are cut down, so a follow-up can
+    still reuse the key facts without re-running the tool.
+    """
+    if len(content) <= max_chars:
+        return content
+    try:
+        compacted = json.dumps(_compact_value(json.loads(content)), default=str)
+    except ValueError:
+        compacted = content
+    if len(compacted) > max_chars:
+        compacted = f"{compacted[:max_chars]}… [truncated {len(content) - max_chars} chars]"
+    return compacted
+
+
+def _compact_value(value):
+    if isinstance(value, str) and len(value) > _COMPACT_STRING_CHARS:
+        omitted = len(value) - _COMPACT_STRING_CHARS
+        return f"{value[:_COMPACT_STRING_CHARS]}… [{omitted} chars omitted]"
+    if isinstance(value, list):
+        items = [_compact_value(v) for v in value[:_COMPACT_LIST_ITEMS]]
+        if len(value) > _COMPACT_LIST_ITEMS:
+            items.append(f"… [{len(value) - _COMPACT_LIST_ITEMS} more items omitted]")
+        return items
+    if isinstance(value, dict):
+        return {k: _compact_value(v) for k, v in value.items()}
+    return value
+
+
+class HistoryManager:
+    """Keeps the newest turns of a thread within an input-token budget.
+
+    The budget covers the whole request: ``prefix_tokens`` (the estimated system prompt
+    and tool schemas), the summary and the kept turns. Turns that no longer fit are
+    folded into a rolling plain-text summary, which is carried with the thread and
+    shown to Claude ahead of the kept turns.
+    """
+
+    def __init__(
+        self,
+        token_budget: int,
+        summary_max_chars: int = 2000,
+        count_tokens: TokenCounter | None = None,
+        prefix_tokens: int = 0,
+    ) -> None:
+        self.token_budget = token_budget
+        self.summary_max_chars = summary_max_chars
+        self.count_tokens = count_tokens
+        self.prefix_tokens = prefix_tokens
+
+    async def fit(self, messages: list[dict], summary: str = "") -> tuple[list[dict], str]:
+        """Return the messages to keep and the updated summary."""
+        turns = split_turns(messages)
+        budget = self.token_budget - self.prefix_tokens - len(summary) // _CHARS_PER_TOKEN
+
+        # Newest turns first; the newest turn is always kept
+        kept: list[list[dict]] = []
+        used = 0
+        for turn in reversed(turns):
+            cost = estimate_tokens(turn)
+            if kept and used + cost > budget:
+                break
+            kept.insert(0, turn)
+            used += cost
+
+        if self.count_tokens is not None and used > budget * _API_COUNT_THRESHOLD:
+            kept = await self._trim_counted(kept, summary)
+
+        dropped = turns[: len(turns) - len(kept)]
+        if dropped:
+            summary = self._summarize(dropped, summary)
+            logger.debug("Folded %d turn(s) into the thread summary", len(dropped))
+        return [message for turn in kept for message in turn], summary
+
+    async def _trim_counted(self, kept: list[list[dict]], summary: str) -> list[list[dict]]:
+        """Drop the oldest kept turns until the exact token count fits the budget.
+
+        Makes a single count call: the local per-turn estimates are scaled to the
+        exact total and the over-budget turns are cut in one step.
+        """
+        messages = with_summary([m for turn in kept for m in turn], summary)
+        try:
+            tokens = await self.count_tokens(messages)
+        except Exception:
+            logger.warning("Token counting failed, using local estimate", exc_info=True)
+            return kept
+
+        excess = tokens - self.token_budget
+        if excess <= 0:
+            return kept
+        costs = [estimate_tokens(turn) for turn in kept]
+        scale = tokens / max(1, self.prefix_tokens + estimate_tokens(messages))
+        drop = 0
+        while excess > 0 and drop < len(kept) - 1:
+            excess -= costs[drop] * scale
+            drop += 1
+        return kept[drop:]
+
+    def _summarize(self, turns: list[list[dict]], summary: str) -> str:
+        lines = [summary] if summary else []
+        lines.extend(_summarize_turn(turn) for turn in turns)
+        text = "\n".join(lines)
+        if len(text) > self.summary_max_chars:
+            # Keep the most recent part, starting at a line boundary
+            text = text[-self.summary_max_chars :]
+            text = text.split("\n", 1)[-1]
+        return text
+
+
+def _is_tool_result(message: dict) -> bool:
+    content = message["content"]
+    return not isinstance(content, str) and any(
+        _block_type(block) == "tool_result" for block in content
+    )
+
+
+def _block_type(block) -> str | None:
+    return block.get("type") if isinstance(block, dict) else getattr(block, "type", None)
+
+
+def _text_of(content) -> str:
+    if isinstance(content, str):
+        return content
+    parts = []
+    for block in content:
+        if _block_type(block) == "text":
+            parts.append(block["text"] if isinstance(block, dict) else block.text)
+    return " ".join(parts)
+
+
+def _tool_names(turn: list[dict]) -> list[str]:
+    names = []
+    for message in turn:
+        if message["role"] == "assistant" and not isinstance(message["content"], str):
+            for block in message["content"]:
+                if _block_type(block) == "tool_use":
+                    names.append(block["name"] if isinstance(block, dict) else block.name)
+    return names
+
+
+def _snippet(text: str) -> str:
+    text = " ".join(text.split())
+    if len(text) > _SUMMARY_SNIPPET_CHARS:
+        text = text[: _SUMMARY_SNIPPET_CHARS - 1] + "…"
+    return text
+
+
+def _summarize_turn(turn: list[dict]) -> str:
+    line = f"- User: {_snippet(_text_of(turn[0]['content']))}"
+    tools = _tool_names(turn)
+    if tools:
+        line += f" (tools used: {', '.join(dict.fromkeys(tools))})"
+    replies = [m for m in turn[1:] if m["role"] == "assistant"]
+    if replies:
+        line += f"\n  Assistant: {_snippet(_text_of(replies[-1]['content']))}"
+    return line
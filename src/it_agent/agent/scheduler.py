@@ -0,0 +1,233 @@
+"""Client-side rate limiting, prioritization and retries for Anthropic API calls."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from collections.abc import Awaitable
+from typing import Callable, TypeVar
+
+import anthropic
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Lower values are admitted first
+PRIORITY_CRITICAL = 0
+PRIORITY_NORMAL = 10
+
+
+class TokenBucket:
+    """Continuously refilling bucket of ``per_minute`` units, holding at most one minute's worth.
+
+    The level may go negative when actual usage is reported after the fact; later
+    callers then wait until the debt has been refilled.
+    """
+
+    def __init__(self, per_minute: float) -> None:
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay_for(self, amount: float) -> float:
+        """Seconds until ``amount`` units are available (0 if they are now)."""
+        self._refill()
+        # A request larger than the whole bucket only has to wait for a full bucket
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.level -= amount
+
+
+class RequestScheduler:
+    """Shared gate in front of the Anthropic client.
+
+    Calls are admitted one at a time in priority order (FIFO within a priority) once the
+    request, input-token and output-token buckets allow it; admitted calls then run
+    concurrently. Rate-limit, overload, server and connection errors are retried with
+    jittered exponential backoff, honouring ``retry-after``, and a 429 pauses admission
+    for everyone until the server says to retry.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        input_tokens_per_minute: int,
+        output_tokens_per_minute: int,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ) -> None:
+        self.requests = TokenBucket(requests_per_minute)
+        self.input_tokens = TokenBucket(input_tokens_per_minute)
+        self.output_tokens = TokenBucket(output_tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._gate_busy = False
+        self._paused_until = 0.0
+
+        self._in_flight = 0
+        self._completed = 0
+        self._retries = 0
+        self._rate_limited = 0
+        self._waits = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    async def submit(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        input_tokens: int,
+        priority: int = PRIORITY_NORMAL,
+    ) -> T:
+        """Run ``fn`` once admitted, retrying transient failures.
+
+        ``input_tokens`` is the estimated prompt size. If the result has a ``usage``
+        attribute, the buckets are corrected with the actual input and output tokens.
+        """
+        attempt = 0
+        while True:
+            await self._admit(priority, input_tokens)
+            self._in_flight += 1
+            try:
+                result = await fn()
+            except Exception as e:
+                if not _is_retryable(e) or attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(e, attempt)
+                attempt += 1
+                self._retries += 1
+                logger.warning(
+                    "Anthropic call failed (%s), retry %d/%d in %.1fs",
+                    type(e).__name__,
+                    attempt,
+                    self.max_retries,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+                continue
+            finally:
+                self._in_flight -= 1
+
+            self._completed += 1
+            usage = getattr(result, "usage", None)
+            if usage is not None:
+                # Cache writes count against the input limit, cache reads do not
+                actual = (usage.input_tokens or 0) + (
+                    getattr(usage, "cache_creation_input_tokens", None) or 0
+                )
+                self.input_tokens.consume(actual - input_tokens)
+                self.output_tokens.consume(usage.output_tokens or 0)
+            return result
+
+    def stats(self) -> dict:
+        """Queue depth, wait times and retry counters."""
+        return {
+            "queue_depth": sum(1 for _, _, fut in self._waiters if not fut.done()),
+            "in_flight": self._in_flight,
+            "completed": self._completed,
+            "retries": self._retries,
+            "rate_limited": self._rate_limited,
+            "avg_wait_seconds": self._wait_total / self._waits if self._waits else 0.0,
+            "max_wait_seconds": self._wait_max,
+        }
+
+    async def _admit(self, priority: int, input_tokens: int) -> None:
+        """Wait for this call's turn at the gate, then for bucket capacity."""
+        enqueued = time.monotonic()
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        self._wake()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Granted the gate just as we were cancelled: hand it on
+                self._release()
+            raise
+
+        try:
+            while True:
+                delay = max(
+                    self._paused_until - time.monotonic(),
+                    self.requests.delay_for(1),
+                    self.input_tokens.delay_for(input_tokens),
+                    # Output usage is only known afterwards; just wait out any debt
+                    self.output_tokens.delay_for(0),
+                )
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+            self.requests.consume(1)
+            self.input_tokens.consume(input_tokens)
+        finally:
+            self._release()
+
+        waited = time.monotonic() - enqueued
+        self._waits += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+
+    def _wake(self) -> None:
+        if self._gate_busy:
+            return
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                self._gate_busy = True
+                fut.set_result(None)
+                return
+
+    def _release(self) -> None:
+        self._gate_busy = False
+        self._wake()
+
+    def _backoff(self, error: Exception, attempt: int) -> float:
+        retry_after = _retry_after(error)
+        if isinstance(error, anthropic.APIStatusError) and error.status_code == 429:
+            self._rate_limited += 1
+            if retry_after is not None:
+                # The limit is shared by every caller, so hold the whole queue
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        # Full jitter: uniform in [0, base * 2^attempt]
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, anthropic.APIConnectionError):
+        return True
+    if isinstance(error, anthropic.APIStatusError):
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return False
+
+
+def _retry_after(error: Exception) -> float | None:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    value = response.headers.get("retry-after")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
@@ -1,4 +1,4 @@
-"""JSON schema definitions for the 9 agent tools."""
+"""JSON schema definitions for the 11 agent tools."""
 
 TOOLS = [
     # --- Diagnostics ---
@@ -140,7 +140,12 @@ TOOLS = [
     },
     {
         "name": "list_tickets",
-        "description": "List IT support tickets with optional filters.",
+        "description": (
+            "List IT support tickets with optional filters, newest first."
+            " If the result has a next_cursor, pass it as cursor to get the next page."
+            " Tickets resolved or closed long ago are archived: they are not listed or"
+            " searchable, but get_ticket still finds them by ID."
+        ),
         "input_schema": {
             "type": "object",
             "properties": {
@@ -163,6 +168,76 @@ TOOLS = [
                     "description": "Max number of tickets to return (default 10)",
                     "default": 10,
                 },
+                "cursor": {
+                    "type": "string",
+                    "description": "next_cursor from a previous list_tickets result",
+                },
+            },
+            "required": [],
+        },
+    },
+    {
+        "name": "search_tickets",
+        "description": (
+            "Full-text search over ticket titles, descriptions and comments."
+            " Returns the best matches with a short excerpt; matched words are *bold*."
+            " Use this to find existing or similar tickets before creating a new one."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "Words to search for"},
+                "status": {
+                    "type": "string",
+                    "enum": ["open", "in_progress", "waiting", "resolved", "closed"],
+                    "description": "Only return tickets with this status",
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Max number of results (default 10)",
+                    "default": 10,
+                },
+            },
+            "required": ["query"],
+        },
+    },
+    {
+        "name": "ticket_stats",
+        "description": (
+            "Exact ticket statistics. metric 'counts' counts tickets, optionally filtered"
+            " and grouped by status, priority and category. metric 'resolution_time' gives"
+            " the number of tickets resolved in the last N days and the mean hours to"
+            " resolve, optionally filtered and grouped by priority and category."
+            " Use this instead of listing tickets and counting them."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "metric": {
+                    "type": "string",
+                    "enum": ["counts", "resolution_time"],
+                    "default": "counts",
+                },
+                "status": {
+                    "type": "string",
+                    "enum": ["open", "in_progress", "waiting", "resolved", "closed"],
+                    "description": "Only count tickets with this status (counts only)",
+                },
+                "priority": {
+                    "type": "string",
+                    "enum": ["low", "medium", "high", "critical"],
+                },
+                "category": {"type": "string", "description": "e.g. 'network', 'hardware'"},
+                "group_by": {
+                    "type": "array",
+                    "items": {"type": "string", "enum": ["status", "priority", "category"]},
+                    "description": "Break the result down by these fields",
+                },
+                "days": {
+                    "type": "integer",
+                    "description": "Look-back window in days for resolution_time (default 7)",
+                    "default": 7,
+                },
             },
             "required": [],
         },
@@ -0,0 +1,144 @@
+"""Bounded per-thread conversation history."""
+
+from __future__ import annotations
+
+import json
+import time
+from collections import OrderedDict
+
+# Rough per-message bookkeeping overhead (tuple + list slot) added to content size
+_MESSAGE_OVERHEAD = 72
+
+
+class _Thread:
+    __slots__ = ("records", "summary", "size", "last_access")
+
+    def __init__(self) -> None:
+        # (role, content, is_json): plain-text content is kept as-is, block lists as compact JSON
+        self.records: list[tuple[str, str, bool]] = []
+        # Rolling summary of turns no longer kept verbatim
+        self.summary = ""
+        self.size = 0
+        self.last_access = time.monotonic()
+
+
+class ConversationStore:
+    """Conversation history keyed by ``(channel, thread_ts)``.
+
+    Threads are evicted least-recently-used first once ``max_threads`` or ``max_bytes``
+    is exceeded, and expire after ``idle_ttl`` seconds without activity. Messages are
+    stored as compact records and materialized as ``{"role", "content"}`` dicts on read.
+    """
+
+    def __init__(
+        self, max_threads: int = 2000, max_bytes: int = 64 * 1024 * 1024, idle_ttl: float = 86400
+    ) -> None:
+        self.max_threads = max_threads
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self._threads: OrderedDict[tuple[str, str], _Thread] = OrderedDict()
+        self._bytes = 0
+        self._evicted_lru = 0
+        self._evicted_idle = 0
+
+    def get(self, key: tuple[str, str]) -> list[dict]:
+        """Return a copy of the thread's messages (empty if unknown or expired)."""
+        self._expire()
+        thread = self._threads.get(key)
+        if thread is None:
+            return []
+        self._touch(key, thread)
+        return [_decode(record) for record in thread.records]
+
+    def get_summary(self, key: tuple[str, str]) -> str:
+        """Return the thread's rolling summary of older turns."""
+        thread = self._threads.get(key)
+        return thread.summary if thread is not None else ""
+
+    def append(self, key: tuple[str, str], message: dict) -> None:
+        """Append one message to a thread, creating the thread if needed."""
+        self.extend(key, [message])
+
+    def extend(self, key: tuple[str, str], messages: list[dict]) -> None:
+        """Append messages to a thread, creating the thread if needed."""
+        self._expire()
+        thread = self._threads.get(key)
+        if thread is None:
+            thread = self._threads[key] = _Thread()
+        for message in messages:
+            record = _encode(message)
+            thread.records.append(record)
+            size = _record_size(record)
+            thread.size += size
+            self._bytes += size
+        self._touch(key, thread)
+        self._evict(keep=key)
+
+    def replace(self, key: tuple[str, str], messages: list[dict], summary: str = "") -> None:
+        """Replace all messages and the summary of a thread."""
+        self.discard(key)
+        self.extend(key, messages)
+        thread = self._threads[key]
+        thread.summary = summary
+        thread.size += len(summary)
+        self._bytes += len(summary)
+
+    def discard(self, key: tuple[str, str]) -> None:
+        thread = self._threads.pop(key, None)
+        if thread is not None:
+            self._bytes -= thread.size
+
+    def stats(self) -> dict:
+        """Current size and cumulative eviction counts."""
+        return {
+            "threads": len(self._threads),
+            "messages": sum(len(t.records) for t in self._threads.values()),
+            "bytes": self._bytes,
+            "evicted_lru": self._evicted_lru,
+            "evicted_idle": self._evicted_idle,
+        }
+
+    def __len__(self) -> int:
+        return len(self._threads)
+
+    def __contains__(self, key: tuple[str, str]) -> bool:
+        return key in self._threads
+
+    def _touch(self, key: tuple[str, str], thread: _Thread) -> None:
+        thread.last_access = time.monotonic()
+        self._threads.move_to_end(key)
+
+    def _expire(self) -> None:
+        # Threads are ordered by last access, so idle ones are at the front
+        cutoff = time.monotonic() - self.idle_ttl
+        while self._threads:
+            key, thread = next(iter(self._threads.items()))
+            if thread.last_access > cutoff:
+                break
+            self.discard(key)
+            self._evicted_idle += 1
+
+    def _evict(self, keep: tuple[str, str]) -> None:
+        while len(self._threads) > self.max_threads or self._bytes > self.max_bytes:
+            key = next(iter(self._threads))
+            if key == keep:
+                # Never evict the thread being written, even if it alone exceeds the budget
+                break
+            self.discard(key)
+            self._evicted_lru += 1
+
+
+def _encode(message: dict) -> tuple[str, str, bool]:
+    content = message["content"]
+    if isinstance(content, str):
+        return (message["role"], content, False)
+    return (message["role"], json.dumps(content, separators=(",", ":"), default=str), True)
+
+
+def _decode(record: tuple[str, str, bool]) -> dict:
+    role, content, is_json = record
+    return {"role": role, "content": json.loads(content) if is_json else content}
+
+
+def _record_size(record: tuple[str, str, bool]) -> int:
+    return len(record[1]) + _MESSAGE_OVERHEAD
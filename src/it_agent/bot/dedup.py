@@ -0,0 +1,88 @@
+"""Deduplication of redelivered Slack events."""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from it_agent.db.database import get_db
+
+logger = logging.getLogger(__name__)
+
+# Purge expired rows from SQLite once every this many new events
+_PURGE_EVERY = 500
+
+
+def event_key(event: dict) -> str:
+    """Identify the user message behind an event.
+
+    Slack retries reuse the message's ``client_msg_id`` and ``ts``, and a message that
+    arrives both as ``app_mention`` and ``message`` shares them too.
+    """
+    if event.get("client_msg_id"):
+        return f"msg:{event['client_msg_id']}"
+    return f"ts:{event.get('channel', '')}:{event.get('event_ts') or event.get('ts', '')}"
+
+
+class EventDeduplicator:
+    """Remembers processed event keys for ``ttl`` seconds.
+
+    Keys live in a bounded in-memory LRU; when ``db_path`` is given they are also
+    recorded in the ``slack_events`` table so redeliveries are still caught after a
+    restart.
+    """
+
+    def __init__(self, ttl: float = 3600, max_entries: int = 10000, db_path: Path | None = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._seen: OrderedDict[str, float] = OrderedDict()
+        self._inserts = 0
+        self._duplicates = 0
+
+    async def seen(self, key: str) -> bool:
+        """Mark ``key`` as processed; return True if it already was."""
+        now = time.time()
+        expires_at = self._seen.get(key)
+        if expires_at is not None and expires_at > now:
+            self._duplicates += 1
+            return True
+
+        # Mark before any await so a concurrent redelivery sees it
+        self._seen[key] = now + self.ttl
+        self._seen.move_to_end(key)
+        while len(self._seen) > self.max_entries:
+            self._seen.popitem(last=False)
+
+        if self.db_path is not None and await self._seen_in_db(key, now):
+            self._duplicates += 1
+            return True
+        return False
+
+    def stats(self) -> dict:
+        return {"tracked": len(self._seen), "duplicates": self._duplicates}
+
+    async def _seen_in_db(self, key: str, now: float) -> bool:
+        try:
+            async with get_db(self.db_path) as db:
+                # Inserts new keys and refreshes expired ones; a live row is left alone
+                cursor = await db.execute(
+                    """INSERT INTO slack_events (event_key, seen_at) VALUES (?, ?)
+                       ON CONFLICT (event_key) DO UPDATE SET seen_at = excluded.seen_at
+                       WHERE seen_at < ?""",
+                    (key, now, now - self.ttl),
+                )
+                duplicate = cursor.rowcount == 0
+                self._inserts += 1
+                if self._inserts % _PURGE_EVERY == 0:
+                    await db.execute(
+                        "DELETE FROM slack_events WHERE seen_at < ?", (now - self.ttl,)
+                    )
+                await db.commit()
+            return duplicate
+        except Exception:
+            # Fail open: a missed duplicate is better than a dropped message
+            logger.warning("Persistent event dedup failed", exc_info=True)
+            return False
@@ -0,0 +1,184 @@
+"""Ordered, fair and bounded dispatch of Slack messages to the agent."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import time
+from collections import OrderedDict, deque
+from collections.abc import Awaitable
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[], Awaitable[None]]
+Notify = Callable[[str], Awaitable[None]]
+
+QUEUE_FULL_TEXT = (
+    ":no_entry: I'm handling too many requests right now. Please try again in a few minutes."
+)
+
+
+class _Job:
+    __slots__ = ("user_id", "run", "enqueued")
+
+    def __init__(self, user_id: str, run: Job) -> None:
+        self.user_id = user_id
+        self.run = run
+        self.enqueued = time.monotonic()
+
+
+class EventDispatcher:
+    """Runs message jobs with per-thread ordering, a global cap and per-user fairness.
+
+    Jobs for the same thread run one at a time in arrival order. At most
+    ``max_concurrency`` jobs run at once; when a slot frees up, the next job comes from
+    the waiting user served least recently, so one user's burst cannot starve everyone
+    else. At most ``max_queue`` jobs may wait; beyond that new messages are rejected
+    with a notice.
+    """
+
+    def __init__(self, max_concurrency: int = 8, max_queue: int = 100) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        # Waiting jobs per thread, in arrival order
+        self._threads: dict[tuple[str, str], deque[_Job]] = {}
+        # Threads with a job running or waiting in _ready
+        self._active: set[tuple[str, str]] = set()
+        # Threads ready to start, grouped by the user of their next job
+        self._ready: OrderedDict[str, deque[tuple[str, str]]] = OrderedDict()
+        # When each user with outstanding jobs was last served, and how many jobs they have
+        self._last_served: dict[str, int] = {}
+        self._user_jobs: dict[str, int] = {}
+        self._serve_seq = itertools.count(1)
+        self._tasks: set[asyncio.Task] = set()
+        self._running = 0
+        self._pending = 0
+
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    async def submit(
+        self,
+        thread_key: tuple[str, str],
+        user_id: str,
+        run: Job,
+        notify: Notify | None = None,
+    ) -> bool:
+        """Queue ``run`` for a thread. Returns False if the queue is full."""
+        if self._pending >= self.max_queue:
+            self._rejected += 1
+            logger.warning("Dispatch queue full (%d waiting), rejecting message", self._pending)
+            if notify is not None:
+                await notify(QUEUE_FULL_TEXT)
+            return False
+
+        job = _Job(user_id, run)
+        self._threads.setdefault(thread_key, deque()).append(job)
+        self._pending += 1
+        self._user_jobs[user_id] = self._user_jobs.get(user_id, 0) + 1
+        if thread_key not in self._active:
+            self._active.add(thread_key)
+            self._make_ready(thread_key)
+        self._pump()
+
+        # Only when the concurrency cap is what holds the job back, not an earlier
+        # message in its own thread
+        position = self._queue_position(thread_key, job) if notify is not None else 0
+        if position:
+            await notify(
+                f":hourglass: I'm busy right now — you're queued #{position}. "
+                "I'll get to your message shortly."
+            )
+        return True
+
+    async def join(self) -> None:
+        """Wait until every queued and running job has finished."""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def stats(self) -> dict:
+        """Queue and throughput counters."""
+        started = self._completed + self._running
+        return {
+            "running": self._running,
+            "queued": self._pending,
+            "threads": len(self._active),
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "avg_wait_seconds": self._wait_total / started if started else 0.0,
+            "max_wait_seconds": self._wait_max,
+        }
+
+    def _queue_position(self, thread_key: tuple[str, str], job: _Job) -> int:
+        """1-based place of ``job`` in the fair start order, or 0 if it is not ready.
+
+        Replays ``_pump``'s choices on the current ready set: the least recently served
+        user goes next and is then served last. Jobs submitted later can still overtake.
+        """
+        waiting = self._threads.get(thread_key)
+        if (
+            not waiting
+            or waiting[0] is not job
+            or thread_key not in self._ready.get(job.user_id, ())
+        ):
+            return 0
+        last_served = {user: self._last_served.get(user, 0) for user in self._ready}
+        ready = {user: list(keys) for user, keys in self._ready.items()}
+        serve_seq = itertools.count(max(last_served.values()) + 1)
+        position = 0
+        while True:
+            user = min(ready, key=lambda u: last_served[u])
+            key = ready[user].pop(0)
+            position += 1
+            if key == thread_key:
+                return position
+            if not ready[user]:
+                del ready[user]
+            last_served[user] = next(serve_seq)
+
+    def _make_ready(self, thread_key: tuple[str, str]) -> None:
+        user_id = self._threads[thread_key][0].user_id
+        self._ready.setdefault(user_id, deque()).append(thread_key)
+
+    def _pump(self) -> None:
+        while self._running < self.max_concurrency and self._ready:
+            user_id = min(self._ready, key=lambda u: self._last_served.get(u, 0))
+            keys = self._ready[user_id]
+            thread_key = keys.popleft()
+            if not keys:
+                del self._ready[user_id]
+            self._last_served[user_id] = next(self._serve_seq)
+
+            job = self._threads[thread_key].popleft()
+            self._pending -= 1
+            self._running += 1
+            waited = time.monotonic() - job.enqueued
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+            task = asyncio.ensure_future(self._run(thread_key, job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, thread_key: tuple[str, str], job: _Job) -> None:
+        try:
+            await job.run()
+        except Exception:
+            logger.exception("Dispatched job failed")
+        finally:
+            self._running -= 1
+            self._completed += 1
+            self._user_jobs[job.user_id] -= 1
+            if not self._user_jobs[job.user_id]:
+                del self._user_jobs[job.user_id]
+                self._last_served.pop(job.user_id, None)
+            if self._threads[thread_key]:
+                self._make_ready(thread_key)
+            else:
+                del self._threads[thread_key]
+                self._active.discard(thread_key)
+            self._pump()
@@ -5,19 +5,39 @@ import re
 
 from slack_bolt.async_app import AsyncApp
 
-from it_agent.agent.core import Agent
+from it_agent.agent.core import PREFIX_TOKENS, Agent
+from it_agent.agent.history import HistoryManager, with_summary
+from it_agent.agent.scheduler import PRIORITY_CRITICAL, PRIORITY_NORMAL
+from it_agent.bot.conversations import ConversationStore
+from it_agent.bot.dedup import EventDeduplicator, event_key
+from it_agent.bot.dispatcher import EventDispatcher
 from it_agent.bot.formatters import format_error_blocks, format_response_blocks
+from it_agent.bot.streaming import StreamingReply
 from it_agent.config import Settings
+from it_agent.db import queries
+from it_agent.db.models import TicketPriority
 
 logger = logging.getLogger(__name__)
 
-# Per-thread conversation history: {(channel, thread_ts): [messages]}
-_conversations: dict[tuple[str, str], list[dict]] = {}
-MAX_HISTORY = 20
+# Ticket references such as "#42" or "ticket 42"
+_TICKET_REF_RE = re.compile(r"(?:#|\bticket\s*#?\s*)(\d+)\b", re.IGNORECASE)
+_URGENT_RE = re.compile(r"\b(critical|outage)\b", re.IGNORECASE)
 
 # Shared agent instance
 _agent: Agent | None = None
 
+# Token-budgeted history trimming, shared by all threads
+_history: HistoryManager | None = None
+
+# Per-thread conversation history, keyed by (channel, thread_ts)
+_conversations: ConversationStore | None = None
+
+# Orders messages per thread and bounds concurrent agent runs
+_dispatcher: EventDispatcher | None = None
+
+# Drops Slack redeliveries of messages we already accepted
+_dedup: EventDeduplicator | None = None
+
 
 def _get_agent(settings: Settings) -> Agent:
     global _agent
@@ -26,21 +46,66 @@ def _get_agent(settings: Settings) -> Agent:
     return _agent
 
 
+def _get_history(settings: Settings) -> HistoryManager:
+    global _history
+    if _history is None:
+        count_tokens = _get_agent(settings).count_tokens if settings.history_count_tokens else None
+        _history = HistoryManager(
+            settings.history_token_budget,
+            summary_max_chars=settings.history_summary_max_chars,
+            count_tokens=count_tokens,
+            prefix_tokens=PREFIX_TOKENS,
+        )
+    return _history
+
+
+def _get_conversations(settings: Settings) -> ConversationStore:
+    global _conversations
+    if _conversations is None:
+        _conversations = ConversationStore(
+            max_threads=settings.conversation_max_threads,
+            max_bytes=settings.conversation_max_bytes,
+            idle_ttl=settings.conversation_idle_ttl,
+        )
+    return _conversations
+
+
+def _get_dispatcher(settings: Settings) -> EventDispatcher:
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = EventDispatcher(
+            max_concurrency=settings.max_concurrent_conversations,
+            max_queue=settings.max_queued_messages,
+        )
+    return _dispatcher
+
+
+def _get_dedup(settings: Settings) -> EventDeduplicator:
+    global _dedup
+    if _dedup is None:
+        _dedup = EventDeduplicator(
+            ttl=settings.dedup_ttl_seconds,
+            max_entries=settings.dedup_max_entries,
+            db_path=settings.db_path if settings.dedup_persist else None,
+        )
+    return _dedup
+
+
 def register_handlers(app: AsyncApp, settings: Settings) -> None:
     """Register Slack event handlers."""
 
     @app.event("app_mention")
-    async def handle_mention(event: dict, say) -> None:
+    async def handle_mention(event: dict, say, client) -> None:
         """Handle @bot mentions in channels."""
         # Strip the bot mention from the text
         text = re.sub(r"<@[A-Z0-9]+>\s*", "", event.get("text", "")).strip()
         if not text:
             await say("Hi! I'm the IT Support Agent. How can I help you?")
             return
-        await _handle_message(event, text, say, settings)
+        await _dispatch(event, text, say, client, settings)
 
     @app.event("message")
-    async def handle_dm(event: dict, say) -> None:
+    async def handle_dm(event: dict, say, client) -> None:
         """Handle direct messages."""
         # Ignore bot messages, edits, etc.
         if event.get("subtype"):
@@ -48,10 +113,45 @@ def register_handlers(app: AsyncApp, settings: Settings) -> None:
         text = event.get("text", "").strip()
         if not text:
             return
-        await _handle_message(event, text, say, settings)
+        await _dispatch(event, text, say, client, settings)
+
+
+async def _dispatch(event: dict, text: str, say, client, settings: Settings) -> None:
+    """Queue a message for processing; returns without waiting for the agent."""
+    key = event_key(event)
+    if await _get_dedup(settings).seen(key):
+        logger.info("Ignoring duplicate Slack event %s", key)
+        return
 
+    thread_ts = event.get("thread_ts") or event["ts"]
 
-async def _handle_message(event: dict, text: str, say, settings: Settings) -> None:
+    async def notify(message: str) -> None:
+        await say(text=message, thread_ts=thread_ts)
+
+    await _get_dispatcher(settings).submit(
+        (event["channel"], thread_ts),
+        event.get("user", "unknown"),
+        lambda: _handle_message(event, text, say, client, settings),
+        notify=notify,
+    )
+
+
+async def _message_priority(text: str, settings: Settings) -> int:
+    """Put threads about outages or critical tickets ahead in the Claude request queue."""
+    if _URGENT_RE.search(text):
+        return PRIORITY_CRITICAL
+    for ticket_id in {int(m) for m in _TICKET_REF_RE.findall(text)}:
+        try:
+            ticket = await queries.get_ticket(settings.db_path, ticket_id)
+        except Exception:
+            logger.debug("Ticket lookup for priority failed", exc_info=True)
+            continue
+        if ticket is not None and ticket.priority == TicketPriority.CRITICAL:
+            return PRIORITY_CRITICAL
+    return PRIORITY_NORMAL
+
+
+async def _handle_message(event: dict, text: str, say, client, settings: Settings) -> None:
     """Process a user message through the agent."""
     channel = event["channel"]
     thread_ts = event.get("thread_ts") or event["ts"]
@@ -60,28 +160,53 @@ async def _handle_message(event: dict, text: str, say, settings: Settings) -> No
     # Build conversation key
     conv_key = (channel, thread_ts)
 
-    # Get or init history
-    history = _conversations.setdefault(conv_key, [])
-    history.append({"role": "user", "content": text})
-
-    # Trim old history
-    if len(history) > MAX_HISTORY:
-        _conversations[conv_key] = history[-MAX_HISTORY:]
-        history = _conversations[conv_key]
+    # Record the message and load the thread's history
+    conversations = _get_conversations(settings)
+    conversations.append(conv_key, {"role": "user", "content": text})
 
+    reply: StreamingReply | None = None
     try:
-        agent = _get_agent(settings)
-        response = await agent.run(history, user_id=user_id)
-
-        # Append assistant response to history
-        history.append({"role": "assistant", "content": response})
+        if settings.stream_responses:
+            # Post the placeholder before anything that may wait on the API or the database
+            reply = StreamingReply(client, channel, thread_ts, settings.stream_update_interval)
+            await reply.start()
+
+        # Keep the newest turns within the token budget, folding older ones into the summary
+        history, summary = await _get_history(settings).fit(
+            conversations.get(conv_key), conversations.get_summary(conv_key)
+        )
+        conversations.replace(conv_key, history, summary)
+        history = with_summary(history, summary)
 
-        blocks = format_response_blocks(response)
-        await say(text=response, blocks=blocks, thread_ts=thread_ts)
+        agent = _get_agent(settings)
+        priority = await _message_priority(text, settings)
+        if reply is not None:
+            result = await agent.run(
+                history,
+                user_id=user_id,
+                on_text=reply.on_text,
+                on_tool=reply.on_tool,
+                priority=priority,
+            )
+        else:
+            result = await agent.run(history, user_id=user_id, priority=priority)
+        response = result.text
+
+        # Keep the tool calls and their compacted results so follow-ups can reuse them
+        conversations.extend(conv_key, result.transcript)
+
+        if reply is not None:
+            await reply.finish(response)
+        else:
+            blocks = format_response_blocks(response)
+            await say(text=response, blocks=blocks, thread_ts=thread_ts)
 
     except Exception:
         logger.exception("Error processing message")
         blocks = format_error_blocks(
             "Something went wrong processing your request. Please try again."
         )
-        await say(text="Error processing request", blocks=blocks, thread_ts=thread_ts)
+        if reply is not None and reply.ts is not None:
+            await reply.fail("Error processing request", blocks)
+        else:
+            await say(text="Error processing request", blocks=blocks, thread_ts=thread_ts)
@@ -0,0 +1,121 @@
+"""Progressive Slack replies — a placeholder message updated as the agent streams."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+from it_agent.bot.formatters import format_response_blocks
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER_TEXT = ":hourglass_flowing_sand: Working on it..."
+# Slack rejects messages with more than 50 blocks
+_MAX_BLOCKS = 50
+
+
+class StreamingReply:
+    """A Slack message that is posted immediately and updated as the response streams in.
+
+    Updates are rate limited to one ``chat.update`` per ``min_interval`` seconds; deltas
+    arriving in between are coalesced into the next update.
+    """
+
+    def __init__(self, client, channel: str, thread_ts: str, min_interval: float = 1.0) -> None:
+        self.client = client
+        self.channel = channel
+        self.thread_ts = thread_ts
+        self.min_interval = min_interval
+        self.ts: str | None = None
+        self._text = ""
+        self._status = ""
+        self._last_update = 0.0
+        self._pending: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        """Post the placeholder message."""
+        resp = await self.client.chat_postMessage(
+            channel=self.channel, thread_ts=self.thread_ts, text=PLACEHOLDER_TEXT
+        )
+        self.ts = resp["ts"]
+        self._last_update = time.monotonic()
+
+    async def on_text(self, delta: str) -> None:
+        """Append a streamed text delta."""
+        self._text += delta
+        self._status = ""
+        await self._schedule_update()
+
+    async def on_tool(self, name: str, tool_input: dict) -> None:
+        """Show that a tool is being executed."""
+        self._status = f":gear: Running `{name}`..."
+        if self._text and not self._text.endswith("\n"):
+            self._text += "\n\n"
+        await self._schedule_update()
+
+    async def finish(self, text: str) -> None:
+        """Replace the in-progress message with the final response."""
+        self._cancel_pending()
+        blocks = format_response_blocks(text)
+        async with self._lock:
+            await self._update(text, blocks[:_MAX_BLOCKS])
+            # Overflow goes into follow-up messages in the same thread
+            for i in range(_MAX_BLOCKS, len(blocks), _MAX_BLOCKS):
+                await self.client.chat_postMessage(
+                    channel=self.channel,
+                    thread_ts=self.thread_ts,
+                    text=text,
+                    blocks=blocks[i : i + _MAX_BLOCKS],
+                )
+
+    async def fail(self, text: str, blocks: list[dict]) -> None:
+        """Replace the in-progress message with an error."""
+        self._cancel_pending()
+        async with self._lock:
+            await self._update(text, blocks)
+
+    async def _schedule_update(self) -> None:
+        if self.ts is None or self._pending is not None:
+            return
+        delay = self.min_interval - (time.monotonic() - self._last_update)
+        if delay <= 0:
+            await self._flush()
+        else:
+            self._pending = asyncio.ensure_future(self._delayed_flush(delay))
+
+    async def _delayed_flush(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._pending = None
+        await self._flush()
+
+    async def _flush(self) -> None:
+        text = self._text.strip()
+        blocks = format_response_blocks(text)[: _MAX_BLOCKS - 1] if text else []
+        if self._status:
+            blocks.append(
+                {"type": "context", "elements": [{"type": "mrkdwn", "text": self._status}]}
+            )
+        if not blocks:
+            return
+        async with self._lock:
+            try:
+                await self._update(text or self._status, blocks)
+            except Exception:
+                # Progress updates are best effort; the final update reports errors
+                logger.warning("Failed to update streaming message", exc_info=True)
+
+    async def _update(self, text: str, blocks: list[dict]) -> None:
+        if self.ts is None:
+            await self.client.chat_postMessage(
+                channel=self.channel, thread_ts=self.thread_ts, text=text, blocks=blocks
+            )
+            return
+        await self.client.chat_update(channel=self.channel, ts=self.ts, text=text, blocks=blocks)
+        self._last_update = time.monotonic()
+
+    def _cancel_pending(self) -> None:
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
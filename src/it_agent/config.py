@@ -15,17 +15,55 @@ class Settings(BaseSettings):
     # Anthropic
     anthropic_api_key: str
     claude_model: str = "claude-sonnet-4-5-20250929"
+    prompt_caching: bool = True
+    anthropic_requests_per_minute: int = 50
+    anthropic_input_tokens_per_minute: int = 30000
+    anthropic_output_tokens_per_minute: int = 8000
+    anthropic_max_retries: int = 5
 
     # Database
     db_path: Path = Path("tickets.db")
+    db_pool_readers: int = 4
+    db_write_batching: bool = True
+    db_batch_max_latency: float = 0.005
+    db_batch_max_size: int = 64
+    ticket_cache_enabled: bool = True
+    ticket_cache_size: int = 1024
+    # Resolved/closed tickets untouched this long move to the archive (0 disables)
+    archive_after_days: float = 90.0
+    # Archived tickets older than this are deleted (0 keeps them forever)
+    archive_retention_days: float = 0.0
+    archive_interval: float = 6 * 3600
 
     # Knowledge base
     chroma_path: Path = Path("chroma_data")
     knowledge_docs_path: Path = Path("src/it_agent/docs")
+    knowledge_search_workers: int = 2
+    knowledge_warmup: bool = True
 
     # Misc
     log_level: str = "INFO"
     max_tool_loops: int = 10
+    tool_turn_timeout: float = 60.0
+    tool_cache_enabled: bool = True
+    max_concurrent_conversations: int = 8
+    max_queued_messages: int = 100
+    dedup_ttl_seconds: float = 3600.0
+    dedup_max_entries: int = 10000
+    dedup_persist: bool = False
+
+    # Conversation history
+    conversation_max_threads: int = 2000
+    conversation_max_bytes: int = 64 * 1024 * 1024
+    conversation_idle_ttl: float = 86400.0
+    history_token_budget: int = 24000
+    history_summary_max_chars: int = 2000
+    history_count_tokens: bool = True
+    transcript_tool_result_chars: int = 2000
+
+    # Streaming replies
+    stream_responses: bool = True
+    stream_update_interval: float = 1.0
 
 
 def get_settings() -> Settings:
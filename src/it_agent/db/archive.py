@@ -0,0 +1,129 @@
+"""Moving old resolved and closed tickets out of the hot tables."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import fields
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from it_agent.db import queries
+from it_agent.db.database import get_db, run_write
+from it_agent.db.models import Ticket, TicketComment
+
+logger = logging.getLogger(__name__)
+
+_TICKET_COLUMNS = ", ".join(f.name for f in fields(Ticket))
+_COMMENT_COLUMNS = ", ".join(f.name for f in fields(TicketComment))
+
+
+def _cutoff(days: float) -> str:
+    return (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+
+
+async def archive_tickets(db_path: Path, older_than_days: float, batch_size: int = 500) -> int:
+    """Move tickets resolved or closed more than ``older_than_days`` ago to the archive.
+
+    Tickets move with their comments, ``batch_size`` per transaction so the write lock
+    is never held for long. Returns the number of tickets archived.
+    """
+    cutoff = _cutoff(older_than_days)
+    total = 0
+    while True:
+        archived_at = datetime.now(timezone.utc).isoformat()
+
+        async def move(db) -> int:
+            cursor = await db.execute(
+                """SELECT id FROM tickets
+                   WHERE status IN ('resolved', 'closed') AND updated_at < ?
+                   ORDER BY id LIMIT ?""",
+                (cutoff, batch_size),
+            )
+            ids = [row[0] for row in await cursor.fetchall()]
+            if not ids:
+                return 0
+            in_ids = f"({', '.join('?' * len(ids))})"
+            await db.execute(
+                f"""INSERT INTO tickets_archive ({_TICKET_COLUMNS}, archived_at)
+                    SELECT {_TICKET_COLUMNS}, ? FROM tickets WHERE id IN {in_ids}""",  # noqa: S608
+                (archived_at, *ids),
+            )
+            await db.execute(
+                f"""INSERT INTO ticket_comments_archive ({_COMMENT_COLUMNS})
+                    SELECT {_COMMENT_COLUMNS} FROM ticket_comments
+                    WHERE ticket_id IN {in_ids}""",  # noqa: S608
+                ids,
+            )
+            await db.execute(f"DELETE FROM ticket_comments WHERE ticket_id IN {in_ids}", ids)  # noqa: S608
+            await db.execute(f"DELETE FROM tickets WHERE id IN {in_ids}", ids)  # noqa: S608
+            return len(ids)
+
+        moved = await run_write(db_path, move)
+        total += moved
+        if moved < batch_size:
+            break
+        # Let other writers in between batches
+        await asyncio.sleep(0)
+
+    if total:
+        logger.info("Archived %d tickets", total)
+    return total
+
+
+async def compact_archive(
+    db_path: Path, retention_days: float = 0, vacuum_threshold: float = 0.25
+) -> dict:
+    """Purge archived tickets older than ``retention_days`` (0 keeps them forever), then
+    VACUUM if more than ``vacuum_threshold`` of the file is free pages.
+    """
+    purged = 0
+    if retention_days > 0:
+        cutoff = _cutoff(retention_days)
+
+        async def purge(db) -> list[int]:
+            await db.execute(
+                """DELETE FROM ticket_comments_archive WHERE ticket_id IN
+                   (SELECT id FROM tickets_archive WHERE archived_at < ?)""",
+                (cutoff,),
+            )
+            cursor = await db.execute(
+                "DELETE FROM tickets_archive WHERE archived_at < ? RETURNING id", (cutoff,)
+            )
+            return [row[0] for row in await cursor.fetchall()]
+
+        ids = await run_write(db_path, purge)
+        for ticket_id in ids:
+            queries.invalidate_ticket(db_path, ticket_id)
+        purged = len(ids)
+
+    vacuumed = False
+    async with get_db(db_path) as db:
+        cursor = await db.execute("PRAGMA page_count")
+        pages = (await cursor.fetchone())[0]
+        cursor = await db.execute("PRAGMA freelist_count")
+        free = (await cursor.fetchone())[0]
+        if pages and free / pages > vacuum_threshold:
+            # Rewrites the whole file and blocks other writers while it runs
+            await db.execute("VACUUM")
+            vacuumed = True
+        await db.execute("PRAGMA optimize")
+
+    logger.info("Compacted archive: purged %d tickets, vacuumed=%s", purged, vacuumed)
+    return {"purged": purged, "vacuumed": vacuumed}
+
+
+async def run_archival(
+    db_path: Path,
+    older_than_days: float,
+    retention_days: float = 0,
+    interval: float = 6 * 3600,
+) -> None:
+    """Archive and compact every ``interval`` seconds until cancelled."""
+    while True:
+        try:
+            await archive_tickets(db_path, older_than_days)
+            await compact_archive(db_path, retention_days)
+        except Exception:
+            logger.exception("Ticket archival failed")
+        await asyncio.sleep(interval)
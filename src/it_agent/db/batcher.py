@@ -0,0 +1,128 @@
+"""Group commit: concurrent writes share one transaction and one fsync."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from collections.abc import Awaitable
+from contextlib import AbstractAsyncContextManager
+from typing import Any, Callable, TypeVar
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# A write operation: runs statements on the connection it is given and must not commit
+WriteOp = Callable[[aiosqlite.Connection], Awaitable[T]]
+Connect = Callable[[], AbstractAsyncContextManager[aiosqlite.Connection]]
+
+
+class WriteBatcher:
+    """Gathers concurrent write operations and commits them together.
+
+    The first write of a batch waits at most ``max_latency`` seconds for others to
+    join (less if ``max_batch`` is reached). The batch then runs in one transaction
+    with a savepoint per operation, so a failing operation is rolled back on its own
+    and its caller gets the exception while the rest still commit.
+    """
+
+    def __init__(self, connect: Connect, max_latency: float = 0.005, max_batch: int = 64) -> None:
+        self.connect = connect
+        self.max_latency = max_latency
+        self.max_batch = max(1, max_batch)
+        self._pending: deque[tuple[WriteOp, asyncio.Future]] = deque()
+        self._wakeup = asyncio.Event()
+        self._full = asyncio.Event()
+        self._worker: asyncio.Task | None = None
+        self._closed = False
+
+        self._batches = 0
+        self._writes = 0
+        self._largest = 0
+
+    async def submit(self, op: WriteOp[T]) -> T:
+        """Queue ``op`` for the next batch and return its result once committed."""
+        if self._closed:
+            raise RuntimeError("WriteBatcher is closed")
+        if self._worker is None:
+            self._worker = asyncio.ensure_future(self._run())
+        fut = asyncio.get_running_loop().create_future()
+        self._pending.append((op, fut))
+        self._wakeup.set()
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+        return await fut
+
+    async def close(self) -> None:
+        """Commit everything already queued, then stop."""
+        self._closed = True
+        self._wakeup.set()
+        self._full.set()
+        if self._worker is not None:
+            await self._worker
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "batches": self._batches,
+            "writes": self._writes,
+            "avg_batch_size": self._writes / self._batches if self._batches else 0.0,
+            "max_batch_size": self._largest,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            if not self._pending:
+                if self._closed:
+                    return
+                self._wakeup.clear()
+                continue
+
+            if len(self._pending) < self.max_batch and self.max_latency > 0:
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.max_latency)
+                except asyncio.TimeoutError:
+                    pass
+
+            count = min(len(self._pending), self.max_batch)
+            batch = [self._pending.popleft() for _ in range(count)]
+            if len(self._pending) < self.max_batch and not self._closed:
+                self._full.clear()
+            await self._commit(batch)
+
+    async def _commit(self, batch: list[tuple[WriteOp, asyncio.Future]]) -> None:
+        results: list[tuple[asyncio.Future, Any]] = []
+        try:
+            async with self.connect() as db:
+                await db.execute("BEGIN")
+                for op, fut in batch:
+                    await db.execute("SAVEPOINT batch_op")
+                    try:
+                        result = await op(db)
+                    except Exception as e:
+                        await db.execute("ROLLBACK TO batch_op")
+                        await db.execute("RELEASE batch_op")
+                        if not fut.done():
+                            fut.set_exception(e)
+                        continue
+                    await db.execute("RELEASE batch_op")
+                    results.append((fut, result))
+                await db.commit()
+        except Exception as e:
+            # The transaction itself failed, so nothing in it was committed
+            logger.exception("Write batch of %d failed", len(batch))
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+
+        self._batches += 1
+        self._writes += len(batch)
+        self._largest = max(self._largest, len(batch))
+        for fut, result in results:
+            if not fut.done():
+                fut.set_result(result)
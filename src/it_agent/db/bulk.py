@@ -0,0 +1,225 @@
+"""Bulk ticket import and export as streaming JSONL or CSV."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import io
+import logging
+import sys
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import fields
+from itertools import islice
+from pathlib import Path
+from typing import IO
+
+import aiosqlite
+
+from it_agent import serialization
+from it_agent.db.database import init_db
+from it_agent.db.models import Ticket, TicketPriority, TicketStatus
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = [f.name for f in fields(Ticket)]
+_STATUSES = {s.value for s in TicketStatus}
+_PRIORITIES = {p.value for p in TicketPriority}
+
+_INSERT_SQL = f"""INSERT INTO tickets ({", ".join(COLUMNS)})
+                  VALUES ({", ".join("?" * len(COLUMNS))})"""  # noqa: S608
+_ID = COLUMNS.index("id")
+# Ids already taken by a live or an archived ticket
+_TAKEN_IDS_SQL = """SELECT id FROM tickets WHERE id IN (SELECT value FROM json_each(?))
+                    UNION ALL
+                    SELECT id FROM tickets_archive WHERE id IN (SELECT value FROM json_each(?))
+                    ORDER BY id"""
+
+
+class InvalidRecordError(ValueError):
+    """A record in the import input is invalid."""
+
+
+def _format_for(path: str, explicit: str | None) -> str:
+    if explicit:
+        return explicit
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+@contextmanager
+def _open(path: str, mode: str) -> Iterator[IO[str]]:
+    if path == "-":
+        stream = sys.stdin if "r" in mode else sys.stdout
+        yield stream
+        return
+    with open(path, mode, encoding="utf-8", newline="") as f:
+        yield f
+
+
+def read_records(stream: IO[str], fmt: str) -> Iterator[dict]:
+    """Yield one dict per JSONL line or CSV row, without reading the whole input."""
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield serialization.loads(line)
+
+
+def _to_row(record: dict, line: int, keep_ids: bool) -> tuple:
+    # CSV has no nulls: empty cells mean "not set"
+    values = {k: (None if v == "" else v) for k, v in record.items() if k in COLUMNS}
+    if not values.get("title"):
+        raise InvalidRecordError(f"record {line}: title is required")
+    status = values.get("status") or TicketStatus.OPEN.value
+    priority = values.get("priority") or TicketPriority.MEDIUM.value
+    if status not in _STATUSES:
+        raise InvalidRecordError(f"record {line}: unknown status {status!r}")
+    if priority not in _PRIORITIES:
+        raise InvalidRecordError(f"record {line}: unknown priority {priority!r}")
+
+    values.update(status=status, priority=priority)
+    if keep_ids and values.get("id") is not None:
+        values["id"] = int(values["id"])
+    else:
+        values.pop("id", None)
+    if values.get("created_at") and not values.get("updated_at"):
+        values["updated_at"] = values["created_at"]
+    # Missing text fields get the model defaults rather than NULL
+    ticket = Ticket(**{k: v for k, v in values.items() if v is not None})
+    return tuple(getattr(ticket, name) for name in COLUMNS)
+
+
+async def import_tickets(
+    db_path: Path, records: Iterable[dict], chunk_size: int = 5000, keep_ids: bool = False
+) -> int:
+    """Insert tickets in transactions of ``chunk_size`` rows; returns the number inserted.
+
+    Records are validated as they are read. An invalid record, or with ``keep_ids`` an
+    id that a live or archived ticket already has, aborts the import; the chunks
+    committed before it stay in the database.
+    """
+    await init_db(db_path)
+    rows = (_to_row(r, i, keep_ids) for i, r in enumerate(records, start=1))
+    total = 0
+    async with aiosqlite.connect(str(db_path)) as db:
+        await db.execute("PRAGMA synchronous = NORMAL")
+        while chunk := list(islice(rows, chunk_size)):
+            if keep_ids:
+                await _check_ids(db, chunk)
+            await db.executemany(_INSERT_SQL, chunk)
+            await db.commit()
+            total += len(chunk)
+            logger.info("Imported %d tickets", total)
+    return total
+
+
+async def _check_ids(db: aiosqlite.Connection, chunk: list[tuple]) -> None:
+    ids = serialization.dumps([row[_ID] for row in chunk if row[_ID] is not None])
+    cursor = await db.execute(_TAKEN_IDS_SQL, (ids, ids))
+    taken = [row[0] for row in await cursor.fetchall()]
+    if taken:
+        shown = ", ".join(map(str, taken[:10]))
+        raise InvalidRecordError(f"ticket ids already exist: {shown}")
+
+
+async def export_tickets(
+    db_path: Path,
+    stream: IO[str],
+    fmt: str,
+    status: str | None = None,
+    batch_size: int = 5000,
+    include_archived: bool = True,
+) -> int:
+    """Write tickets in id order to ``stream``, fetching ``batch_size`` rows at a time.
+
+    Archived tickets are included unless ``include_archived`` is False.
+    """
+    tables = ["tickets", "tickets_archive"] if include_archived else ["tickets"]
+    where = " WHERE status = ?" if status else ""
+    query = " UNION ALL ".join(
+        f"SELECT {', '.join(COLUMNS)} FROM {table}{where}"  # noqa: S608
+        for table in tables
+    )
+    query += " ORDER BY id"
+    params = [status] * len(tables) if status else []
+
+    writer = None
+    if fmt == "csv":
+        writer = csv.writer(stream)
+        writer.writerow(COLUMNS)
+
+    total = 0
+    async with aiosqlite.connect(str(db_path)) as db:
+        cursor = await db.execute(query, params)
+        while rows := await cursor.fetchmany(batch_size):
+            if writer is not None:
+                writer.writerows(["" if v is None else v for v in row] for row in rows)
+            else:
+                buffer = io.StringIO()
+                for row in rows:
+                    buffer.write(serialization.dumps(dict(zip(COLUMNS, row))))
+                    buffer.write("\n")
+                stream.write(buffer.getvalue())
+            total += len(rows)
+    return total
+
+
+def main() -> None:
+    """CLI entry point for bulk ticket import/export."""
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s", stream=sys.stderr
+    )
+
+    parser = argparse.ArgumentParser(description="Bulk import/export IT support tickets")
+    parser.add_argument("--db", type=Path, default=Path("tickets.db"), help="SQLite database")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    imp = commands.add_parser("import", help="Import tickets from JSONL or CSV")
+    imp.add_argument("file", help="Input file, or - for stdin")
+    imp.add_argument("--format", choices=["jsonl", "csv"], help="Default: from file extension")
+    imp.add_argument("--chunk-size", type=int, default=5000, help="Rows per transaction")
+    imp.add_argument("--keep-ids", action="store_true", help="Keep ticket ids from the input")
+
+    exp = commands.add_parser("export", help="Export tickets as JSONL or CSV")
+    exp.add_argument("file", help="Output file, or - for stdout")
+    exp.add_argument("--format", choices=["jsonl", "csv"], help="Default: from file extension")
+    exp.add_argument("--status", choices=sorted(_STATUSES), help="Only export this status")
+    exp.add_argument(
+        "--include-archived",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Also export archived tickets (default: yes)",
+    )
+
+    args = parser.parse_args()
+    fmt = _format_for(args.file, args.format)
+    try:
+        if args.command == "import":
+            with _open(args.file, "r") as f:
+                count = asyncio.run(
+                    import_tickets(
+                        args.db, read_records(f, fmt), args.chunk_size, keep_ids=args.keep_ids
+                    )
+                )
+            print(f"Imported {count} tickets", file=sys.stderr)
+        else:
+            with _open(args.file, "w") as f:
+                count = asyncio.run(
+                    export_tickets(
+                        args.db,
+                        f,
+                        fmt,
+                        status=args.status,
+                        include_archived=args.include_archived,
+                    )
+                )
+            print(f"Exported {count} tickets", file=sys.stderr)
+    except (ValueError, aiosqlite.Error) as e:
+        parser.exit(1, f"error: {e}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""In-memory read-through cache for ticket rows and comment lists."""
+
+from __future__ import annotations
+
+import copy
+import itertools
+from collections import OrderedDict
+from collections.abc import Hashable
+
+MISSING = object()
+
+
+class RowCache:
+    """Bounded LRU of query results with precise invalidation.
+
+    Readers take a :meth:`generation` token before querying and pass it to :meth:`fill`
+    afterwards; a fill is dropped if the key was invalidated in between, so a read that
+    raced with a write never caches the pre-write value. Values are copied on the way in
+    and out, so callers may mutate what they get back.
+    """
+
+    def __init__(self, maxsize: int = 1024, enabled: bool = True) -> None:
+        self.maxsize = maxsize
+        self.enabled = enabled
+        self._data: OrderedDict[Hashable, object] = OrderedDict()
+        self._generations: dict[Hashable, int] = {}
+        self._seq = itertools.count(1)
+        # Generation of keys with no entry in _generations
+        self._floor = 0
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Hashable):
+        """Return the cached value, or ``MISSING``."""
+        if not self.enabled:
+            return MISSING
+        value = self._data.get(key, MISSING)
+        if value is MISSING:
+            self._misses += 1
+            return MISSING
+        self._hits += 1
+        self._data.move_to_end(key)
+        return _copy(value)
+
+    def generation(self, key: Hashable) -> int:
+        return self._generations.get(key, self._floor)
+
+    def fill(self, key: Hashable, value, generation: int) -> None:
+        if not self.enabled or self.generation(key) != generation:
+            return
+        self._data[key] = _copy(value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+        self._generations[key] = next(self._seq)
+        if len(self._generations) > 4 * self.maxsize:
+            # Forget generations of uncached keys; raising the floor makes any fill
+            # still in flight for them stale, which errs on the safe side
+            self._floor = next(self._seq)
+            self._generations = {k: g for k, g in self._generations.items() if k in self._data}
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._generations.clear()
+        self._floor = next(self._seq)
+        self._hits = 0
+        self._misses = 0
+
+    def stats(self) -> dict:
+        lookups = self._hits + self._misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._data),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+        }
+
+
+def _copy(value):
+    # Cached values are flat records or lists of them, so a shallow copy of each suffices
+    if isinstance(value, list):
+        return [copy.copy(item) for item in value]
+    return copy.copy(value)
@@ -2,54 +2,193 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import logging
 from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import TypeVar
 
 import aiosqlite
 
+from it_agent.db.batcher import WriteBatcher, WriteOp
+from it_agent.db.migrations import migrate
+
+T = TypeVar("T")
+
 logger = logging.getLogger(__name__)
 
-_CREATE_TABLES_SQL = """
-CREATE TABLE IF NOT EXISTS tickets (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    title TEXT NOT NULL,
-    description TEXT NOT NULL DEFAULT '',
-    status TEXT NOT NULL DEFAULT 'open',
-    priority TEXT NOT NULL DEFAULT 'medium',
-    category TEXT NOT NULL DEFAULT '',
-    requester_id TEXT NOT NULL DEFAULT '',
-    assignee_id TEXT NOT NULL DEFAULT '',
-    created_at TEXT NOT NULL,
-    updated_at TEXT NOT NULL,
-    resolved_at TEXT
-);
-
-CREATE TABLE IF NOT EXISTS ticket_comments (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    ticket_id INTEGER NOT NULL,
-    author_id TEXT NOT NULL DEFAULT '',
-    content TEXT NOT NULL,
-    created_at TEXT NOT NULL,
-    FOREIGN KEY (ticket_id) REFERENCES tickets(id)
-);
-"""
+# Applied to every pooled connection. WAL lets readers run alongside the writer, and
+# synchronous=NORMAL is durable across application crashes in WAL mode.
+_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -16000",  # KiB, per connection
+    "PRAGMA mmap_size = 268435456",
+)
+
+# Per-connection cache of compiled statements, keyed by SQL text
+_STATEMENT_CACHE_SIZE = 256
 
 
 async def init_db(db_path: Path) -> None:
-    """Initialize the database and create tables."""
+    """Initialize the database and bring its schema up to date."""
     async with aiosqlite.connect(str(db_path)) as db:
-        await db.executescript(_CREATE_TABLES_SQL)
-        await db.commit()
-    logger.info("Database initialized at %s", db_path)
+        # The journal mode is stored in the database file, so this sticks
+        await db.execute("PRAGMA journal_mode = WAL")
+        version = await migrate(db)
+    logger.info("Database initialized at %s (schema version %d)", db_path, version)
+
+
+async def _connect(db_path: Path, readonly: bool = False) -> aiosqlite.Connection:
+    db = await aiosqlite.connect(str(db_path), cached_statements=_STATEMENT_CACHE_SIZE)
+    db.row_factory = aiosqlite.Row
+    for pragma in _PRAGMAS:
+        await db.execute(pragma)
+    if readonly:
+        await db.execute("PRAGMA query_only = ON")
+    return db
+
+
+class ConnectionPool:
+    """Long-lived connections to one database: a single writer and ``readers`` readers.
+
+    SQLite allows one writer at a time, so writes are serialized on the writer
+    connection instead of contending for the file lock; readers are handed out from a
+    queue and never block the writer under WAL.
+    """
+
+    def __init__(self, db_path: Path, readers: int = 4) -> None:
+        self.db_path = db_path
+        self.size = max(1, readers)
+        self._writer: aiosqlite.Connection | None = None
+        self._write_lock = asyncio.Lock()
+        self._readers: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
+        self._connections: list[aiosqlite.Connection] = []
+        self._closed = False
+
+    async def open(self) -> None:
+        self._writer = await _connect(self.db_path)
+        self._connections.append(self._writer)
+        for _ in range(self.size):
+            reader = await _connect(self.db_path, readonly=True)
+            self._connections.append(reader)
+            self._readers.put_nowait(reader)
+        logger.info("Opened connection pool for %s (%d readers)", self.db_path, self.size)
+
+    @asynccontextmanager
+    async def reader(self):
+        db = await self._readers.get()
+        try:
+            yield db
+        finally:
+            if db.in_transaction:
+                await db.rollback()
+            self._readers.put_nowait(db)
+
+    @asynccontextmanager
+    async def writer(self):
+        async with self._write_lock:
+            db = self._writer
+            try:
+                yield db
+            finally:
+                # Uncommitted work from a failed caller must not leak into the next one
+                if db.in_transaction:
+                    await db.rollback()
+
+    async def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        # Wait for in-progress writes; readers are closed regardless
+        async with self._write_lock:
+            for db in self._connections:
+                try:
+                    await db.close()
+                except Exception:
+                    logger.warning("Error closing connection", exc_info=True)
+        self._connections.clear()
+        logger.info("Closed connection pool for %s", self.db_path)
+
+
+_pools: dict[Path, ConnectionPool] = {}
+
+
+async def open_pool(db_path: Path, readers: int = 4) -> ConnectionPool:
+    """Open the connection pool used by :func:`get_db` for ``db_path``."""
+    key = Path(db_path)
+    pool = _pools.get(key)
+    if pool is None:
+        pool = ConnectionPool(db_path, readers)
+        await pool.open()
+        _pools[key] = pool
+    return pool
+
+
+async def close_pool(db_path: Path) -> None:
+    pool = _pools.pop(Path(db_path), None)
+    if pool is not None:
+        await pool.close()
+
+
+async def close_all_pools() -> None:
+    for key in list(_pools):
+        await _pools.pop(key).close()
 
 
 @asynccontextmanager
-async def get_db(db_path: Path):
-    """Async context manager for database connections."""
+async def get_db(db_path: Path, readonly: bool = False):
+    """Async context manager for database connections.
+
+    Uses the pool for ``db_path`` when one is open; set ``readonly`` for queries that
+    only read so they can run on a reader connection. Without a pool a connection is
+    opened for the duration of the block.
+    """
+    pool = _pools.get(Path(db_path))
+    if pool is not None:
+        async with pool.reader() if readonly else pool.writer() as db:
+            yield db
+        return
+
     db = await aiosqlite.connect(str(db_path))
     db.row_factory = aiosqlite.Row
     try:
         yield db
     finally:
         await db.close()
+
+
+_batchers: dict[Path, WriteBatcher] = {}
+
+
+def start_batcher(db_path: Path, max_latency: float = 0.005, max_batch: int = 64) -> WriteBatcher:
+    """Route :func:`run_write` calls for ``db_path`` through a group-commit batcher."""
+    key = Path(db_path)
+    batcher = _batchers.get(key)
+    if batcher is None:
+        batcher = WriteBatcher(functools.partial(get_db, db_path), max_latency, max_batch)
+        _batchers[key] = batcher
+    return batcher
+
+
+async def stop_batcher(db_path: Path) -> None:
+    batcher = _batchers.pop(Path(db_path), None)
+    if batcher is not None:
+        await batcher.close()
+
+
+async def run_write(db_path: Path, op: WriteOp[T]) -> T:
+    """Run a write operation and commit it.
+
+    ``op`` receives the connection and must not commit. With a batcher running the
+    commit is shared with other concurrent writes; otherwise it happens right away.
+    """
+    batcher = _batchers.get(Path(db_path))
+    if batcher is not None:
+        return await batcher.submit(op)
+    async with get_db(db_path) as db:
+        result = await op(db)
+        await db.commit()
+        return result
@@ -0,0 +1,428 @@
+"""Versioned schema migrations, tracked with SQLite's ``user_version``."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    sql: str
+
+
+# Append new migrations at the end; never edit one that has shipped.
+MIGRATIONS: list[Migration] = [
+    Migration(
+        1,
+        "Initial schema",
+        # IF NOT EXISTS so databases created before versioning are adopted as-is
+        """
+        CREATE TABLE IF NOT EXISTS tickets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT NOT NULL DEFAULT '',
+            status TEXT NOT NULL DEFAULT 'open',
+            priority TEXT NOT NULL DEFAULT 'medium',
+            category TEXT NOT NULL DEFAULT '',
+            requester_id TEXT NOT NULL DEFAULT '',
+            assignee_id TEXT NOT NULL DEFAULT '',
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            resolved_at TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS ticket_comments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ticket_id INTEGER NOT NULL,
+            author_id TEXT NOT NULL DEFAULT '',
+            content TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            FOREIGN KEY (ticket_id) REFERENCES tickets(id)
+        );
+
+        CREATE TABLE IF NOT EXISTS slack_events (
+            event_key TEXT PRIMARY KEY,
+            seen_at REAL NOT NULL
+        );
+        """,
+    ),
+    Migration(
+        2,
+        "Indexes for ticket listing and comment lookup",
+        # Each list_tickets filter is an equality followed by the created_at sort, so
+        # the composite indexes serve both the WHERE and the ORDER BY ... LIMIT.
+        """
+        CREATE INDEX IF NOT EXISTS idx_tickets_status_created
+            ON tickets (status, created_at);
+        CREATE INDEX IF NOT EXISTS idx_tickets_priority_created
+            ON tickets (priority, created_at);
+        CREATE INDEX IF NOT EXISTS idx_tickets_requester_created
+            ON tickets (requester_id, created_at);
+        CREATE INDEX IF NOT EXISTS idx_tickets_created
+            ON tickets (created_at);
+        CREATE INDEX IF NOT EXISTS idx_ticket_comments_ticket_created
+            ON ticket_comments (ticket_id, created_at);
+        CREATE INDEX IF NOT EXISTS idx_slack_events_seen_at
+            ON slack_events (seen_at);
+        """,
+    ),
+    Migration(
+        3,
+        "Full-text search over tickets and comments",
+        # External-content FTS5 tables: the text lives only in tickets/ticket_comments
+        # and the triggers keep the indexes in step, inside the writing transaction.
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS tickets_fts USING fts5(
+            title, description,
+            content='tickets', content_rowid='id', tokenize='porter unicode61'
+        );
+        CREATE VIRTUAL TABLE IF NOT EXISTS ticket_comments_fts USING fts5(
+            content,
+            content='ticket_comments', content_rowid='id', tokenize='porter unicode61'
+        );
+
+        CREATE TRIGGER IF NOT EXISTS tickets_fts_insert AFTER INSERT ON tickets BEGIN
+            INSERT INTO tickets_fts (rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END;
+        CREATE TRIGGER IF NOT EXISTS tickets_fts_delete AFTER DELETE ON tickets BEGIN
+            INSERT INTO tickets_fts (tickets_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+        END;
+        CREATE TRIGGER IF NOT EXISTS tickets_fts_update
+        AFTER UPDATE OF title, description ON tickets BEGIN
+            INSERT INTO tickets_fts (tickets_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO tickets_fts (rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS ticket_comments_fts_insert
+        AFTER INSERT ON ticket_comments BEGIN
+            INSERT INTO ticket_comments_fts (rowid, content) VALUES (new.id, new.content);
+        END;
+        CREATE TRIGGER IF NOT EXISTS ticket_comments_fts_delete
+        AFTER DELETE ON ticket_comments BEGIN
+            INSERT INTO ticket_comments_fts (ticket_comments_fts, rowid, content)
+            VALUES ('delete', old.id, old.content);
+        END;
+        CREATE TRIGGER IF NOT EXISTS ticket_comments_fts_update
+        AFTER UPDATE OF content ON ticket_comments BEGIN
+            INSERT INTO ticket_comments_fts (ticket_comments_fts, rowid, content)
+            VALUES ('delete', old.id, old.content);
+            INSERT INTO ticket_comments_fts (rowid, content) VALUES (new.id, new.content);
+        END;
+
+        -- Index rows that existed before this migration
+        INSERT INTO tickets_fts (tickets_fts) VALUES ('rebuild');
+        INSERT INTO ticket_comments_fts (ticket_comments_fts) VALUES ('rebuild');
+        """,
+    ),
+    Migration(
+        4,
+        "Summary tables for ticket counts and resolution times",
+        # Maintained by triggers, so every ticket write updates them in its own
+        # transaction. Resolution stats bucket resolved tickets by resolution day and
+        # current priority/category; each trigger removes a row's old contribution and
+        # adds its new one, which keeps the totals exact across any update.
+        """
+        CREATE TABLE IF NOT EXISTS ticket_counts (
+            status TEXT NOT NULL,
+            priority TEXT NOT NULL,
+            category TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (status, priority, category)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS ticket_resolution_stats (
+            day TEXT NOT NULL,
+            priority TEXT NOT NULL,
+            category TEXT NOT NULL,
+            resolved INTEGER NOT NULL,
+            total_seconds REAL NOT NULL,
+            PRIMARY KEY (day, priority, category)
+        ) WITHOUT ROWID;
+
+        CREATE TRIGGER IF NOT EXISTS ticket_counts_insert AFTER INSERT ON tickets BEGIN
+            INSERT INTO ticket_counts (status, priority, category, count)
+            VALUES (new.status, new.priority, new.category, 1)
+            ON CONFLICT DO UPDATE SET count = count + 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS ticket_counts_delete AFTER DELETE ON tickets BEGIN
+            UPDATE ticket_counts SET count = count - 1
+            WHERE status = old.status AND priority = old.priority AND category = old.category;
+        END;
+        CREATE TRIGGER IF NOT EXISTS ticket_counts_update
+        AFTER UPDATE OF status, priority, category ON tickets BEGIN
+            UPDATE ticket_counts SET count = count - 1
+            WHERE status = old.status AND priority = old.priority AND category = old.category;
+            INSERT INTO ticket_counts (status, priority, category, count)
+            VALUES (new.status, new.priority, new.category, 1)
+            ON CONFLICT DO UPDATE SET count = count + 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS ticket_resolution_insert
+        AFTER INSERT ON tickets WHEN new.resolved_at IS NOT NULL BEGIN
+            INSERT INTO ticket_resolution_stats
+            VALUES (substr(new.resolved_at, 1, 10), new.priority, new.category, 1,
+                    (julianday(new.resolved_at) - julianday(new.created_at)) * 86400)
+            ON CONFLICT DO UPDATE SET resolved = resolved + 1,
+                                      total_seconds = total_seconds + excluded.total_seconds;
+        END;
+        CREATE TRIGGER IF NOT EXISTS ticket_resolution_delete
+        AFTER DELETE ON tickets WHEN old.resolved_at IS NOT NULL BEGIN
+            UPDATE ticket_resolution_stats
+            SET resolved = resolved - 1,
+                total_seconds = total_seconds
+                    - (julianday(old.resolved_at) - julianday(old.created_at)) * 86400
+            WHERE day = substr(old.resolved_at, 1, 10)
+              AND priority = old.priority AND category = old.category;
+        END;
+        CREATE TRIGGER IF NOT EXISTS ticket_resolution_update_old
+        AFTER UPDATE OF resolved_at, created_at, priority, category ON tickets
+        WHEN old.resolved_at IS NOT NULL BEGIN
+            UPDATE ticket_resolution_stats
+            SET resolved = resolved - 1,
+                total_seconds = total_seconds
+                    - (julianday(old.resolved_at) - julianday(old.created_at)) * 86400
+            WHERE day = substr(old.resolved_at, 1, 10)
+              AND priority = old.priority AND category = old.category;
+        END;
+        CREATE TRIGGER IF NOT EXISTS ticket_resolution_update_new
+        AFTER UPDATE OF resolved_at, created_at, priority, category ON tickets
+        WHEN new.resolved_at IS NOT NULL BEGIN
+            INSERT INTO ticket_resolution_stats
+            VALUES (substr(new.resolved_at, 1, 10), new.priority, new.category, 1,
+                    (julianday(new.resolved_at) - julianday(new.created_at)) * 86400)
+            ON CONFLICT DO UPDATE SET resolved = resolved + 1,
+                                      total_seconds = total_seconds + excluded.total_seconds;
+        END;
+
+        -- Backfill from tickets that existed before this migration
+        INSERT INTO ticket_counts
+        SELECT status, priority, category, COUNT(*) FROM tickets
+        GROUP BY status, priority, category;
+        INSERT INTO ticket_resolution_stats
+        SELECT substr(resolved_at, 1, 10), priority, category, COUNT(*),
+               SUM((julianday(resolved_at) - julianday(created_at)) * 86400)
+        FROM tickets WHERE resolved_at IS NOT NULL
+        GROUP BY 1, 2, 3;
+        """,
+    ),
+    Migration(
+        5,
+        "Append-only ticket change log",
+        # Written by triggers, so each event commits atomically with its change. Writes
+        # are serialized, so events become visible in seq order.
+        """
+        CREATE TABLE IF NOT EXISTS ticket_events (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            ticket_id INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        );
+
+        CREATE TRIGGER IF NOT EXISTS ticket_events_created AFTER INSERT ON tickets BEGIN
+            INSERT INTO ticket_events (ticket_id, kind, payload, created_at)
+            VALUES (new.id, 'created', json_object(
+                'id', new.id,
+                'title', new.title,
+                'description', new.description,
+                'status', new.status,
+                'priority', new.priority,
+                'category', new.category,
+                'requester_id', new.requester_id,
+                'assignee_id', new.assignee_id,
+                'created_at', new.created_at,
+                'updated_at', new.updated_at,
+                'resolved_at', new.resolved_at
+            ), strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'));
+        END;
+        CREATE TRIGGER IF NOT EXISTS ticket_events_updated AFTER UPDATE ON tickets
+        WHEN old.title IS NOT new.title OR old.description IS NOT new.description
+          OR old.status IS NOT new.status OR old.priority IS NOT new.priority
+          OR old.category IS NOT new.category OR old.requester_id IS NOT new.requester_id
+          OR old.assignee_id IS NOT new.assignee_id OR old.created_at IS NOT new.created_at
+          OR old.updated_at IS NOT new.updated_at OR old.resolved_at IS NOT new.resolved_at
+        BEGIN
+            INSERT INTO ticket_events (ticket_id, kind, payload, created_at)
+            VALUES (new.id, 'updated', json_object(
+                'id', new.id,
+                'title', new.title,
+                'description', new.description,
+                'status', new.status,
+                'priority', new.priority,
+                'category', new.category,
+                'requester_id', new.requester_id,
+                'assignee_id', new.assignee_id,
+                'created_at', new.created_at,
+                'updated_at', new.updated_at,
+                'resolved_at', new.resolved_at
+            ), strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'));
+        END;
+        CREATE TRIGGER IF NOT EXISTS ticket_events_commented
+        AFTER INSERT ON ticket_comments BEGIN
+            INSERT INTO ticket_events (ticket_id, kind, payload, created_at)
+            VALUES (new.ticket_id, 'commented', json_object(
+                'id', new.id,
+                'ticket_id', new.ticket_id,
+                'author_id', new.author_id,
+                'content', new.content,
+                'created_at', new.created_at
+            ), strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'));
+        END;
+
+        -- Start the log with the current state, so a consumer reading from 0 gets everything
+        INSERT INTO ticket_events (ticket_id, kind, payload, created_at)
+        SELECT id, 'created', json_object(
+                   'id', id,
+                   'title', title,
+                   'description', description,
+                   'status', status,
+                   'priority', priority,
+                   'category', category,
+                   'requester_id', requester_id,
+                   'assignee_id', assignee_id,
+                   'created_at', created_at,
+                   'updated_at', updated_at,
+                   'resolved_at', resolved_at
+               ), strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')
+        FROM tickets ORDER BY id;
+        INSERT INTO ticket_events (ticket_id, kind, payload, created_at)
+        SELECT ticket_id, 'commented', json_object(
+                   'id', id,
+                   'ticket_id', ticket_id,
+                   'author_id', author_id,
+                   'content', content,
+                   'created_at', created_at
+               ), strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')
+        FROM ticket_comments ORDER BY id;
+        """,
+    ),
+    Migration(
+        6,
+        "Archive tables for old resolved and closed tickets",
+        # Same database as the hot tables, so moving a ticket is one atomic transaction.
+        # The archive triggers mirror the summary-table triggers on tickets, so the
+        # delete from tickets and the insert here cancel out and the stats keep
+        # covering archived tickets.
+        """
+        CREATE TABLE IF NOT EXISTS tickets_archive (
+            id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            description TEXT NOT NULL DEFAULT '',
+            status TEXT NOT NULL,
+            priority TEXT NOT NULL,
+            category TEXT NOT NULL DEFAULT '',
+            requester_id TEXT NOT NULL DEFAULT '',
+            assignee_id TEXT NOT NULL DEFAULT '',
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            resolved_at TEXT,
+            archived_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_tickets_archive_archived
+            ON tickets_archive (archived_at);
+
+        CREATE TABLE IF NOT EXISTS ticket_comments_archive (
+            id INTEGER PRIMARY KEY,
+            ticket_id INTEGER NOT NULL,
+            author_id TEXT NOT NULL DEFAULT '',
+            content TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_ticket_comments_archive_ticket_created
+            ON ticket_comments_archive (ticket_id, created_at);
+
+        CREATE TRIGGER IF NOT EXISTS tickets_archive_insert AFTER INSERT ON tickets_archive
+        BEGIN
+            INSERT INTO ticket_counts (status, priority, category, count)
+            VALUES (new.status, new.priority, new.category, 1)
+            ON CONFLICT DO UPDATE SET count = count + 1;
+            INSERT INTO ticket_events (ticket_id, kind, payload, created_at)
+            VALUES (new.id, 'archived', json_object('id', new.id, 'archived_at', new.archived_at),
+                    strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'));
+        END;
+        CREATE TRIGGER IF NOT EXISTS tickets_archive_insert_resolved
+        AFTER INSERT ON tickets_archive WHEN new.resolved_at IS NOT NULL BEGIN
+            INSERT INTO ticket_resolution_stats
+            VALUES (substr(new.resolved_at, 1, 10), new.priority, new.category, 1,
+                    (julianday(new.resolved_at) - julianday(new.created_at)) * 86400)
+            ON CONFLICT DO UPDATE SET resolved = resolved + 1,
+                                      total_seconds = total_seconds + excluded.total_seconds;
+        END;
+        CREATE TRIGGER IF NOT EXISTS tickets_archive_delete AFTER DELETE ON tickets_archive
+        BEGIN
+            UPDATE ticket_counts SET count = count - 1
+            WHERE status = old.status AND priority = old.priority AND category = old.category;
+        END;
+        CREATE TRIGGER IF NOT EXISTS tickets_archive_delete_resolved
+        AFTER DELETE ON tickets_archive WHEN old.resolved_at IS NOT NULL BEGIN
+            UPDATE ticket_resolution_stats
+            SET resolved = resolved - 1,
+                total_seconds = total_seconds
+                    - (julianday(old.resolved_at) - julianday(old.created_at)) * 86400
+            WHERE day = substr(old.resolved_at, 1, 10)
+              AND priority = old.priority AND category = old.category;
+        END;
+        """,
+    ),
+    Migration(
+        7,
+        "Log purged archive tickets in the change log",
+        # Rows only leave the archive when retention purges them, so change-log
+        # consumers can drop the ticket too
+        """
+        CREATE TRIGGER IF NOT EXISTS ticket_events_purged AFTER DELETE ON tickets_archive
+        BEGIN
+            INSERT INTO ticket_events (ticket_id, kind, payload, created_at)
+            VALUES (old.id, 'purged', json_object('id', old.id, 'archived_at', old.archived_at),
+                    strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'));
+        END;
+        """,
+    ),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+async def schema_version(db: aiosqlite.Connection) -> int:
+    cursor = await db.execute("PRAGMA user_version")
+    return (await cursor.fetchone())[0]
+
+
+async def migrate(db: aiosqlite.Connection, target: int | None = None) -> int:
+    """Apply pending migrations up to ``target`` (default: latest) and return the version.
+
+    Each migration runs in its own transaction together with the version bump, so a
+    failure leaves the database at the previous version.
+    """
+    target = LATEST_VERSION if target is None else target
+    current = await schema_version(db)
+    if current > LATEST_VERSION:
+        raise RuntimeError(
+            f"Database schema version {current} is newer than this code supports ({LATEST_VERSION})"
+        )
+
+    for migration in MIGRATIONS:
+        if migration.version <= current or migration.version > target:
+            continue
+        logger.info("Applying migration %d: %s", migration.version, migration.description)
+        try:
+            await db.executescript(
+                f"BEGIN;\n{migration.sql}\nPRAGMA user_version = {migration.version};\nCOMMIT;"
+            )
+        except Exception:
+            if db.in_transaction:
+                await db.rollback()
+            raise
+        current = migration.version
+    return current
@@ -2,10 +2,17 @@
 
 from __future__ import annotations
 
-from dataclasses import asdict, dataclass, field
+import sys
+from collections.abc import Sequence
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
 
+from it_agent import serialization
+
+# Slotted dataclasses (no per-instance __dict__) need Python 3.10+
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
 class TicketStatus(str, Enum):
     OPEN = "open"
@@ -26,7 +33,11 @@ def _now() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-@dataclass
+def _plain(value):
+    return value.value if isinstance(value, Enum) else value
+
+
+@dataclass(**_SLOTS)
 class Ticket:
     id: int | None = None
     title: str = ""
@@ -40,11 +51,28 @@ class Ticket:
     updated_at: str = field(default_factory=_now)
     resolved_at: str | None = None
 
+    @classmethod
+    def from_row(cls, row: Sequence) -> Ticket:
+        """Build from a row whose columns are in field order."""
+        return cls(*row)
+
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "status": _plain(self.status),
+            "priority": _plain(self.priority),
+            "category": self.category,
+            "requester_id": self.requester_id,
+            "assignee_id": self.assignee_id,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "resolved_at": self.resolved_at,
+        }
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class TicketComment:
     id: int | None = None
     ticket_id: int = 0
@@ -52,5 +80,75 @@ class TicketComment:
     content: str = ""
     created_at: str = field(default_factory=_now)
 
+    @classmethod
+    def from_row(cls, row: Sequence) -> TicketComment:
+        """Build from a row whose columns are in field order."""
+        return cls(*row)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "ticket_id": self.ticket_id,
+            "author_id": self.author_id,
+            "content": self.content,
+            "created_at": self.created_at,
+        }
+
+
+@dataclass(**_SLOTS)
+class TicketSearchHit:
+    """A ticket matching a full-text search, with the best-matching excerpt."""
+
+    id: int
+    title: str
+    status: str
+    priority: str
+    created_at: str
+    snippet: str
+    score: float
+
+    @classmethod
+    def from_row(cls, row: Sequence) -> TicketSearchHit:
+        """Build from a row whose columns are in field order."""
+        return cls(*row)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "status": _plain(self.status),
+            "priority": _plain(self.priority),
+            "created_at": self.created_at,
+            "snippet": self.snippet,
+            "score": self.score,
+        }
+
+
+@dataclass(**_SLOTS)
+class TicketEvent:
+    """An entry in the ticket change log.
+
+    ``kind`` is created, updated or commented, with the ticket row after the change or
+    the new comment as ``payload``; or archived or purged, with just the ticket id and
+    ``archived_at``.
+    """
+
+    seq: int
+    ticket_id: int
+    kind: str
+    payload: dict
+    created_at: str
+
+    @classmethod
+    def from_row(cls, row: Sequence) -> TicketEvent:
+        seq, ticket_id, kind, payload, created_at = row
+        return cls(seq, ticket_id, kind, serialization.loads(payload), created_at)
+
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {
+            "seq": self.seq,
+            "ticket_id": self.ticket_id,
+            "kind": self.kind,
+            "payload": self.payload,
+            "created_at": self.created_at,
+        }
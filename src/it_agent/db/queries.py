@@ -2,16 +2,59 @@
 
 from __future__ import annotations
 
+import asyncio
+import base64
+import re
+from collections.abc import AsyncIterator, Sequence
+from dataclasses import fields as dataclass_fields
 from datetime import datetime, timezone
 from pathlib import Path
 
-from it_agent.db.database import get_db
-from it_agent.db.models import Ticket, TicketComment, TicketStatus
+from it_agent.db.cache import MISSING, RowCache
+from it_agent.db.database import get_db, run_write
+from it_agent.db.models import (
+    Ticket,
+    TicketComment,
+    TicketEvent,
+    TicketSearchHit,
+    TicketStatus,
+)
+
+# Explicit column lists in dataclass field order, for the models' from_row
+_TICKET_COLUMNS = ", ".join(f.name for f in dataclass_fields(Ticket))
+_COMMENT_COLUMNS = ", ".join(f.name for f in dataclass_fields(TicketComment))
+_JOINED_TICKET_COLUMNS = ", ".join(f"t.{f.name}" for f in dataclass_fields(Ticket))
+_TICKET_WIDTH = len(dataclass_fields(Ticket))
+# Hot tables, then the archive of old resolved/closed tickets (see db/archive.py)
+_TICKET_TABLES = (("tickets", "ticket_comments"), ("tickets_archive", "ticket_comments_archive"))
+
+# Read-through cache of single tickets and comment lists, invalidated by the writes below
+_cache = RowCache()
+
+
+def configure_ticket_cache(enabled: bool = True, maxsize: int | None = None) -> None:
+    """Turn the ticket cache on or off (and resize it), discarding its contents."""
+    _cache.enabled = enabled
+    if maxsize is not None:
+        _cache.maxsize = maxsize
+    _cache.clear()
+
+
+def ticket_cache_stats() -> dict:
+    return _cache.stats()
+
+
+def invalidate_ticket(db_path: Path, ticket_id: int, comments: bool = True) -> None:
+    """Drop cached reads of a ticket, for writes made outside this module."""
+    _cache.invalidate((str(db_path), "ticket", ticket_id))
+    if comments:
+        _cache.invalidate((str(db_path), "comments", ticket_id))
 
 
 async def create_ticket(db_path: Path, ticket: Ticket) -> Ticket:
     """Create a new ticket and return it with its ID."""
-    async with get_db(db_path) as db:
+
+    async def insert(db) -> int:
         cursor = await db.execute(
             """INSERT INTO tickets (title, description, status, priority, category,
                                     requester_id, assignee_id, created_at, updated_at)
@@ -28,58 +71,156 @@ async def create_ticket(db_path: Path, ticket: Ticket) -> Ticket:
                 ticket.updated_at,
             ),
         )
-        await db.commit()
-        ticket.id = cursor.lastrowid
+        return cursor.lastrowid
+
+    ticket.id = await run_write(db_path, insert)
     return ticket
 
 
 async def get_ticket(db_path: Path, ticket_id: int) -> Ticket | None:
     """Get a ticket by ID."""
-    async with get_db(db_path) as db:
-        cursor = await db.execute("SELECT * FROM tickets WHERE id = ?", (ticket_id,))
+    key = (str(db_path), "ticket", ticket_id)
+    cached = _cache.get(key)
+    if cached is not MISSING:
+        return cached
+    generation = _cache.generation(key)
+
+    async with get_db(db_path, readonly=True) as db:
+        # Archived tickets are found transparently; the hot table is tried first
+        cursor = await db.execute(
+            f"""SELECT {_TICKET_COLUMNS} FROM tickets WHERE id = ?
+                UNION ALL
+                SELECT {_TICKET_COLUMNS} FROM tickets_archive WHERE id = ?
+                LIMIT 1""",  # noqa: S608
+            (ticket_id, ticket_id),
+        )
         row = await cursor.fetchone()
-        if row is None:
-            return None
-        return Ticket(**dict(row))
+    if row is None:
+        # Not cached: the ticket may be created by another process, e.g. a bulk import
+        return None
+    ticket = Ticket.from_row(row)
+    _cache.fill(key, ticket, generation)
+    return ticket
+
+
+async def get_ticket_with_comments(
+    db_path: Path, ticket_id: int
+) -> tuple[Ticket, list[TicketComment]] | None:
+    """Get a ticket and its comments in a single query."""
+    ticket_key = (str(db_path), "ticket", ticket_id)
+    comments_key = (str(db_path), "comments", ticket_id)
+    ticket = _cache.get(ticket_key)
+    if ticket is not MISSING:
+        comments = _cache.get(comments_key)
+        if comments is not MISSING:
+            return ticket, comments
+    generations = _cache.generation(ticket_key), _cache.generation(comments_key)
+
+    async with get_db(db_path, readonly=True) as db:
+        for tickets, comments in _TICKET_TABLES:
+            cursor = await db.execute(
+                f"""SELECT {_JOINED_TICKET_COLUMNS}, c.id, c.author_id, c.content, c.created_at
+                    FROM {tickets} t
+                    LEFT JOIN {comments} c ON c.ticket_id = t.id
+                    WHERE t.id = ?
+                    ORDER BY c.created_at, c.id""",  # noqa: S608
+                (ticket_id,),
+            )
+            rows = await cursor.fetchall()
+            if rows:
+                break
+    if not rows:
+        return None
 
+    ticket = Ticket.from_row(rows[0][:_TICKET_WIDTH])
+    comments = [
+        TicketComment(c_id, ticket_id, author_id, content, created_at)
+        for c_id, author_id, content, created_at in (row[_TICKET_WIDTH:] for row in rows)
+        if c_id is not None
+    ]
+    _cache.fill(ticket_key, ticket, generations[0])
+    _cache.fill(comments_key, comments, generations[1])
+    return ticket, comments
 
-async def update_ticket(db_path: Path, ticket_id: int, **updates) -> Ticket | None:
-    """Update a ticket's fields."""
+
+async def update_ticket(
+    db_path: Path, ticket_id: int, *, comment: TicketComment | None = None, **updates
+) -> Ticket | None:
+    """Update a ticket's fields and optionally add a comment, in one transaction.
+
+    Returns None (and adds no comment) if the ticket doesn't exist.
+    """
     allowed = {"status", "priority", "category", "assignee_id"}
     fields = {k: v for k, v in updates.items() if k in allowed and v is not None}
 
-    if not fields:
+    if not fields and comment is None:
         return await get_ticket(db_path, ticket_id)
 
-    now = datetime.now(timezone.utc).isoformat()
-    fields["updated_at"] = now
+    if fields:
+        now = datetime.now(timezone.utc).isoformat()
+        fields["updated_at"] = now
 
-    # Set resolved_at if status is resolved
-    if fields.get("status") == TicketStatus.RESOLVED:
-        fields["resolved_at"] = now
+        # Set resolved_at if status is resolved
+        if fields.get("status") == TicketStatus.RESOLVED:
+            fields["resolved_at"] = now
 
     set_clause = ", ".join(f"{k} = ?" for k in fields)
     values = list(fields.values()) + [ticket_id]
 
-    async with get_db(db_path) as db:
-        await db.execute(
-            f"UPDATE tickets SET {set_clause} WHERE id = ?",  # noqa: S608
-            values,
-        )
-        await db.commit()
+    async def apply(db) -> Ticket | None:
+        if fields:
+            cursor = await db.execute(
+                f"UPDATE tickets SET {set_clause} WHERE id = ? RETURNING {_TICKET_COLUMNS}",  # noqa: S608
+                values,
+            )
+        else:
+            cursor = await db.execute(
+                f"SELECT {_TICKET_COLUMNS} FROM tickets WHERE id = ?",  # noqa: S608
+                (ticket_id,),
+            )
+        rows = await cursor.fetchall()
+        if not rows:
+            return None
 
-    return await get_ticket(db_path, ticket_id)
+        if comment is not None:
+            comment.ticket_id = ticket_id
+            cursor = await db.execute(
+                """INSERT INTO ticket_comments (ticket_id, author_id, content, created_at)
+                   VALUES (?, ?, ?, ?)""",
+                (ticket_id, comment.author_id, comment.content, comment.created_at),
+            )
+            comment.id = cursor.lastrowid
+        return Ticket.from_row(rows[0])
 
+    ticket = await run_write(db_path, apply)
+    invalidate_ticket(db_path, ticket_id, comments=comment is not None)
+    return ticket
 
-async def list_tickets(
+
+def encode_cursor(ticket: Ticket) -> str:
+    """Opaque cursor pointing just past ``ticket`` in newest-first order."""
+    raw = f"{ticket.created_at}|{ticket.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, ticket_id = raw.rsplit("|", 1)
+        return created_at, int(ticket_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+async def _select_tickets(
     db_path: Path,
-    status: str | None = None,
-    priority: str | None = None,
-    requester_id: str | None = None,
-    limit: int = 10,
+    status: str | None,
+    priority: str | None,
+    requester_id: str | None,
+    after: tuple[str, int] | None,
+    limit: int,
 ) -> list[Ticket]:
-    """List tickets with optional filters."""
-    query = "SELECT * FROM tickets WHERE 1=1"
+    query = f"SELECT {_TICKET_COLUMNS} FROM tickets WHERE 1=1"  # noqa: S608
     params: list = []
 
     if status:
@@ -91,35 +232,259 @@ async def list_tickets(
     if requester_id:
         query += " AND requester_id = ?"
         params.append(requester_id)
+    if after is not None:
+        # Keyset condition: seeks straight to the page on the created_at indexes
+        query += " AND (created_at, id) < (?, ?)"
+        params.extend(after)
 
-    query += " ORDER BY created_at DESC LIMIT ?"
-    params.append(min(limit, 50))
+    query += " ORDER BY created_at DESC, id DESC LIMIT ?"
+    params.append(limit)
 
-    async with get_db(db_path) as db:
+    async with get_db(db_path, readonly=True) as db:
         cursor = await db.execute(query, params)
         rows = await cursor.fetchall()
-        return [Ticket(**dict(row)) for row in rows]
+        return [Ticket.from_row(row) for row in rows]
+
+
+async def list_tickets(
+    db_path: Path,
+    status: str | None = None,
+    priority: str | None = None,
+    requester_id: str | None = None,
+    limit: int = 10,
+    cursor: str | None = None,
+) -> list[Ticket]:
+    """List tickets with optional filters, newest first.
+
+    Pass ``encode_cursor(last_ticket)`` from one page as ``cursor`` to get the next.
+    """
+    after = _decode_cursor(cursor) if cursor else None
+    return await _select_tickets(
+        db_path, status, priority, requester_id, after, max(1, min(limit, 50))
+    )
+
+
+async def iter_tickets(
+    db_path: Path,
+    status: str | None = None,
+    priority: str | None = None,
+    requester_id: str | None = None,
+    batch_size: int = 500,
+) -> AsyncIterator[Ticket]:
+    """Yield every matching ticket, newest first, fetching ``batch_size`` rows at a time.
+
+    No connection is held between batches.
+    """
+    after = None
+    while True:
+        batch = await _select_tickets(db_path, status, priority, requester_id, after, batch_size)
+        for ticket in batch:
+            yield ticket
+        if len(batch) < batch_size:
+            return
+        after = (batch[-1].created_at, batch[-1].id)
+
+
+_SEARCH_TERM_RE = re.compile(r"\w+")
+
+# Best match per ticket across its title/description and its comments. bm25() is
+# lower for better matches; title hits weigh more than description hits.
+_SEARCH_SQL = """
+WITH matches AS (
+    SELECT rowid AS ticket_id,
+           bm25(tickets_fts, 5.0, 1.0) AS score,
+           snippet(tickets_fts, -1, '*', '*', '…', 12) AS snippet
+    FROM tickets_fts WHERE tickets_fts MATCH :query
+    UNION ALL
+    SELECT c.ticket_id,
+           bm25(ticket_comments_fts),
+           snippet(ticket_comments_fts, 0, '*', '*', '…', 12)
+    FROM ticket_comments_fts
+    JOIN ticket_comments c ON c.id = ticket_comments_fts.rowid
+    WHERE ticket_comments_fts MATCH :query
+),
+best AS (
+    SELECT ticket_id, MIN(score) AS score, snippet FROM matches GROUP BY ticket_id
+)
+SELECT t.id, t.title, t.status, t.priority, t.created_at, best.snippet, best.score
+FROM best JOIN tickets t ON t.id = best.ticket_id
+WHERE (:status IS NULL OR t.status = :status)
+ORDER BY best.score
+LIMIT :limit
+"""
+
+
+async def search_tickets(
+    db_path: Path, query: str, status: str | None = None, limit: int = 10
+) -> list[TicketSearchHit]:
+    """Full-text search over ticket titles, descriptions and comments, best first.
+
+    The query is treated as plain words, all of which must match; if that finds
+    nothing, tickets matching any of the words are returned instead.
+    """
+    terms = _SEARCH_TERM_RE.findall(query)
+    if not terms:
+        return []
+    # Quoting every term keeps FTS5 operators and punctuation in user text inert
+    quoted = [f'"{term}"' for term in terms]
+    params = {"status": status or None, "limit": max(1, min(limit, 50))}
+
+    async with get_db(db_path, readonly=True) as db:
+        for match in (" ".join(quoted), " OR ".join(quoted)):
+            cursor = await db.execute(_SEARCH_SQL, {**params, "query": match})
+            rows = await cursor.fetchall()
+            if rows or len(terms) == 1:
+                break
+    return [TicketSearchHit.from_row(row) for row in rows]
+
+
+_STAT_DIMENSIONS = ("status", "priority", "category")
+
+
+def _stat_filters(filters: dict[str, str | None]) -> tuple[str, list]:
+    clauses = [f"{name} = ?" for name, value in filters.items() if value]
+    params = [value for value in filters.values() if value]
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+async def ticket_counts(
+    db_path: Path,
+    status: str | None = None,
+    priority: str | None = None,
+    category: str | None = None,
+    group_by: Sequence[str] = (),
+) -> dict:
+    """Exact ticket counts from the ``ticket_counts`` summary table.
+
+    Returns ``{"total": n, "groups": [...]}`` with one group per combination of the
+    ``group_by`` dimensions (status, priority, category).
+    """
+    group_by = [g for g in _STAT_DIMENSIONS if g in group_by]
+    where, params = _stat_filters({"status": status, "priority": priority, "category": category})
+    columns = "".join(f"{g}, " for g in group_by)
+    query = f"SELECT {columns}SUM(count) AS count FROM ticket_counts{where}"  # noqa: S608
+    if group_by:
+        query += f" GROUP BY {', '.join(group_by)} HAVING SUM(count) > 0 ORDER BY count DESC"
+
+    async with get_db(db_path, readonly=True) as db:
+        cursor = await db.execute(query, params)
+        rows = [dict(row) for row in await cursor.fetchall()]
+    if not group_by:
+        return {"total": rows[0]["count"] or 0, "groups": []}
+    return {"total": sum(row["count"] for row in rows), "groups": rows}
+
+
+async def resolution_stats(
+    db_path: Path,
+    since: str | None = None,
+    until: str | None = None,
+    priority: str | None = None,
+    category: str | None = None,
+    group_by: Sequence[str] = (),
+) -> dict:
+    """Resolved-ticket count and mean time to resolve, from the summary table.
+
+    ``since``/``until`` are inclusive ``YYYY-MM-DD`` resolution dates. ``group_by``
+    may contain priority and/or category.
+    """
+    group_by = [g for g in ("priority", "category") if g in group_by]
+    where, params = _stat_filters({"priority": priority, "category": category})
+    for op, day in ((">=", since), ("<=", until)):
+        if day:
+            where += f"{' AND' if where else ' WHERE'} day {op} ?"
+            params.append(day[:10])
+    columns = "".join(f"{g}, " for g in group_by)
+    query = (
+        f"SELECT {columns}SUM(resolved) AS resolved, SUM(total_seconds) AS total_seconds"
+        f" FROM ticket_resolution_stats{where}"  # noqa: S608
+    )
+    if group_by:
+        query += f" GROUP BY {', '.join(group_by)} HAVING SUM(resolved) > 0"
+
+    async with get_db(db_path, readonly=True) as db:
+        cursor = await db.execute(query, params)
+        rows = [dict(row) for row in await cursor.fetchall()]
+
+    def summarize(row: dict) -> dict:
+        resolved = row.pop("resolved") or 0
+        total = row.pop("total_seconds") or 0.0
+        mean = total / resolved / 3600 if resolved else None
+        return {**row, "resolved": resolved, "mean_hours_to_resolve": mean}
+
+    if not group_by:
+        return summarize(rows[0])
+    overall = summarize(
+        {
+            "resolved": sum(row["resolved"] for row in rows),
+            "total_seconds": sum(row["total_seconds"] for row in rows),
+        }
+    )
+    return {**overall, "groups": [summarize(row) for row in rows]}
 
 
 async def add_comment(db_path: Path, comment: TicketComment) -> TicketComment:
     """Add a comment to a ticket."""
-    async with get_db(db_path) as db:
+
+    async def insert(db) -> int:
         cursor = await db.execute(
             """INSERT INTO ticket_comments (ticket_id, author_id, content, created_at)
                VALUES (?, ?, ?, ?)""",
             (comment.ticket_id, comment.author_id, comment.content, comment.created_at),
         )
-        await db.commit()
-        comment.id = cursor.lastrowid
+        return cursor.lastrowid
+
+    comment.id = await run_write(db_path, insert)
+    _cache.invalidate((str(db_path), "comments", comment.ticket_id))
     return comment
 
 
 async def get_comments(db_path: Path, ticket_id: int) -> list[TicketComment]:
     """Get all comments for a ticket."""
-    async with get_db(db_path) as db:
+    key = (str(db_path), "comments", ticket_id)
+    cached = _cache.get(key)
+    if cached is not MISSING:
+        return cached
+    generation = _cache.generation(key)
+
+    async with get_db(db_path, readonly=True) as db:
         cursor = await db.execute(
-            "SELECT * FROM ticket_comments WHERE ticket_id = ? ORDER BY created_at",
-            (ticket_id,),
+            f"""SELECT {_COMMENT_COLUMNS} FROM ticket_comments WHERE ticket_id = ?
+                UNION ALL
+                SELECT {_COMMENT_COLUMNS} FROM ticket_comments_archive WHERE ticket_id = ?
+                ORDER BY created_at, id""",  # noqa: S608
+            (ticket_id, ticket_id),
         )
         rows = await cursor.fetchall()
-        return [TicketComment(**dict(row)) for row in rows]
+    comments = [TicketComment.from_row(row) for row in rows]
+    _cache.fill(key, comments, generation)
+    return comments
+
+
+async def get_changes(db_path: Path, since_seq: int = 0, limit: int = 500) -> list[TicketEvent]:
+    """Change-log events with ``seq`` greater than ``since_seq``, oldest first.
+
+    Pass the last event's ``seq`` back as ``since_seq`` to continue from where a
+    previous call stopped.
+    """
+    async with get_db(db_path, readonly=True) as db:
+        cursor = await db.execute(
+            """SELECT seq, ticket_id, kind, payload, created_at FROM ticket_events
+               WHERE seq > ? ORDER BY seq LIMIT ?""",
+            (since_seq, limit),
+        )
+        rows = await cursor.fetchall()
+    return [TicketEvent.from_row(row) for row in rows]
+
+
+async def tail_changes(
+    db_path: Path, since_seq: int = 0, poll_interval: float = 1.0, batch_size: int = 500
+) -> AsyncIterator[TicketEvent]:
+    """Yield change-log events after ``since_seq`` forever, polling for new ones."""
+    while True:
+        events = await get_changes(db_path, since_seq, batch_size)
+        for event in events:
+            yield event
+        if events:
+            since_seq = events[-1].seq
+        if len(events) < batch_size:
+            await asyncio.sleep(poll_interval)
@@ -2,14 +2,23 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
+import os
 import re
 from pathlib import Path
 
-from it_agent.knowledge.store import get_client, get_collection
+from it_agent.knowledge.store import get_client, get_collection, reset_cache
 
 logger = logging.getLogger(__name__)
 
+_COLLECTION_NAME = "it_knowledge_base"
+_SHADOW_NAME = "it_knowledge_base_shadow"
+_RETIRED_NAME = "it_knowledge_base_retired"
+_MANIFEST_NAME = "kb_manifest.json"
+_MANIFEST_VERSION = 1
+
 
 def _split_markdown(text: str, source: str) -> list[dict]:
     """Split a markdown file into chunks by headers."""
@@ -40,38 +49,162 @@ def _split_markdown(text: str, source: str) -> list[dict]:
     return chunks
 
 
-def index_docs(docs_path: Path, chroma_path: Path) -> int:
-    """Index all markdown files from docs_path into ChromaDB. Returns count of chunks indexed."""
-    client = get_client(chroma_path)
-    # Delete and recreate to do a fresh index
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _chunk_hash(chunk: dict) -> str:
+    payload = json.dumps([chunk["content"], chunk["metadata"]], sort_keys=True)
+    return _sha256(payload.encode("utf-8"))
+
+
+def _load_manifest(chroma_path: Path) -> dict:
     try:
-        client.delete_collection("it_knowledge_base")
+        manifest = json.loads((chroma_path / _MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get("version") == _MANIFEST_VERSION else {}
+
+
+def _save_manifest(chroma_path: Path, collection_id: str, files: dict) -> None:
+    manifest = {"version": _MANIFEST_VERSION, "collection": collection_id, "files": files}
+    path = chroma_path / _MANIFEST_NAME
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _scan(docs_path: Path) -> dict[str, Path]:
+    """Markdown files under docs_path, keyed by their relative path."""
+    return {p.relative_to(docs_path).as_posix(): p for p in sorted(docs_path.glob("**/*.md"))}
+
+
+def _batches(items: list, size: int):
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def _upsert(collection, chunks: list[dict], batch_size: int) -> None:
+    for batch in _batches(chunks, batch_size):
+        collection.upsert(
+            ids=[c["id"] for c in batch],
+            documents=[c["content"] for c in batch],
+            metadatas=[c["metadata"] for c in batch],
+        )
+
+
+def _drop(client, name: str) -> None:
+    try:
+        client.delete_collection(name)
     except Exception:
         pass
+
+
+def index_docs(docs_path: Path, chroma_path: Path, full: bool = False) -> int:
+    """Index markdown files from docs_path into ChromaDB. Returns count of chunks written.
+
+    Only chunks whose content changed since the last run are re-embedded, and chunks of
+    edited or deleted files that no longer exist are removed. A manifest of per-file
+    and per-chunk hashes is kept next to the ChromaDB data. ``full`` rebuilds everything
+    into a shadow collection and swaps it in, so searches keep working meanwhile.
+    """
+    if full:
+        return _rebuild(docs_path, chroma_path)
+
+    client = get_client(chroma_path)
     collection = get_collection(client)
+    batch_size = client.get_max_batch_size()
+
+    manifest = _load_manifest(chroma_path)
+    existing_ids: set[str] | None = None
+    if manifest.get("collection") == str(collection.id):
+        previous = manifest["files"]
+    else:
+        # No manifest for this collection: re-embed everything, drop whatever else is there
+        logger.info("No index manifest for this collection, reindexing all files")
+        previous = {}
+        existing_ids = set(collection.get(include=[])["ids"])
+
+    md_files = _scan(docs_path)
+    logger.info("Found %d markdown files in %s", len(md_files), docs_path)
+
+    files: dict[str, dict] = {}
+    upserts: list[dict] = []
+    stale: set[str] = set()
+    for rel, md_file in md_files.items():
+        data = md_file.read_bytes()
+        file_hash = _sha256(data)
+        old = previous.get(rel)
+        if old is not None and old["hash"] == file_hash:
+            files[rel] = old
+            continue
+
+        old_chunks = old["chunks"] if old is not None else {}
+        chunks: dict[str, str] = {}
+        for chunk in _split_markdown(data.decode("utf-8"), md_file.stem):
+            chunk_hash = _chunk_hash(chunk)
+            chunks[chunk["id"]] = chunk_hash
+            if old_chunks.get(chunk["id"]) != chunk_hash:
+                upserts.append(chunk)
+        stale.update(old_chunks.keys() - chunks.keys())
+        files[rel] = {"hash": file_hash, "chunks": chunks}
+
+    for rel in previous.keys() - files.keys():
+        stale.update(previous[rel]["chunks"])
+    if existing_ids is not None:
+        stale = existing_ids - {cid for f in files.values() for cid in f["chunks"]}
+    # A file that moved keeps its chunk ids; those are rewritten, not deleted
+    stale -= {c["id"] for c in upserts}
+
+    for batch in _batches(sorted(stale), batch_size):
+        collection.delete(ids=batch)
+    _upsert(collection, upserts, batch_size)
+    _save_manifest(chroma_path, str(collection.id), files)
+
+    logger.info(
+        "Indexed %d changed chunks, removed %d, from %d files",
+        len(upserts),
+        len(stale),
+        len(md_files),
+    )
+    return len(upserts)
 
-    all_chunks = []
-    md_files = list(docs_path.glob("**/*.md"))
+
+def _rebuild(docs_path: Path, chroma_path: Path) -> int:
+    client = get_client(chroma_path)
+    _drop(client, _SHADOW_NAME)
+    _drop(client, _RETIRED_NAME)
+    shadow = get_collection(client, _SHADOW_NAME)
+
+    md_files = _scan(docs_path)
     logger.info("Found %d markdown files in %s", len(md_files), docs_path)
 
-    for md_file in md_files:
-        text = md_file.read_text(encoding="utf-8")
-        source = md_file.stem
-        chunks = _split_markdown(text, source)
+    files: dict[str, dict] = {}
+    all_chunks: list[dict] = []
+    for rel, md_file in md_files.items():
+        data = md_file.read_bytes()
+        chunks = _split_markdown(data.decode("utf-8"), md_file.stem)
+        files[rel] = {"hash": _sha256(data), "chunks": {c["id"]: _chunk_hash(c) for c in chunks}}
         all_chunks.extend(chunks)
 
     if not all_chunks:
         logger.warning("No chunks to index")
-        return 0
-
-    # Batch add to ChromaDB
-    collection.add(
-        ids=[c["id"] for c in all_chunks],
-        documents=[c["content"] for c in all_chunks],
-        metadatas=[c["metadata"] for c in all_chunks],
-    )
+    _upsert(shadow, all_chunks, client.get_max_batch_size())
 
-    logger.info("Indexed %d chunks from %d files", len(all_chunks), len(md_files))
+    # Swap: searches holding the old collection keep working until it is dropped, then
+    # reopen by name and find the new one
+    get_collection(client).modify(name=_RETIRED_NAME)
+    try:
+        shadow.modify(name=_COLLECTION_NAME)
+    except Exception:
+        # A search opened (and so created) an empty collection in the gap; replace it
+        client.delete_collection(_COLLECTION_NAME)
+        shadow.modify(name=_COLLECTION_NAME)
+    client.delete_collection(_RETIRED_NAME)
+    _save_manifest(chroma_path, str(shadow.id), files)
+    reset_cache(chroma_path)
+
+    logger.info("Rebuilt index with %d chunks from %d files", len(all_chunks), len(md_files))
     return len(all_chunks)
 
 
@@ -88,9 +221,14 @@ def main() -> None:
     parser.add_argument(
         "--chroma", type=Path, default=Path("chroma_data"), help="ChromaDB storage path"
     )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Rebuild the whole index instead of only re-embedding changed docs",
+    )
     args = parser.parse_args()
 
-    count = index_docs(args.docs, args.chroma)
+    count = index_docs(args.docs, args.chroma, full=args.full)
     print(f"Indexed {count} chunks")
 
 
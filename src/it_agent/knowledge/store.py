@@ -2,7 +2,10 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import chromadb
@@ -11,46 +14,130 @@ logger = logging.getLogger(__name__)
 
 _COLLECTION_NAME = "it_knowledge_base"
 
+# Process-wide collection handles, keyed by storage path. Opening a client reloads the
+# on-disk store and HNSW index, and each new collection handle loads the embedding model.
+_collections: dict[Path, chromadb.Collection] = {}
+_lock = threading.Lock()
+
+# Searches run here rather than on the loop's default executor, which is shared with
+# DNS lookups and disk checks
+_executor: ThreadPoolExecutor | None = None
+_DEFAULT_WORKERS = 2
+
 
 def get_client(chroma_path: Path) -> chromadb.ClientAPI:
     """Get a persistent ChromaDB client."""
     return chromadb.PersistentClient(path=str(chroma_path))
 
 
-def get_collection(client: chromadb.ClientAPI) -> chromadb.Collection:
-    """Get or create the knowledge base collection."""
+def get_collection(client: chromadb.ClientAPI, name: str = _COLLECTION_NAME) -> chromadb.Collection:
+    """Get or create the knowledge base collection (or another one with its settings)."""
     return client.get_or_create_collection(
-        name=_COLLECTION_NAME,
+        name=name,
         metadata={"hnsw:space": "cosine"},
     )
 
 
+def _get_collection(chroma_path: Path) -> chromadb.Collection:
+    key = Path(chroma_path)
+    collection = _collections.get(key)
+    if collection is None:
+        with _lock:
+            collection = _collections.get(key)
+            if collection is None:
+                collection = get_collection(get_client(key))
+                _collections[key] = collection
+    return collection
+
+
+def reset_cache(chroma_path: Path | None = None) -> None:
+    """Drop the cached collection for ``chroma_path`` (or all of them).
+
+    The next search reopens it, e.g. after the collection was rebuilt elsewhere.
+    """
+    with _lock:
+        if chroma_path is None:
+            _collections.clear()
+        else:
+            _collections.pop(Path(chroma_path), None)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        configure_search_pool(_DEFAULT_WORKERS)
+    return _executor
+
+
+def configure_search_pool(workers: int) -> None:
+    """(Re)create the thread pool searches run on with ``workers`` threads."""
+    global _executor
+    shutdown_search_pool()
+    _executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="kb-search")
+
+
+def shutdown_search_pool() -> None:
+    """Stop the search thread pool; it is recreated on the next search."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+def _query(chroma_path: Path, query: str, n_results: int) -> list[dict]:
+    collection = _get_collection(chroma_path)
+    if collection.count() == 0:
+        return []
+
+    results = collection.query(
+        query_texts=[query],
+        n_results=min(n_results, 10),
+    )
+
+    docs = []
+    for i in range(len(results["ids"][0])):
+        doc = {
+            "id": results["ids"][0][i],
+            "content": results["documents"][0][i],
+            "distance": results["distances"][0][i] if results.get("distances") else None,
+        }
+        if results.get("metadatas") and results["metadatas"][0][i]:
+            doc["metadata"] = results["metadatas"][0][i]
+        docs.append(doc)
+    return docs
+
+
+def _search(chroma_path: Path, query: str, n_results: int) -> list[dict]:
+    try:
+        return _query(chroma_path, query, n_results)
+    except Exception:
+        # The cached handle may be stale (collection rebuilt or store reset); reopen once
+        logger.warning("Knowledge base query failed, reopening collection", exc_info=True)
+        reset_cache(chroma_path)
+        return _query(chroma_path, query, n_results)
+
+
+def _warmup(chroma_path: Path) -> None:
+    collection = _get_collection(chroma_path)
+    # Load the embedding model even while the collection is still empty, so the first
+    # search after indexing does not pay for it
+    embed = getattr(collection, "_embedding_function", None)
+    if embed is not None:
+        embed(["warmup"])
+    if collection.count():
+        # One real query loads the HNSW index
+        collection.query(query_texts=["warmup"], n_results=1)
+
+
+async def warmup(chroma_path: Path) -> None:
+    """Open the collection, embed one dummy string and query once, so the first search
+    is fast.
+    """
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(_get_executor(), _warmup, chroma_path)
+
+
 async def search(chroma_path: Path, query: str, n_results: int = 3) -> list[dict]:
     """Search the knowledge base and return matching documents."""
-    import asyncio
-
-    def _search():
-        client = get_client(chroma_path)
-        collection = get_collection(client)
-
-        if collection.count() == 0:
-            return []
-
-        results = collection.query(
-            query_texts=[query],
-            n_results=min(n_results, 10),
-        )
-
-        docs = []
-        for i in range(len(results["ids"][0])):
-            doc = {
-                "id": results["ids"][0][i],
-                "content": results["documents"][0][i],
-                "distance": results["distances"][0][i] if results.get("distances") else None,
-            }
-            if results.get("metadatas") and results["metadatas"][0][i]:
-                doc["metadata"] = results["metadatas"][0][i]
-            docs.append(doc)
-        return docs
-
-    return await asyncio.get_event_loop().run_in_executor(None, _search)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), _search, chroma_path, query, n_results)
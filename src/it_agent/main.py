@@ -1,9 +1,21 @@
 import asyncio
+import contextlib
 import logging
 
 from it_agent.bot.app import create_app, start_app
 from it_agent.config import get_settings
-from it_agent.db.database import init_db
+from it_agent.db.archive import run_archival
+from it_agent.db.database import (
+    close_all_pools,
+    init_db,
+    open_pool,
+    start_batcher,
+    stop_batcher,
+)
+from it_agent.db.queries import configure_ticket_cache
+from it_agent.knowledge.store import configure_search_pool, shutdown_search_pool, warmup
+
+logger = logging.getLogger(__name__)
 
 
 def main() -> None:
@@ -17,8 +29,42 @@ def main() -> None:
 
 async def _start(settings) -> None:
     await init_db(settings.db_path)
-    app = create_app(settings)
-    await start_app(app, settings)
+    await open_pool(settings.db_path, readers=settings.db_pool_readers)
+    configure_ticket_cache(settings.ticket_cache_enabled, settings.ticket_cache_size)
+    if settings.db_write_batching:
+        start_batcher(
+            settings.db_path,
+            max_latency=settings.db_batch_max_latency,
+            max_batch=settings.db_batch_max_size,
+        )
+    configure_search_pool(settings.knowledge_search_workers)
+    if settings.knowledge_warmup:
+        try:
+            await warmup(settings.chroma_path)
+        except Exception:
+            # Searches retry on their own; a cold start is not worth failing over
+            logger.warning("Knowledge base warmup failed", exc_info=True)
+    archival = None
+    if settings.archive_after_days > 0:
+        archival = asyncio.ensure_future(
+            run_archival(
+                settings.db_path,
+                settings.archive_after_days,
+                settings.archive_retention_days,
+                settings.archive_interval,
+            )
+        )
+    try:
+        app = create_app(settings)
+        await start_app(app, settings)
+    finally:
+        if archival is not None:
+            archival.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await archival
+        await stop_batcher(settings.db_path)
+        await close_all_pools()
+        shutdown_search_pool()
 
 
 if __name__ == "__main__":
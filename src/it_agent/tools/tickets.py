@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from datetime import datetime, timedelta, timezone
+
 from it_agent.config import Settings
 from it_agent.db import queries
 from it_agent.db.models import Ticket, TicketComment
@@ -40,11 +42,11 @@ async def get_ticket(
     if _settings is None:
         return {"error": "Settings not configured"}
 
-    ticket = await queries.get_ticket(_settings.db_path, ticket_id)
-    if ticket is None:
+    found = await queries.get_ticket_with_comments(_settings.db_path, ticket_id)
+    if found is None:
         return {"error": f"Ticket #{ticket_id} not found"}
 
-    comments = await queries.get_comments(_settings.db_path, ticket_id)
+    ticket, comments = found
     return {
         "ticket": ticket.to_dict(),
         "comments": [c.to_dict() for c in comments],
@@ -65,26 +67,23 @@ async def update_ticket(
     if _settings is None:
         return {"error": "Settings not configured"}
 
-    # Update ticket fields
+    # Field update and comment are written together, or not at all
+    tc = (
+        TicketComment(ticket_id=ticket_id, author_id=_user_id, content=comment) if comment else None
+    )
     ticket = await queries.update_ticket(
         _settings.db_path,
         ticket_id,
+        comment=tc,
         status=status,
         priority=priority,
         assignee_id=assignee_id,
     )
     if ticket is None:
+        if await queries.get_ticket(_settings.db_path, ticket_id) is not None:
+            return {"error": f"Ticket #{ticket_id} is archived and can no longer be changed"}
         return {"error": f"Ticket #{ticket_id} not found"}
 
-    # Add comment if provided
-    if comment:
-        tc = TicketComment(
-            ticket_id=ticket_id,
-            author_id=_user_id,
-            content=comment,
-        )
-        await queries.add_comment(_settings.db_path, tc)
-
     return {"success": True, "ticket": ticket.to_dict()}
 
 
@@ -93,18 +92,79 @@ async def list_tickets(
     priority: str | None = None,
     requester_id: str | None = None,
     limit: int = 10,
+    cursor: str | None = None,
     _settings: Settings | None = None,
     **_,
 ) -> dict:
-    """List tickets with optional filters."""
+    """List tickets with optional filters, one page at a time."""
     if _settings is None:
         return {"error": "Settings not configured"}
 
-    tickets = await queries.list_tickets(
-        _settings.db_path,
-        status=status,
-        priority=priority,
-        requester_id=requester_id,
-        limit=limit,
-    )
-    return {"tickets": [t.to_dict() for t in tickets], "count": len(tickets)}
+    try:
+        tickets = await queries.list_tickets(
+            _settings.db_path,
+            status=status,
+            priority=priority,
+            requester_id=requester_id,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        return {"error": str(e)}
+
+    result = {"tickets": [t.to_dict() for t in tickets], "count": len(tickets)}
+    # A full page means there may be more
+    if tickets and len(tickets) == max(1, min(limit, 50)):
+        result["next_cursor"] = queries.encode_cursor(tickets[-1])
+    return result
+
+
+async def search_tickets(
+    query: str,
+    status: str | None = None,
+    limit: int = 10,
+    _settings: Settings | None = None,
+    **_,
+) -> dict:
+    """Full-text search over tickets and their comments."""
+    if _settings is None:
+        return {"error": "Settings not configured"}
+
+    hits = await queries.search_tickets(_settings.db_path, query, status=status, limit=limit)
+    return {"results": [h.to_dict() for h in hits], "count": len(hits)}
+
+
+async def ticket_stats(
+    metric: str = "counts",
+    status: str | None = None,
+    priority: str | None = None,
+    category: str | None = None,
+    group_by: list[str] | None = None,
+    days: int = 7,
+    _settings: Settings | None = None,
+    **_,
+) -> dict:
+    """Exact ticket counts or resolution-time statistics."""
+    if _settings is None:
+        return {"error": "Settings not configured"}
+
+    group_by = group_by or []
+    if metric == "counts":
+        return await queries.ticket_counts(
+            _settings.db_path,
+            status=status,
+            priority=priority,
+            category=category,
+            group_by=group_by,
+        )
+    if metric == "resolution_time":
+        since = (datetime.now(timezone.utc) - timedelta(days=max(1, days) - 1)).date()
+        stats = await queries.resolution_stats(
+            _settings.db_path,
+            since=since.isoformat(),
+            priority=priority,
+            category=category,
+            group_by=group_by,
+        )
+        return {"since": since.isoformat(), **stats}
+    return {"error": f"Unknown metric: {metric}"}
@@ -0,0 +1,253 @@
+"""Tests for the agent tool loop."""
+
+from __future__ import annotations
+
+import anthropic
+import httpx
+import pytest
+from anthropic.types import Message, TextBlock, ToolUseBlock, Usage
+
+from it_agent.agent import core, executor
+from it_agent.config import Settings
+
+
+def _message(content, stop_reason, **usage) -> Message:
+    return Message(
+        id="msg_test",
+        type="message",
+        role="assistant",
+        model="claude-test",
+        content=content,
+        stop_reason=stop_reason,
+        usage=Usage(input_tokens=100, output_tokens=20, **usage),
+    )
+
+
+class FakeMessages:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests: list[dict] = []
+
+    async def create(self, **params):
+        self.requests.append(params)
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def settings(tmp_path):
+    return Settings(
+        slack_bot_token="xoxb-test",
+        slack_app_token="xapp-test",
+        anthropic_api_key="sk-test",
+        db_path=tmp_path / "tickets.db",
+        chroma_path=tmp_path / "chroma",
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_result_cache():
+    executor._result_cache.clear()
+    yield
+    executor._result_cache.clear()
+
+
+@pytest.fixture
+def ping_tool(monkeypatch):
+    async def fake_ping(host: str, **_):
+        return {"status": "reachable", "host": host}
+
+    monkeypatch.setitem(executor._TOOL_HANDLERS, "ping_host", fake_ping)
+
+
+def _agent(settings, responses) -> core.Agent:
+    agent = core.Agent(settings)
+    agent.client.messages = FakeMessages(responses)
+    return agent
+
+
+@pytest.mark.asyncio
+async def test_tool_loop(settings, ping_tool):
+    agent = _agent(
+        settings,
+        [
+            _message(
+                [ToolUseBlock(type="tool_use", id="tu_1", name="ping_host", input={"host": "a"})],
+                "tool_use",
+            ),
+            _message([TextBlock(type="text", text="Host a is up.")], "end_turn"),
+        ],
+    )
+    result = await agent.run([{"role": "user", "content": "is a up?"}])
+    assert result.text == "Host a is up."
+
+    second = agent.client.messages.requests[1]["messages"]
+    assert second[-1]["content"][0]["tool_use_id"] == "tu_1"
+    assert '"reachable"' in second[-1]["content"][0]["content"]
+
+
+@pytest.mark.asyncio
+async def test_prompt_cache_breakpoints_and_usage(settings):
+    agent = _agent(
+        settings,
+        [
+            _message(
+                [TextBlock(type="text", text="Hi")],
+                "end_turn",
+                cache_creation_input_tokens=50,
+                cache_read_input_tokens=1500,
+            )
+        ],
+    )
+    history = [
+        {"role": "user", "content": "first"},
+        {"role": "assistant", "content": "reply"},
+        {"role": "user", "content": "second"},
+    ]
+    await agent.run(history)
+
+    request = agent.client.messages.requests[0]
+    assert request["system"][-1]["cache_control"] == {"type": "ephemeral"}
+    marked = [m for m in request["messages"] if not isinstance(m["content"], str)]
+    assert [m["content"][-1]["text"] for m in marked] == ["first", "second"]
+    # The caller's history is not modified
+    assert history[0]["content"] == "first"
+
+    assert agent.usage["cache_read_input_tokens"] == 1500
+    assert agent.usage["cache_creation_input_tokens"] == 50
+
+
+@pytest.mark.asyncio
+async def test_prompt_caching_disabled(settings):
+    settings.prompt_caching = False
+    agent = _agent(settings, [_message([TextBlock(type="text", text="Hi")], "end_turn")])
+    await agent.run([{"role": "user", "content": "hello"}])
+    request = agent.client.messages.requests[0]
+    assert request["system"] == core.SYSTEM_PROMPT
+    assert request["messages"][0]["content"] == "hello"
+
+
+@pytest.mark.asyncio
+async def test_transcript_keeps_compacted_tool_turns(settings, monkeypatch):
+    async def noisy_ping(host: str, **_):
+        return {"status": "reachable", "host": host, "output": "64 bytes from a\n" * 500}
+
+    monkeypatch.setitem(executor._TOOL_HANDLERS, "ping_host", noisy_ping)
+    settings.transcript_tool_result_chars = 1000
+    agent = _agent(
+        settings,
+        [
+            _message(
+                [
+                    TextBlock(type="text", text="Checking."),
+                    ToolUseBlock(type="tool_use", id="tu_1", name="ping_host", input={"host": "a"}),
+                ],
+                "tool_use",
+            ),
+            _message([TextBlock(type="text", text="Host a is up.")], "end_turn"),
+        ],
+    )
+    result = await agent.run([{"role": "user", "content": "is a up?"}])
+
+    assistant, tool_results, final = result.transcript
+    assert assistant["content"][1] == {
+        "type": "tool_use",
+        "id": "tu_1",
+        "name": "ping_host",
+        "input": {"host": "a"},
+    }
+    stored = tool_results["content"][0]
+    assert stored["tool_use_id"] == "tu_1"
+    assert len(stored["content"]) <= 1100
+    assert '"reachable"' in stored["content"]
+    assert final == {"role": "assistant", "content": "Host a is up."}
+
+    # Claude itself saw the full result during the run
+    sent = agent.client.messages.requests[1]["messages"][-1]["content"][0]["content"]
+    assert len(sent) > 5000
+
+
+class FakeStream:
+    """Streams text deltas, failing with ``error`` after ``fail_after`` of them."""
+
+    def __init__(self, texts, error=None, fail_after=0):
+        self.texts = texts
+        self.error = error
+        self.fail_after = fail_after
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def __aiter__(self):
+        for i, text in enumerate(self.texts):
+            if self.error is not None and i == self.fail_after:
+                raise self.error
+            yield type("TextEvent", (), {"type": "text", "text": text})()
+        if self.error is not None:
+            raise self.error
+
+    async def get_final_message(self):
+        return _message([TextBlock(type="text", text="".join(self.texts))], "end_turn")
+
+
+def _streaming_agent(settings, streams) -> core.Agent:
+    agent = core.Agent(settings)
+    agent.scheduler.base_delay = 0.001
+    pending = list(streams)
+    agent.client.messages.stream = lambda **params: pending.pop(0)
+    return agent
+
+
+def _connection_error() -> anthropic.APIConnectionError:
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    return anthropic.APIConnectionError(request=request)
+
+
+@pytest.mark.asyncio
+async def test_stream_failing_before_output_is_retried(settings):
+    deltas = []
+
+    async def on_text(delta):
+        deltas.append(delta)
+
+    agent = _streaming_agent(
+        settings,
+        [FakeStream(["Hel", "lo"], _connection_error(), fail_after=0), FakeStream(["Hel", "lo"])],
+    )
+    result = await agent.run([{"role": "user", "content": "hi"}], on_text=on_text)
+    assert result.text == "Hello"
+    assert deltas == ["Hel", "lo"]
+
+
+@pytest.mark.asyncio
+async def test_stream_failing_after_output_is_not_retried(settings):
+    deltas = []
+
+    async def on_text(delta):
+        deltas.append(delta)
+
+    agent = _streaming_agent(
+        settings,
+        [FakeStream(["Hel", "lo"], _connection_error(), fail_after=1), FakeStream(["Hel", "lo"])],
+    )
+    with pytest.raises(core.StreamInterruptedError):
+        await agent.run([{"role": "user", "content": "hi"}], on_text=on_text)
+    # The partial answer was not streamed a second time
+    assert deltas == ["Hel"]
+
+
+@pytest.mark.asyncio
+async def test_count_tokens_includes_system_and_tools(settings):
+    agent = core.Agent(settings)
+    sent = {}
+
+    async def count_tokens(**params):
+        sent.update(params)
+        return type("Count", (), {"input_tokens": 1234})()
+
+    agent.client.messages.count_tokens = count_tokens
+    assert await agent.count_tokens([{"role": "user", "content": "hi"}]) == 1234
+    assert sent["system"] == core.SYSTEM_PROMPT
+    assert sent["tools"] == core.TOOLS
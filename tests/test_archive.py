@@ -0,0 +1,110 @@
+"""Tests for ticket archival."""
+
+from __future__ import annotations
+
+import aiosqlite
+import pytest
+
+from it_agent.config import Settings
+from it_agent.db import queries
+from it_agent.db.archive import archive_tickets, compact_archive
+from it_agent.db.database import close_pool, init_db, open_pool
+from it_agent.db.models import Ticket, TicketComment
+from it_agent.tools import tickets as ticket_tools
+
+OLD = "2020-01-01T00:00:00+00:00"
+
+
+@pytest.fixture(params=["direct", "pooled"])
+async def db_path(request, tmp_path):
+    path = tmp_path / "archive.db"
+    await init_db(path)
+    if request.param == "pooled":
+        await open_pool(path, readers=2)
+    yield path
+    await close_pool(path)
+
+
+async def _ticket(db_path, status: str, updated_at: str = OLD, **kwargs) -> Ticket:
+    ticket = await queries.create_ticket(
+        db_path, Ticket(status=status, created_at=OLD, updated_at=updated_at, **kwargs)
+    )
+    await queries.add_comment(db_path, TicketComment(ticket_id=ticket.id, content="note"))
+    return ticket
+
+
+async def _count(db_path, table: str) -> int:
+    async with aiosqlite.connect(db_path) as db:
+        cursor = await db.execute(f"SELECT COUNT(*) FROM {table}")  # noqa: S608
+        return (await cursor.fetchone())[0]
+
+
+@pytest.mark.asyncio
+async def test_only_old_resolved_and_closed_tickets_move(db_path):
+    closed = await _ticket(db_path, "closed", title="old closed")
+    await _ticket(db_path, "open", title="old open")
+    await _ticket(db_path, "resolved", updated_at="2999-01-01T00:00:00+00:00", title="recent")
+
+    assert await archive_tickets(db_path, older_than_days=30, batch_size=1) == 1
+
+    assert [t.title for t in await queries.list_tickets(db_path)] == ["recent", "old open"]
+    assert await _count(db_path, "tickets_archive") == 1
+    assert await _count(db_path, "ticket_comments") == 2
+
+    # Still readable by id, with comments
+    assert (await queries.get_ticket(db_path, closed.id)).title == "old closed"
+    ticket, comments = await queries.get_ticket_with_comments(db_path, closed.id)
+    assert ticket.status == "closed"
+    assert [c.content for c in comments] == ["note"]
+    assert [c.content for c in await queries.get_comments(db_path, closed.id)] == ["note"]
+
+    events = await queries.get_changes(db_path)
+    assert events[-1].kind == "archived"
+    assert events[-1].ticket_id == closed.id
+
+
+@pytest.mark.asyncio
+async def test_stats_include_archived_tickets(db_path):
+    await _ticket(db_path, "resolved", resolved_at="2020-01-01T02:00:00+00:00")
+    await _ticket(db_path, "closed")
+    before = await queries.ticket_counts(db_path, group_by=["status"])
+    resolution_before = await queries.resolution_stats(db_path)
+
+    assert await archive_tickets(db_path, older_than_days=30) == 2
+    assert await queries.ticket_counts(db_path, group_by=["status"]) == before
+    assert await queries.resolution_stats(db_path) == resolution_before
+
+
+@pytest.mark.asyncio
+async def test_archived_ticket_cannot_be_updated(db_path):
+    ticket = await _ticket(db_path, "closed")
+    await archive_tickets(db_path, older_than_days=30)
+
+    settings = Settings(
+        slack_bot_token="xoxb-test",
+        slack_app_token="xapp-test",
+        anthropic_api_key="sk-test",
+        db_path=db_path,
+    )
+    result = await ticket_tools.update_ticket(ticket.id, status="open", _settings=settings)
+    assert "archived" in result["error"]
+
+
+@pytest.mark.asyncio
+async def test_compact_purges_expired_archive(db_path):
+    ticket = await _ticket(db_path, "closed")
+    await archive_tickets(db_path, older_than_days=30)
+    await queries.get_ticket(db_path, ticket.id)
+
+    # Nothing is old enough yet
+    assert (await compact_archive(db_path, retention_days=1))["purged"] == 0
+    assert (await compact_archive(db_path, retention_days=1e-9))["purged"] == 1
+    assert await _count(db_path, "ticket_comments_archive") == 0
+    assert await queries.get_ticket(db_path, ticket.id) is None
+    assert (await queries.ticket_counts(db_path))["total"] == 0
+
+    events = await queries.get_changes(db_path)
+    assert [(e.kind, e.ticket_id) for e in events[-2:]] == [
+        ("archived", ticket.id),
+        ("purged", ticket.id),
+    ]
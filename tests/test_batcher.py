@@ -0,0 +1,76 @@
+"""Tests for group-commit write batching."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from it_agent.db import queries
+from it_agent.db.database import close_pool, init_db, open_pool, start_batcher, stop_batcher
+from it_agent.db.models import Ticket, TicketComment
+
+
+@pytest.fixture
+async def db_path(tmp_path):
+    path = tmp_path / "batch.db"
+    await init_db(path)
+    await open_pool(path, readers=2)
+    yield path
+    await stop_batcher(path)
+    await close_pool(path)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_share_a_commit(db_path):
+    batcher = start_batcher(db_path, max_latency=0.05, max_batch=100)
+    created = await asyncio.gather(
+        *(queries.create_ticket(db_path, Ticket(title=f"T{i}")) for i in range(30))
+    )
+
+    assert sorted(t.id for t in created) == list(range(1, 31))
+    assert batcher.stats()["batches"] == 1
+    assert len(await queries.list_tickets(db_path, limit=50)) == 30
+
+
+@pytest.mark.asyncio
+async def test_batches_are_capped(db_path):
+    batcher = start_batcher(db_path, max_latency=0.05, max_batch=8)
+    await asyncio.gather(*(queries.create_ticket(db_path, Ticket(title="t")) for _ in range(20)))
+    stats = batcher.stats()
+    assert stats["writes"] == 20
+    assert stats["max_batch_size"] == 8
+    assert stats["batches"] == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_write_only_fails_its_caller(db_path):
+    start_batcher(db_path, max_latency=0.05)
+
+    async def broken(db):
+        await db.execute("INSERT INTO tickets (title, created_at, updated_at) VALUES ('x', 1, 1)")
+        await db.execute("INSERT INTO no_such_table VALUES (1)")
+
+    ticket = await queries.create_ticket(db_path, Ticket(title="first"))
+    results = await asyncio.gather(
+        queries.create_ticket(db_path, Ticket(title="ok")),
+        start_batcher(db_path).submit(broken),
+        queries.add_comment(db_path, TicketComment(ticket_id=ticket.id, content="hi")),
+        return_exceptions=True,
+    )
+
+    assert results[0].title == "ok"
+    assert isinstance(results[1], Exception)
+    assert results[2].id is not None
+    # The broken op's first insert was rolled back with it
+    titles = {t.title for t in await queries.list_tickets(db_path)}
+    assert titles == {"first", "ok"}
+
+
+@pytest.mark.asyncio
+async def test_stop_flushes_pending_writes(db_path):
+    start_batcher(db_path, max_latency=10)
+    task = asyncio.ensure_future(queries.create_ticket(db_path, Ticket(title="late")))
+    await asyncio.sleep(0)
+    await stop_batcher(db_path)
+    assert (await task).id == 1
@@ -0,0 +1,119 @@
+"""Tests for bulk ticket import/export."""
+
+from __future__ import annotations
+
+import io
+import json
+
+import pytest
+
+from it_agent.db import bulk, queries
+from it_agent.db.archive import archive_tickets
+from it_agent.db.database import init_db
+
+
+@pytest.fixture
+async def db_path(tmp_path):
+    path = tmp_path / "bulk.db"
+    await init_db(path)
+    return path
+
+
+def _jsonl(*records) -> io.StringIO:
+    return io.StringIO("".join(json.dumps(r) + "\n" for r in records))
+
+
+@pytest.mark.asyncio
+async def test_jsonl_round_trip(db_path):
+    records = [
+        {"title": f"T{i}", "priority": "high", "created_at": f"2025-01-0{i + 1}T00:00:00"}
+        for i in range(5)
+    ]
+    count = await bulk.import_tickets(db_path, bulk.read_records(_jsonl(*records), "jsonl"), 2)
+    assert count == 5
+
+    out = io.StringIO()
+    assert await bulk.export_tickets(db_path, out, "jsonl") == 5
+    exported = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [t["title"] for t in exported] == ["T0", "T1", "T2", "T3", "T4"]
+    assert exported[0]["updated_at"] == "2025-01-01T00:00:00"
+    assert exported[0]["status"] == "open"
+    assert set(exported[0]) == set(bulk.COLUMNS)
+
+    # Triggers keep search and stats current for imported rows
+    assert len(await queries.search_tickets(db_path, "T3")) == 1
+    assert (await queries.ticket_counts(db_path, priority="high"))["total"] == 5
+
+
+@pytest.mark.asyncio
+async def test_csv_round_trip(db_path, tmp_path):
+    source = io.StringIO(
+        "id,title,status,resolved_at\n100,Printer,resolved,2025-02-01T00:00:00\n101,Monitor,,\n"
+    )
+    await bulk.import_tickets(db_path, bulk.read_records(source, "csv"), keep_ids=True)
+
+    out = io.StringIO()
+    await bulk.export_tickets(db_path, out, "csv", status="open")
+    lines = out.getvalue().splitlines()
+    assert lines[0].split(",") == bulk.COLUMNS
+    assert lines[1].startswith("101,Monitor,")
+    assert len(lines) == 2
+    assert (await queries.get_ticket(db_path, 100)).resolved_at == "2025-02-01T00:00:00"
+
+
+@pytest.mark.asyncio
+async def test_invalid_record_stops_import(db_path):
+    records = bulk.read_records(
+        _jsonl({"title": "ok"}, {"title": "bad", "status": "weird"}), "jsonl"
+    )
+    with pytest.raises(bulk.InvalidRecordError, match="record 2"):
+        await bulk.import_tickets(db_path, records, chunk_size=1)
+    # The chunk before the bad record was committed
+    assert len(await queries.list_tickets(db_path)) == 1
+
+
+async def _import_archived(db_path) -> None:
+    old = "2020-01-01T00:00:00+00:00"
+    records = [
+        {"id": 1, "title": "archived", "status": "closed", "created_at": old},
+        {"id": 2, "title": "live", "status": "closed", "created_at": "2999-01-01T00:00:00"},
+    ]
+    await bulk.import_tickets(db_path, bulk.read_records(_jsonl(*records), "jsonl"), keep_ids=True)
+    assert await archive_tickets(db_path, older_than_days=30) == 1
+
+
+@pytest.mark.asyncio
+async def test_export_includes_archived_tickets(db_path):
+    await _import_archived(db_path)
+
+    out = io.StringIO()
+    assert await bulk.export_tickets(db_path, out, "jsonl") == 2
+    assert [json.loads(line)["title"] for line in out.getvalue().splitlines()] == [
+        "archived",
+        "live",
+    ]
+
+    out = io.StringIO()
+    assert await bulk.export_tickets(db_path, out, "csv", include_archived=False) == 1
+    assert "archived" not in out.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_keep_ids_rejects_archived_ids(db_path):
+    await _import_archived(db_path)
+
+    records = bulk.read_records(_jsonl({"id": 1, "title": "clash"}), "jsonl")
+    with pytest.raises(bulk.InvalidRecordError, match="already exist: 1"):
+        await bulk.import_tickets(db_path, records, keep_ids=True)
+    assert (await queries.get_ticket(db_path, 1)).title == "archived"
+    assert await archive_tickets(db_path, older_than_days=30) == 0
+
+
+def test_cli_export(db_path, tmp_path, monkeypatch, capsys):
+    target = tmp_path / "out.csv"
+    monkeypatch.setattr(
+        "sys.argv", ["it-agent-tickets", "--db", str(db_path), "export", str(target)]
+    )
+    bulk.main()
+    assert target.read_text().startswith("id,title,")
+    assert "Exported 0 tickets" in capsys.readouterr().err
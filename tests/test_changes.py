@@ -0,0 +1,84 @@
+"""Tests for the ticket change log."""
+
+from __future__ import annotations
+
+import asyncio
+
+import aiosqlite
+import pytest
+
+from it_agent.db import queries
+from it_agent.db.database import init_db
+from it_agent.db.migrations import migrate
+from it_agent.db.models import Ticket, TicketComment
+
+
+@pytest.fixture
+async def db_path(tmp_path):
+    path = tmp_path / "events.db"
+    await init_db(path)
+    return path
+
+
+@pytest.mark.asyncio
+async def test_writes_are_logged_in_order(db_path):
+    created = await queries.create_ticket(db_path, Ticket(title="VPN"))
+    await queries.update_ticket(
+        db_path,
+        created.id,
+        comment=TicketComment(author_id="U1", content="looking"),
+        status="in_progress",
+    )
+    # Changing nothing logs nothing
+    await queries.update_ticket(db_path, created.id, status=None)
+
+    events = await queries.get_changes(db_path)
+    assert [e.kind for e in events] == ["created", "updated", "commented"]
+    assert [e.seq for e in events] == sorted(e.seq for e in events)
+    assert events[0].payload["title"] == "VPN"
+    assert events[1].payload["status"] == "in_progress"
+    assert events[2].payload["content"] == "looking"
+    assert all(e.ticket_id == created.id for e in events)
+
+    assert await queries.get_changes(db_path, since_seq=events[-1].seq) == []
+    page = await queries.get_changes(db_path, since_seq=events[0].seq, limit=1)
+    assert [e.kind for e in page] == ["updated"]
+
+
+@pytest.mark.asyncio
+async def test_failed_write_logs_nothing(db_path):
+    assert await queries.update_ticket(db_path, 99, status="closed") is None
+    assert await queries.get_changes(db_path) == []
+
+
+@pytest.mark.asyncio
+async def test_tail_follows_new_events(db_path):
+    await queries.create_ticket(db_path, Ticket(title="first"))
+    tail = queries.tail_changes(db_path, poll_interval=0.01)
+
+    assert (await tail.__anext__()).payload["title"] == "first"
+    pending = asyncio.ensure_future(tail.__anext__())
+    await asyncio.sleep(0.03)
+    assert not pending.done()
+    await queries.create_ticket(db_path, Ticket(title="second"))
+    event = await asyncio.wait_for(pending, 1)
+    assert event.payload["title"] == "second"
+    await tail.aclose()
+
+
+@pytest.mark.asyncio
+async def test_migration_seeds_log_with_existing_rows(tmp_path):
+    path = tmp_path / "old.db"
+    async with aiosqlite.connect(path) as db:
+        await migrate(db, target=4)
+        await db.execute(
+            "INSERT INTO tickets (title, created_at, updated_at) VALUES ('old', 'x', 'x')"
+        )
+        await db.execute(
+            "INSERT INTO ticket_comments (ticket_id, content, created_at) VALUES (1, 'c', 'x')"
+        )
+        await db.commit()
+
+    await init_db(path)
+    events = await queries.get_changes(path)
+    assert [(e.kind, e.ticket_id) for e in events] == [("created", 1), ("commented", 1)]
@@ -0,0 +1,71 @@
+"""Tests for the conversation store."""
+
+from __future__ import annotations
+
+from it_agent.bot.conversations import ConversationStore
+
+
+def _msg(role: str, content) -> dict:
+    return {"role": role, "content": content}
+
+
+def test_append_and_get_round_trip():
+    store = ConversationStore()
+    blocks = [{"type": "tool_result", "tool_use_id": "tu_1", "content": "{}"}]
+    store.append(("C1", "1.0"), _msg("user", "hello"))
+    store.append(("C1", "1.0"), _msg("user", blocks))
+
+    assert store.get(("C1", "1.0")) == [_msg("user", "hello"), _msg("user", blocks)]
+    assert store.get(("C1", "2.0")) == []
+
+
+def test_get_returns_copy():
+    store = ConversationStore()
+    store.append(("C1", "1.0"), _msg("user", "hello"))
+    store.get(("C1", "1.0")).append(_msg("assistant", "sneaky"))
+    assert len(store.get(("C1", "1.0"))) == 1
+
+
+def test_lru_eviction_by_thread_count():
+    store = ConversationStore(max_threads=2)
+    store.append(("C", "1"), _msg("user", "a"))
+    store.append(("C", "2"), _msg("user", "b"))
+    store.get(("C", "1"))  # 1 is now more recently used than 2
+    store.append(("C", "3"), _msg("user", "c"))
+
+    assert ("C", "1") in store
+    assert ("C", "2") not in store
+    assert store.stats()["evicted_lru"] == 1
+
+
+def test_eviction_by_memory_budget():
+    store = ConversationStore(max_bytes=1000)
+    for i in range(10):
+        store.append(("C", str(i)), _msg("user", "x" * 200))
+
+    stats = store.stats()
+    assert stats["bytes"] <= 1000
+    assert stats["threads"] < 10
+    assert ("C", "9") in store
+
+
+def test_idle_threads_expire(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr("it_agent.bot.conversations.time.monotonic", lambda: now)
+    store = ConversationStore(idle_ttl=60)
+    store.append(("C", "old"), _msg("user", "a"))
+    now += 30
+    store.append(("C", "new"), _msg("user", "b"))
+    now += 45
+
+    assert store.get(("C", "old")) == []
+    assert store.get(("C", "new")) == [_msg("user", "b")]
+    assert store.stats()["evicted_idle"] == 1
+
+
+def test_replace_updates_size():
+    store = ConversationStore()
+    store.append(("C", "1"), _msg("user", "x" * 500))
+    store.replace(("C", "1"), [_msg("user", "short")])
+    assert store.stats()["bytes"] < 500
+    assert store.get(("C", "1")) == [_msg("user", "short")]
@@ -0,0 +1,93 @@
+"""Tests for database connection management."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from it_agent.db import database
+from it_agent.db.database import close_pool, get_db, init_db, open_pool
+
+
+@pytest.fixture
+async def pool(tmp_path):
+    path = tmp_path / "pool.db"
+    await init_db(path)
+    pool = await open_pool(path, readers=2)
+    yield pool
+    await close_pool(path)
+
+
+async def _pragma(db, name: str):
+    cursor = await db.execute(f"PRAGMA {name}")
+    return (await cursor.fetchone())[0]
+
+
+@pytest.mark.asyncio
+async def test_pool_connections_are_tuned(pool):
+    async with get_db(pool.db_path) as db:
+        assert await _pragma(db, "journal_mode") == "wal"
+        assert await _pragma(db, "synchronous") == 1  # NORMAL
+        assert await _pragma(db, "busy_timeout") == 5000
+    async with get_db(pool.db_path, readonly=True) as db:
+        assert await _pragma(db, "query_only") == 1
+
+
+@pytest.mark.asyncio
+async def test_connections_are_reused(pool):
+    async with get_db(pool.db_path) as first:
+        pass
+    async with get_db(pool.db_path) as second:
+        pass
+    assert first is second
+
+
+@pytest.mark.asyncio
+async def test_readers_run_concurrently_with_writer(pool):
+    async with get_db(pool.db_path) as writer:
+        await writer.execute("INSERT INTO slack_events (event_key, seen_at) VALUES ('a', 1)")
+        # Uncommitted writes are invisible to readers, and reading doesn't block
+        async with get_db(pool.db_path, readonly=True) as reader:
+            cursor = await reader.execute("SELECT COUNT(*) FROM slack_events")
+            assert (await cursor.fetchone())[0] == 0
+        await writer.commit()
+
+
+@pytest.mark.asyncio
+async def test_failed_write_is_rolled_back(pool):
+    with pytest.raises(RuntimeError):
+        async with get_db(pool.db_path) as db:
+            await db.execute("INSERT INTO slack_events (event_key, seen_at) VALUES ('b', 1)")
+            raise RuntimeError("boom")
+
+    async with get_db(pool.db_path) as db:
+        await db.commit()
+        cursor = await db.execute("SELECT COUNT(*) FROM slack_events")
+        assert (await cursor.fetchone())[0] == 0
+
+
+@pytest.mark.asyncio
+async def test_writes_are_serialized(pool):
+    async def write(key: str) -> None:
+        async with get_db(pool.db_path) as db:
+            await db.execute("INSERT INTO slack_events (event_key, seen_at) VALUES (?, 1)", (key,))
+            await asyncio.sleep(0)
+            await db.commit()
+
+    await asyncio.gather(*(write(f"k{i}") for i in range(20)))
+    async with get_db(pool.db_path, readonly=True) as db:
+        cursor = await db.execute("SELECT COUNT(*) FROM slack_events")
+        assert (await cursor.fetchone())[0] == 20
+
+
+@pytest.mark.asyncio
+async def test_close_pool_falls_back_to_direct_connections(tmp_path):
+    path = tmp_path / "t.db"
+    await init_db(path)
+    await open_pool(path)
+    await close_pool(path)
+    assert path not in database._pools
+    async with get_db(path) as db:
+        cursor = await db.execute("SELECT COUNT(*) FROM tickets")
+        assert (await cursor.fetchone())[0] == 0
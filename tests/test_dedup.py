@@ -0,0 +1,66 @@
+"""Tests for Slack event deduplication."""
+
+from __future__ import annotations
+
+import pytest
+
+from it_agent.bot.dedup import EventDeduplicator, event_key
+from it_agent.db.database import init_db
+
+
+def test_event_key_prefers_client_msg_id():
+    mention = {"type": "app_mention", "client_msg_id": "abc", "channel": "C1", "ts": "1.0"}
+    message = {"type": "message", "client_msg_id": "abc", "channel": "C1", "ts": "1.0"}
+    assert event_key(mention) == event_key(message) == "msg:abc"
+    assert event_key({"channel": "C1", "ts": "2.0"}) == "ts:C1:2.0"
+
+
+@pytest.mark.asyncio
+async def test_in_memory_dedup():
+    dedup = EventDeduplicator()
+    assert await dedup.seen("msg:1") is False
+    assert await dedup.seen("msg:1") is True
+    assert await dedup.seen("msg:2") is False
+    assert dedup.stats()["duplicates"] == 1
+
+
+@pytest.mark.asyncio
+async def test_entries_expire(monkeypatch):
+    now = 1_000_000.0
+    monkeypatch.setattr("it_agent.bot.dedup.time.time", lambda: now)
+    dedup = EventDeduplicator(ttl=60)
+    await dedup.seen("msg:1")
+    now += 61
+    assert await dedup.seen("msg:1") is False
+
+
+@pytest.mark.asyncio
+async def test_bounded_memory():
+    dedup = EventDeduplicator(max_entries=2)
+    for key in ("a", "b", "c"):
+        await dedup.seen(key)
+    assert dedup.stats()["tracked"] == 2
+
+
+@pytest.mark.asyncio
+async def test_persistent_dedup_survives_restart(tmp_path):
+    db_path = tmp_path / "tickets.db"
+    await init_db(db_path)
+
+    assert await EventDeduplicator(db_path=db_path).seen("msg:1") is False
+    # A fresh instance has an empty memory but finds the key in SQLite
+    restarted = EventDeduplicator(db_path=db_path)
+    assert await restarted.seen("msg:1") is True
+    assert await restarted.seen("msg:2") is False
+
+
+@pytest.mark.asyncio
+async def test_persistent_entries_expire(tmp_path, monkeypatch):
+    now = 1_000_000.0
+    monkeypatch.setattr("it_agent.bot.dedup.time.time", lambda: now)
+    db_path = tmp_path / "tickets.db"
+    await init_db(db_path)
+
+    await EventDeduplicator(ttl=60, db_path=db_path).seen("msg:1")
+    now += 61
+    assert await EventDeduplicator(ttl=60, db_path=db_path).seen("msg:1") is False
@@ -0,0 +1,129 @@
+"""Tests for the Slack message dispatcher."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from it_agent.bot.dispatcher import QUEUE_FULL_TEXT, EventDispatcher
+
+
+def _job(log: list, label: str, delay: float = 0.01):
+    async def run():
+        log.append(("start", label))
+        await asyncio.sleep(delay)
+        log.append(("end", label))
+
+    return run
+
+
+@pytest.mark.asyncio
+async def test_same_thread_runs_in_order_without_overlap():
+    dispatcher = EventDispatcher(max_concurrency=4)
+    log = []
+    for i in range(3):
+        await dispatcher.submit(("C", "1"), "U1", _job(log, i))
+    await dispatcher.join()
+
+    assert log == [
+        ("start", 0),
+        ("end", 0),
+        ("start", 1),
+        ("end", 1),
+        ("start", 2),
+        ("end", 2),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_global_concurrency_cap():
+    dispatcher = EventDispatcher(max_concurrency=2)
+    running = 0
+    peak = 0
+
+    async def run():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    for i in range(6):
+        await dispatcher.submit(("C", str(i)), f"U{i}", run)
+    await dispatcher.join()
+
+    assert peak == 2
+    assert dispatcher.stats()["completed"] == 6
+
+
+@pytest.mark.asyncio
+async def test_users_are_served_fairly():
+    dispatcher = EventDispatcher(max_concurrency=1)
+    log = []
+    for i in range(4):
+        await dispatcher.submit(("C", f"a{i}"), "U_A", _job(log, f"a{i}"))
+    await dispatcher.submit(("C", "b0"), "U_B", _job(log, "b0"))
+    await dispatcher.join()
+
+    starts = [label for kind, label in log if kind == "start"]
+    # a0 was already running; U_B's only message goes before U_A's backlog
+    assert starts[:2] == ["a0", "b0"]
+
+
+@pytest.mark.asyncio
+async def test_bounded_queue_notifies():
+    dispatcher = EventDispatcher(max_concurrency=1, max_queue=2)
+    notices = []
+
+    async def notify(text):
+        notices.append(text)
+
+    log = []
+    results = [
+        await dispatcher.submit(("C", str(i)), "U1", _job(log, i), notify=notify) for i in range(4)
+    ]
+    await dispatcher.join()
+
+    assert results == [True, True, True, False]
+    assert "queued #1" in notices[0]
+    assert "queued #2" in notices[1]
+    assert notices[2] == QUEUE_FULL_TEXT
+    assert dispatcher.stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_queue_position_follows_fair_order():
+    dispatcher = EventDispatcher(max_concurrency=1)
+    notices = []
+
+    async def notify(text):
+        notices.append(text)
+
+    log = []
+    for i in range(3):
+        await dispatcher.submit(("C", f"a{i}"), "U_A", _job(log, f"a{i}"), notify=notify)
+    await dispatcher.submit(("C", "b0"), "U_B", _job(log, "b0"), notify=notify)
+    # Waiting behind an earlier message in the same thread is not a queue position
+    await dispatcher.submit(("C", "b0"), "U_B", _job(log, "b1"), notify=notify)
+    await dispatcher.join()
+
+    assert len(notices) == 3
+    assert "queued #1" in notices[0]
+    assert "queued #2" in notices[1]
+    # U_B has not been served yet, so it goes ahead of U_A's backlog
+    assert "queued #1" in notices[2]
+
+
+@pytest.mark.asyncio
+async def test_failing_job_does_not_block_thread():
+    dispatcher = EventDispatcher()
+    log = []
+
+    async def boom():
+        raise RuntimeError("boom")
+
+    await dispatcher.submit(("C", "1"), "U1", boom)
+    await dispatcher.submit(("C", "1"), "U1", _job(log, "after"))
+    await dispatcher.join()
+    assert ("end", "after") in log
@@ -0,0 +1,359 @@
+"""Tests for the tool executor."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from it_agent.agent import executor
+from it_agent.agent.cache import TTLCache, cache_key
+from it_agent.config import Settings
+
+
+@pytest.fixture
+def settings(tmp_path):
+    return Settings(
+        slack_bot_token="xoxb-test",
+        slack_app_token="xapp-test",
+        anthropic_api_key="sk-test",
+        db_path=tmp_path / "tickets.db",
+        chroma_path=tmp_path / "chroma",
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_result_cache():
+    executor._result_cache.clear()
+    executor._inflight.reset_stats()
+    yield
+    executor._result_cache.clear()
+
+
+@pytest.fixture
+def slow_tools(monkeypatch):
+    """Replace the diagnostic handlers with sleeps of a known duration."""
+
+    def make(delay: float, label: str):
+        async def handler(**kwargs):
+            await asyncio.sleep(delay)
+            return {"tool": label}
+
+        return handler
+
+    monkeypatch.setitem(executor._TOOL_HANDLERS, "ping_host", make(0.2, "ping"))
+    monkeypatch.setitem(executor._TOOL_HANDLERS, "dns_lookup", make(0.1, "dns"))
+    monkeypatch.setitem(executor._TOOL_HANDLERS, "check_disk_usage", make(5.0, "disk"))
+
+
+@pytest.mark.asyncio
+async def test_unknown_tool(settings):
+    result = await executor.execute_tool("nope", {}, settings)
+    assert "Unknown tool" in json.loads(result)["error"]
+
+
+@pytest.mark.asyncio
+async def test_execute_tool_does_not_mutate_input(settings, slow_tools):
+    tool_input = {"host": "example.com"}
+    await executor.execute_tool("ping_host", tool_input, settings)
+    assert tool_input == {"host": "example.com"}
+
+
+@pytest.mark.asyncio
+async def test_execute_tools_runs_concurrently_in_order(settings, slow_tools):
+    start = time.monotonic()
+    results = await executor.execute_tools(
+        [("ping_host", {"host": "a"}), ("dns_lookup", {"hostname": "b"})], settings
+    )
+    elapsed = time.monotonic() - start
+
+    assert [json.loads(r)["tool"] for r in results] == ["ping", "dns"]
+    assert elapsed < 0.29  # about the slowest call, not the sum
+
+
+@pytest.mark.asyncio
+async def test_execute_tools_deadline(settings, slow_tools):
+    results = await executor.execute_tools(
+        [("check_disk_usage", {}), ("dns_lookup", {"hostname": "b"})], settings, timeout=0.3
+    )
+    assert "timed out" in json.loads(results[0])["error"]
+    assert json.loads(results[1])["tool"] == "dns"
+
+
+@pytest.mark.asyncio
+async def test_execute_tools_deadline_waits_for_writes(settings, slow_tools, monkeypatch):
+    async def slow_create(**kwargs):
+        await asyncio.sleep(0.3)
+        return {"success": True, "ticket": {"id": 7}}
+
+    monkeypatch.setitem(executor._TOOL_HANDLERS, "create_ticket", slow_create)
+    results = await executor.execute_tools(
+        [("create_ticket", {"title": "t", "description": "d"}), ("check_disk_usage", {})],
+        settings,
+        timeout=0.1,
+    )
+    assert json.loads(results[0])["ticket"]["id"] == 7
+    assert "timed out" in json.loads(results[1])["error"]
+
+
+@pytest.mark.asyncio
+async def test_per_tool_concurrency_cap(settings, monkeypatch):
+    running = 0
+    peak = 0
+
+    async def handler(**kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {}
+
+    monkeypatch.setitem(executor._TOOL_HANDLERS, "check_service_status", handler)
+    monkeypatch.setitem(executor._TOOL_CONCURRENCY, "check_service_status", 2)
+    monkeypatch.delitem(executor._semaphores, "check_service_status", raising=False)
+
+    await executor.execute_tools(
+        [("check_service_status", {"service_name": f"s{i}"}) for i in range(6)], settings
+    )
+    assert peak == 2
+
+
+class TestCacheKey:
+    def test_normalizes_equivalent_calls(self):
+        assert cache_key("ping_host", {"host": " VPN.corp"}) == cache_key(
+            "ping_host", {"host": "vpn.corp", "count": 4}
+        )
+
+    def test_ignores_injected_arguments(self):
+        assert cache_key("get_ticket", {"ticket_id": 3, "_settings": object()}) == cache_key(
+            "get_ticket", {"ticket_id": "3"}
+        )
+
+    def test_different_arguments_differ(self):
+        assert cache_key("ping_host", {"host": "a"}) != cache_key("ping_host", {"host": "b"})
+
+
+def test_ttl_cache_expiry_and_bound(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr("it_agent.agent.cache.time.monotonic", lambda: now)
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    assert cache.get("a", None) is None  # evicted as least recently used
+    now += 11
+    assert cache.get("b", None) is None  # expired
+
+
+@pytest.fixture
+def counting_ping(monkeypatch):
+    calls = []
+
+    async def handler(host: str, **_):
+        calls.append(host)
+        return {"status": "reachable", "host": host}
+
+    monkeypatch.setitem(executor._TOOL_HANDLERS, "ping_host", handler)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_read_only_results_are_cached(settings, counting_ping):
+    first = await executor.execute_tool("ping_host", {"host": "vpn.corp"}, settings)
+    second = await executor.execute_tool("ping_host", {"host": "VPN.corp", "count": 4}, settings)
+    assert first == second
+    assert counting_ping == ["vpn.corp"]
+
+    stats = executor.cache_stats()["tools"]["ping_host"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_can_be_disabled(settings, counting_ping):
+    settings.tool_cache_enabled = False
+    await executor.execute_tool("ping_host", {"host": "vpn.corp"}, settings)
+    await executor.execute_tool("ping_host", {"host": "vpn.corp"}, settings)
+    assert len(counting_ping) == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_are_not_cached(settings, monkeypatch):
+    calls = []
+
+    async def handler(**kwargs):
+        calls.append(kwargs)
+        return {"error": "boom"}
+
+    monkeypatch.setitem(executor._TOOL_HANDLERS, "dns_lookup", handler)
+    await executor.execute_tool("dns_lookup", {"hostname": "x"}, settings)
+    await executor.execute_tool("dns_lookup", {"hostname": "x"}, settings)
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_ticket_writes_invalidate_reads(settings):
+    from it_agent.db.database import init_db
+
+    await init_db(settings.db_path)
+    created = await executor.execute_tool(
+        "create_ticket", {"title": "VPN down", "description": "d"}, settings, "U1"
+    )
+    ticket_id = json.loads(created)["ticket"]["id"]
+
+    before = json.loads(
+        await executor.execute_tool("get_ticket", {"ticket_id": ticket_id}, settings)
+    )
+    assert before["ticket"]["status"] == "open"
+    listed = json.loads(await executor.execute_tool("list_tickets", {}, settings))
+    assert listed["count"] == 1
+
+    await executor.execute_tool(
+        "update_ticket", {"ticket_id": ticket_id, "status": "resolved"}, settings, "U1"
+    )
+    await executor.execute_tool("create_ticket", {"title": "t2", "description": "d"}, settings)
+
+    after = json.loads(
+        await executor.execute_tool("get_ticket", {"ticket_id": ticket_id}, settings)
+    )
+    assert after["ticket"]["status"] == "resolved"
+    listed = json.loads(await executor.execute_tool("list_tickets", {}, settings))
+    assert listed["count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_write_during_read_is_not_cached(settings, monkeypatch):
+    ticket = {"id": 1, "status": "open"}
+    started = asyncio.Event()
+    release = asyncio.Event()
+    reads = []
+
+    async def get_ticket(ticket_id: int, **_):
+        snapshot = dict(ticket)
+        reads.append(snapshot["status"])
+        started.set()
+        if len(reads) == 1:
+            await release.wait()
+        return {"ticket": snapshot}
+
+    async def update_ticket(ticket_id: int, status: str, **_):
+        ticket["status"] = status
+        return {"ticket": dict(ticket)}
+
+    monkeypatch.setitem(executor._TOOL_HANDLERS, "get_ticket", get_ticket)
+    monkeypatch.setitem(executor._TOOL_HANDLERS, "update_ticket", update_ticket)
+
+    slow_read = asyncio.ensure_future(
+        executor.execute_tool("get_ticket", {"ticket_id": 1}, settings)
+    )
+    await started.wait()
+    await executor.execute_tool("update_ticket", {"ticket_id": 1, "status": "resolved"}, settings)
+
+    # A read after the write does not join the stale one still in flight
+    fresh = await asyncio.wait_for(
+        executor.execute_tool("get_ticket", {"ticket_id": 1}, settings), timeout=1
+    )
+    assert json.loads(fresh)["ticket"]["status"] == "resolved"
+
+    release.set()
+    assert json.loads(await slow_read)["ticket"]["status"] == "open"
+    # The stale result finished last but was not cached
+    cached = json.loads(await executor.execute_tool("get_ticket", {"ticket_id": 1}, settings))
+    assert cached["ticket"]["status"] == "resolved"
+    assert reads == ["open", "resolved"]
+
+
+@pytest.mark.asyncio
+async def test_list_tickets_tool_pages_with_cursor(settings):
+    from it_agent.db.database import init_db
+
+    await init_db(settings.db_path)
+    for i in range(5):
+        await executor.execute_tool(
+            "create_ticket", {"title": f"T{i}", "description": "d"}, settings
+        )
+
+    first = json.loads(await executor.execute_tool("list_tickets", {"limit": 3}, settings))
+    assert first["count"] == 3
+    second = json.loads(
+        await executor.execute_tool(
+            "list_tickets", {"limit": 3, "cursor": first["next_cursor"]}, settings
+        )
+    )
+    assert second["count"] == 2
+    assert "next_cursor" not in second
+    titles = [t["title"] for t in first["tickets"] + second["tickets"]]
+    assert titles == ["T4", "T3", "T2", "T1", "T0"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_are_coalesced(settings, monkeypatch):
+    settings.tool_cache_enabled = False
+    calls = []
+
+    async def handler(host: str, **_):
+        calls.append(host)
+        await asyncio.sleep(0.05)
+        return {"status": "reachable", "host": host}
+
+    monkeypatch.setitem(executor._TOOL_HANDLERS, "ping_host", handler)
+    results = await asyncio.gather(
+        *(executor.execute_tool("ping_host", {"host": "vpn.corp"}, settings) for _ in range(5)),
+        executor.execute_tool("ping_host", {"host": "other"}, settings),
+    )
+
+    assert len(set(results[:5])) == 1
+    assert sorted(calls) == ["other", "vpn.corp"]
+    stats = executor.cache_stats()["single_flight"]
+    assert stats["started"] == 2
+    assert stats["coalesced"] == 4
+    assert stats["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cancels_abandoned_work():
+    from it_agent.agent.cache import SingleFlight
+
+    flight = SingleFlight()
+    finished = []
+
+    async def work():
+        await asyncio.sleep(1)
+        finished.append(True)
+
+    waiters = [asyncio.ensure_future(flight.do("k", work)) for _ in range(2)]
+    await asyncio.sleep(0)
+    waiters[0].cancel()
+    await asyncio.sleep(0.01)
+    assert flight.stats()["in_flight"] == 1  # one caller still waiting
+
+    waiters[1].cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+    await asyncio.sleep(0)
+    assert flight.stats()["in_flight"] == 0
+    assert finished == []
+
+
+@pytest.mark.asyncio
+async def test_single_flight_join_after_cancel_starts_fresh_call():
+    from it_agent.agent.cache import SingleFlight
+
+    flight = SingleFlight()
+    started = []
+
+    async def work():
+        started.append(True)
+        await asyncio.sleep(0.01)
+        return "done"
+
+    first = asyncio.ensure_future(flight.do("k", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    # Runs right after the cancel, before the shared task has finished cancelling
+    second = asyncio.ensure_future(flight.do("k", work))
+    await asyncio.gather(first, return_exceptions=True)
+    assert await second == "done"
+    assert len(started) == 2
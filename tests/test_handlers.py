@@ -0,0 +1,73 @@
+"""Tests for Slack event handling helpers."""
+
+from __future__ import annotations
+
+import pytest
+
+from it_agent.agent.core import AgentResult
+from it_agent.agent.scheduler import PRIORITY_CRITICAL, PRIORITY_NORMAL
+from it_agent.bot import handlers
+from it_agent.bot.handlers import _message_priority
+from it_agent.config import Settings
+from it_agent.db import queries
+from it_agent.db.database import init_db
+from it_agent.db.models import Ticket
+
+
+@pytest.fixture
+async def settings(tmp_path):
+    settings = Settings(
+        slack_bot_token="xoxb-test",
+        slack_app_token="xapp-test",
+        anthropic_api_key="sk-test",
+        db_path=tmp_path / "tickets.db",
+    )
+    await init_db(settings.db_path)
+    return settings
+
+
+@pytest.mark.asyncio
+async def test_message_priority(settings):
+    critical = await queries.create_ticket(
+        settings.db_path, Ticket(title="Core switch down", priority="critical")
+    )
+    low = await queries.create_ticket(settings.db_path, Ticket(title="Mouse", priority="low"))
+
+    assert await _message_priority(f"any update on #{critical.id}?", settings) == PRIORITY_CRITICAL
+    assert await _message_priority(f"ticket {low.id} please", settings) == PRIORITY_NORMAL
+    assert await _message_priority("email outage on floor 3", settings) == PRIORITY_CRITICAL
+    assert await _message_priority("how do I set up VPN?", settings) == PRIORITY_NORMAL
+
+
+@pytest.mark.asyncio
+async def test_placeholder_posted_before_history_is_fitted(settings, monkeypatch):
+    order = []
+
+    class FakeClient:
+        async def chat_postMessage(self, **kwargs):  # noqa: N802 - mirrors the Slack SDK
+            order.append("placeholder")
+            return {"ts": "100.1"}
+
+        async def chat_update(self, **kwargs):
+            order.append("final")
+
+    class FakeHistory:
+        async def fit(self, messages, summary=""):
+            order.append("fit")
+            return messages, summary
+
+    class FakeAgent:
+        async def run(self, history, **kwargs):
+            order.append("run")
+            return AgentResult(text="done")
+
+    monkeypatch.setattr(handlers, "_get_history", lambda settings: FakeHistory())
+    monkeypatch.setattr(handlers, "_get_agent", lambda settings: FakeAgent())
+    monkeypatch.setattr(handlers, "_conversations", None)
+
+    async def say(**kwargs):
+        order.append("say")
+
+    event = {"channel": "C1", "ts": "1.0", "user": "U1"}
+    await handlers._handle_message(event, "hello", say, FakeClient(), settings)
+    assert order == ["placeholder", "fit", "run", "final"]
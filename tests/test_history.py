@@ -0,0 +1,184 @@
+"""Tests for token-budgeted history management."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from it_agent.agent.history import (
+    SUMMARY_HEADER,
+    HistoryManager,
+    compact_tool_result,
+    estimate_tokens,
+    split_turns,
+    with_summary,
+)
+
+
+def _tool_turn(question: str, answer: str, result: str = "{}") -> list[dict]:
+    return [
+        {"role": "user", "content": question},
+        {
+            "role": "assistant",
+            "content": [{"type": "tool_use", "id": "tu_1", "name": "ping_host", "input": {}}],
+        },
+        {
+            "role": "user",
+            "content": [{"type": "tool_result", "tool_use_id": "tu_1", "content": result}],
+        },
+        {"role": "assistant", "content": answer},
+    ]
+
+
+def test_split_turns_keeps_tool_pairs_together():
+    messages = _tool_turn("is vpn up?", "yes") + [
+        {"role": "user", "content": "thanks"},
+        {"role": "assistant", "content": "np"},
+    ]
+    turns = split_turns(messages)
+    assert [len(t) for t in turns] == [4, 2]
+
+
+def test_estimate_tokens_grows_with_content():
+    short = [{"role": "user", "content": "hi"}]
+    long = [{"role": "user", "content": "x" * 4000}]
+    assert estimate_tokens(long) > estimate_tokens(short) + 900
+
+
+@pytest.mark.asyncio
+async def test_fit_keeps_everything_within_budget():
+    messages = _tool_turn("q1", "a1") + [{"role": "user", "content": "q2"}]
+    kept, summary = await HistoryManager(token_budget=10_000).fit(messages)
+    assert kept == messages
+    assert summary == ""
+
+
+@pytest.mark.asyncio
+async def test_fit_folds_old_turns_into_summary():
+    old = _tool_turn("my vpn is broken", "vpn.corp is reachable", result="x" * 4000)
+    new = [{"role": "user", "content": "what about dns?"}]
+    kept, summary = await HistoryManager(token_budget=500).fit(old + new)
+
+    assert kept == new
+    assert "my vpn is broken" in summary
+    assert "ping_host" in summary
+    assert "vpn.corp is reachable" in summary
+
+
+@pytest.mark.asyncio
+async def test_fit_never_splits_tool_pairs():
+    messages = _tool_turn("q1", "a1", result="x" * 400) + _tool_turn("q2", "a2", result="y" * 400)
+    kept, _ = await HistoryManager(token_budget=150).fit(messages)
+    assert kept[0] == {"role": "user", "content": "q2"}
+    assert len(kept) == 4
+
+
+@pytest.mark.asyncio
+async def test_newest_turn_always_kept():
+    messages = [{"role": "user", "content": "z" * 10_000}]
+    kept, _ = await HistoryManager(token_budget=10).fit(messages)
+    assert kept == messages
+
+
+@pytest.mark.asyncio
+async def test_summary_is_rolling_and_bounded():
+    manager = HistoryManager(token_budget=50, summary_max_chars=300)
+    summary = ""
+    for i in range(10):
+        messages = [
+            {"role": "user", "content": f"question {i} " + "a" * 200},
+            {"role": "assistant", "content": f"answer {i}"},
+            {"role": "user", "content": "next"},
+        ]
+        _, summary = await manager.fit(messages, summary)
+    assert len(summary) <= 300
+    assert "question 9" in summary
+    assert "question 0" not in summary
+
+
+@pytest.mark.asyncio
+async def test_fit_uses_token_counter():
+    counted = []
+
+    async def count_tokens(messages):
+        counted.append(len(messages))
+        return 1000 * len(messages)
+
+    messages = [
+        {"role": "user", "content": "q1 " * 30},
+        {"role": "assistant", "content": "a1"},
+        {"role": "user", "content": "q2 " * 30},
+    ]
+    kept, summary = await HistoryManager(token_budget=100, count_tokens=count_tokens).fit(messages)
+    assert counted
+    assert kept == messages[2:]
+    assert "q1" in summary
+
+
+@pytest.mark.asyncio
+async def test_token_counter_called_once_per_fit():
+    counted = []
+
+    async def count_tokens(messages):
+        counted.append(len(messages))
+        return 100 * len(messages)
+
+    messages = []
+    for i in range(6):
+        messages += [
+            {"role": "user", "content": f"q{i} " * 30},
+            {"role": "assistant", "content": f"a{i}"},
+        ]
+    messages.append({"role": "user", "content": "last"})
+    kept, _ = await HistoryManager(token_budget=250, count_tokens=count_tokens).fit(messages)
+    assert counted == [13]
+    assert kept[0]["content"].startswith("q5")
+
+
+@pytest.mark.asyncio
+async def test_prefix_tokens_count_against_budget():
+    messages = _tool_turn("q1", "a1", result="x" * 400) + [{"role": "user", "content": "q2"}]
+    kept, _ = await HistoryManager(token_budget=200).fit(messages)
+    assert kept == messages
+    kept, _ = await HistoryManager(token_budget=200, prefix_tokens=150).fit(messages)
+    assert kept == messages[-1:]
+
+
+@pytest.mark.asyncio
+async def test_token_counter_failure_falls_back_to_estimate():
+    async def count_tokens(messages):
+        raise RuntimeError("offline")
+
+    messages = [
+        {"role": "user", "content": "q1 " * 30},
+        {"role": "assistant", "content": "a1"},
+        {"role": "user", "content": "q2"},
+    ]
+    kept, _ = await HistoryManager(token_budget=100, count_tokens=count_tokens).fit(messages)
+    assert kept == messages
+
+
+def test_with_summary_prepends_to_first_message():
+    messages = [{"role": "user", "content": "hello"}]
+    result = with_summary(messages, "- User: earlier")
+    assert result[0]["content"].startswith(SUMMARY_HEADER)
+    assert result[0]["content"].endswith("hello")
+    assert messages[0]["content"] == "hello"
+
+
+class TestCompactToolResult:
+    def test_small_results_unchanged(self):
+        assert compact_tool_result('{"status": "ok"}', 100) == '{"status": "ok"}'
+
+    def test_long_fields_are_shortened(self):
+        content = json.dumps({"status": "reachable", "output": "x" * 5000, "ids": list(range(50))})
+        compacted = json.loads(compact_tool_result(content, 1000))
+        assert compacted["status"] == "reachable"
+        assert "chars omitted" in compacted["output"]
+        assert len(compacted["ids"]) == 11
+
+    def test_non_json_is_truncated(self):
+        compacted = compact_tool_result("y" * 5000, 100)
+        assert compacted.startswith("y" * 100)
+        assert "truncated" in compacted
@@ -2,8 +2,12 @@
 
 from __future__ import annotations
 
+import threading
+
 import pytest
+from chromadb import EmbeddingFunction
 
+from it_agent.knowledge import indexer, store
 from it_agent.knowledge.indexer import _split_markdown, index_docs
 from it_agent.knowledge.store import search
 
@@ -56,3 +60,173 @@ async def test_search_empty_collection(tmp_path):
     chroma_dir = tmp_path / "empty_chroma"
     results = await search(chroma_dir, "anything", n_results=1)
     assert results == []
+
+
+@pytest.fixture
+def fresh_store():
+    store.reset_cache()
+    yield
+    store.reset_cache()
+
+
+@pytest.mark.asyncio
+async def test_collection_is_opened_once(tmp_path, monkeypatch, offline_collections):
+    opened = []
+    real_get_client = store.get_client
+
+    def counting_get_client(path):
+        opened.append(path)
+        return real_get_client(path)
+
+    monkeypatch.setattr(store, "get_client", counting_get_client)
+    chroma_dir = tmp_path / "chroma"
+    await store.warmup(chroma_dir)
+    for _ in range(3):
+        assert await search(chroma_dir, "anything") == []
+    assert opened == [chroma_dir]
+
+
+@pytest.mark.asyncio
+async def test_stale_collection_is_reopened(tmp_path, fresh_store):
+    class Stale:
+        def count(self):
+            raise RuntimeError("collection does not exist")
+
+    chroma_dir = tmp_path / "chroma"
+    store._collections[chroma_dir] = Stale()
+    assert await search(chroma_dir, "anything") == []
+    assert not isinstance(store._collections[chroma_dir], Stale)
+
+
+@pytest.mark.asyncio
+async def test_searches_run_on_dedicated_pool(tmp_path, monkeypatch, fresh_store):
+    threads = []
+
+    def fake_search(chroma_path, query, n_results):
+        threads.append(threading.current_thread().name)
+        return []
+
+    monkeypatch.setattr(store, "_search", fake_search)
+    store.configure_search_pool(1)
+    try:
+        await search(tmp_path, "anything")
+    finally:
+        store.shutdown_search_pool()
+    assert threads[0].startswith("kb-search")
+
+
+class _LengthEmbedding(EmbeddingFunction):
+    """Deterministic offline embedding so indexing tests need no model download."""
+
+    def __init__(self):
+        pass
+
+    def __call__(self, input):
+        return [[float(len(text)), float(sum(map(ord, text)) % 97), 1.0] for text in input]
+
+    @staticmethod
+    def name():
+        return "test-length"
+
+    def get_config(self):
+        return {}
+
+    @staticmethod
+    def build_from_config(config):
+        return _LengthEmbedding()
+
+
+@pytest.fixture
+def offline_collections(monkeypatch, fresh_store):
+    def get_collection(client, name=store._COLLECTION_NAME):
+        return client.get_or_create_collection(name, embedding_function=_LengthEmbedding())
+
+    monkeypatch.setattr(store, "get_collection", get_collection)
+    monkeypatch.setattr(indexer, "get_collection", get_collection)
+
+
+def _stored(chroma_dir) -> dict:
+    collection = store.get_collection(store.get_client(chroma_dir))
+    result = collection.get(include=["documents"])
+    return dict(zip(result["ids"], result["documents"]))
+
+
+class TestIncrementalIndex:
+    def test_only_changed_chunks_are_written(self, tmp_path, offline_collections):
+        docs = tmp_path / "docs"
+        docs.mkdir()
+        (docs / "vpn.md").write_text("# VPN\nConnect first\n## Troubleshooting\nRestart")
+        (docs / "wifi.md").write_text("# Wifi\nUse corp-secure")
+        chroma_dir = tmp_path / "chroma"
+
+        assert index_docs(docs, chroma_dir) == 3
+        assert index_docs(docs, chroma_dir) == 0
+
+        (docs / "vpn.md").write_text("# VPN\nConnect first\n## Troubleshooting\nReinstall")
+        assert index_docs(docs, chroma_dir) == 1
+        assert "Reinstall" in _stored(chroma_dir)["vpn::chunk_1"]
+
+    def test_removed_chunks_and_files_are_deleted(self, tmp_path, offline_collections):
+        docs = tmp_path / "docs"
+        docs.mkdir()
+        (docs / "vpn.md").write_text("# VPN\nConnect first\n## Troubleshooting\nRestart")
+        (docs / "wifi.md").write_text("# Wifi\nUse corp-secure")
+        chroma_dir = tmp_path / "chroma"
+        index_docs(docs, chroma_dir)
+
+        (docs / "vpn.md").write_text("# VPN\nConnect first")
+        (docs / "wifi.md").unlink()
+        assert index_docs(docs, chroma_dir) == 0
+        assert set(_stored(chroma_dir)) == {"vpn::chunk_0"}
+
+    def test_missing_manifest_reconciles_collection(self, tmp_path, offline_collections):
+        docs = tmp_path / "docs"
+        docs.mkdir()
+        (docs / "vpn.md").write_text("# VPN\nConnect first")
+        chroma_dir = tmp_path / "chroma"
+        collection = store.get_collection(store.get_client(chroma_dir))
+        collection.add(ids=["old::chunk_0"], documents=["outdated"])
+
+        assert index_docs(docs, chroma_dir) == 1
+        assert set(_stored(chroma_dir)) == {"vpn::chunk_0"}
+        assert (chroma_dir / indexer._MANIFEST_NAME).exists()
+
+    @pytest.mark.asyncio
+    async def test_full_rebuild_swaps_collection(self, tmp_path, offline_collections):
+        docs = tmp_path / "docs"
+        docs.mkdir()
+        (docs / "vpn.md").write_text("# VPN\nConnect first")
+        chroma_dir = tmp_path / "chroma"
+        index_docs(docs, chroma_dir)
+        # A search holds the current collection open across the rebuild
+        assert await search(chroma_dir, "VPN")
+
+        (docs / "wifi.md").write_text("# Wifi\nUse corp-secure")
+        assert index_docs(docs, chroma_dir, full=True) == 2
+
+        names = {c.name for c in store.get_client(chroma_dir).list_collections()}
+        assert names == {store._COLLECTION_NAME}
+        assert set(_stored(chroma_dir)) == {"vpn::chunk_0", "wifi::chunk_0"}
+        assert len(await search(chroma_dir, "Wifi", n_results=5)) == 2
+        # The manifest follows the new collection, so the next run is incremental again
+        assert index_docs(docs, chroma_dir) == 0
+
+
+@pytest.mark.asyncio
+async def test_warmup_embeds_even_when_empty(tmp_path, fresh_store):
+    embedded = []
+
+    class EmptyCollection:
+        def _embedding_function(self, texts):
+            embedded.extend(texts)
+            return [[0.0] for _ in texts]
+
+        def count(self):
+            return 0
+
+        def query(self, **kwargs):
+            raise AssertionError("nothing to query")
+
+    store._collections[tmp_path] = EmptyCollection()
+    await store.warmup(tmp_path)
+    assert embedded == ["warmup"]
@@ -0,0 +1,106 @@
+"""Tests for schema migrations."""
+
+from __future__ import annotations
+
+import aiosqlite
+import pytest
+
+from it_agent.db.database import init_db
+from it_agent.db.migrations import LATEST_VERSION, Migration, migrate, schema_version
+
+
+async def _index_names(db) -> set[str]:
+    cursor = await db.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    return {row[0] for row in await cursor.fetchall()}
+
+
+@pytest.mark.asyncio
+async def test_init_db_applies_all_migrations(tmp_path):
+    path = tmp_path / "t.db"
+    await init_db(path)
+    async with aiosqlite.connect(path) as db:
+        assert await schema_version(db) == LATEST_VERSION
+        assert "idx_tickets_status_created" in await _index_names(db)
+    # Running again is a no-op
+    await init_db(path)
+
+
+@pytest.mark.asyncio
+async def test_unversioned_database_is_adopted(tmp_path):
+    path = tmp_path / "legacy.db"
+    async with aiosqlite.connect(path) as db:
+        await db.executescript(
+            """CREATE TABLE tickets (
+                   id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL,
+                   description TEXT NOT NULL DEFAULT '', status TEXT NOT NULL DEFAULT 'open',
+                   priority TEXT NOT NULL DEFAULT 'medium', category TEXT NOT NULL DEFAULT '',
+                   requester_id TEXT NOT NULL DEFAULT '', assignee_id TEXT NOT NULL DEFAULT '',
+                   created_at TEXT NOT NULL, updated_at TEXT NOT NULL, resolved_at TEXT);
+               INSERT INTO tickets (title, created_at, updated_at) VALUES ('old', 'x', 'x');"""
+        )
+        await db.commit()
+
+    await init_db(path)
+    async with aiosqlite.connect(path) as db:
+        assert await schema_version(db) == LATEST_VERSION
+        cursor = await db.execute("SELECT title FROM tickets")
+        assert [row[0] for row in await cursor.fetchall()] == ["old"]
+
+
+@pytest.mark.asyncio
+async def test_list_query_uses_index(tmp_path):
+    path = tmp_path / "t.db"
+    await init_db(path)
+    async with aiosqlite.connect(path) as db:
+        cursor = await db.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM tickets WHERE status = ? "
+            "ORDER BY created_at DESC LIMIT 10",
+            ("open",),
+        )
+        plan = " ".join(row[3] for row in await cursor.fetchall())
+    assert "idx_tickets_status_created" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.asyncio
+async def test_failed_migration_rolls_back(tmp_path, monkeypatch):
+    from it_agent.db import migrations
+
+    broken = Migration(LATEST_VERSION + 1, "broken", "CREATE TABLE x (a); SELECT * FROM nope;")
+    monkeypatch.setattr(migrations, "MIGRATIONS", [*migrations.MIGRATIONS, broken])
+    monkeypatch.setattr(migrations, "LATEST_VERSION", broken.version)
+
+    async with aiosqlite.connect(tmp_path / "t.db") as db:
+        with pytest.raises(aiosqlite.OperationalError):
+            await migrate(db)
+        assert await schema_version(db) == LATEST_VERSION
+        cursor = await db.execute("SELECT name FROM sqlite_master WHERE name = 'x'")
+        assert await cursor.fetchone() is None
+
+
+@pytest.mark.asyncio
+async def test_newer_schema_is_rejected(tmp_path):
+    async with aiosqlite.connect(tmp_path / "t.db") as db:
+        await db.execute(f"PRAGMA user_version = {LATEST_VERSION + 1}")
+        with pytest.raises(RuntimeError):
+            await migrate(db)
+
+
+@pytest.mark.asyncio
+async def test_summary_tables_are_backfilled(tmp_path):
+    path = tmp_path / "t.db"
+    async with aiosqlite.connect(path) as db:
+        await migrate(db, target=3)
+        await db.executemany(
+            """INSERT INTO tickets (title, status, priority, created_at, updated_at, resolved_at)
+               VALUES ('t', ?, 'high', '2025-01-01T00:00:00', 'x', ?)""",
+            [("open", None), ("open", None), ("resolved", "2025-01-01T12:00:00")],
+        )
+        await db.commit()
+
+    await init_db(path)
+    async with aiosqlite.connect(path) as db:
+        cursor = await db.execute("SELECT status, count FROM ticket_counts ORDER BY status")
+        assert [tuple(r) for r in await cursor.fetchall()] == [("open", 2), ("resolved", 1)]
+        cursor = await db.execute("SELECT resolved, total_seconds FROM ticket_resolution_stats")
+        assert tuple(await cursor.fetchone()) == (1, pytest.approx(43200))
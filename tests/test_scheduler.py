@@ -0,0 +1,140 @@
+"""Tests for the Anthropic request scheduler."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import anthropic
+import httpx
+import pytest
+
+from it_agent.agent.scheduler import (
+    PRIORITY_CRITICAL,
+    PRIORITY_NORMAL,
+    RequestScheduler,
+    TokenBucket,
+)
+
+
+def _status_error(cls, status: int, headers: dict | None = None):
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return cls("error", response=response, body=None)
+
+
+def _scheduler(**kwargs) -> RequestScheduler:
+    limits = {
+        "requests_per_minute": 6000,
+        "input_tokens_per_minute": 1_000_000,
+        "output_tokens_per_minute": 1_000_000,
+        "base_delay": 0.001,
+    }
+    limits.update(kwargs)
+    return RequestScheduler(**limits)
+
+
+def test_token_bucket_delay():
+    bucket = TokenBucket(per_minute=60)  # one unit per second
+    assert bucket.delay_for(60) == 0
+    bucket.consume(60)
+    assert 0.9 < bucket.delay_for(1) <= 1.0
+    # Requests larger than the bucket wait for a full bucket, not forever
+    assert bucket.delay_for(1000) <= 60
+
+
+@pytest.mark.asyncio
+async def test_requests_are_rate_limited():
+    scheduler = _scheduler(requests_per_minute=600)  # 10/s, burst of 600
+    scheduler.requests.level = 1
+
+    async def call():
+        return "ok"
+
+    start = time.monotonic()
+    await asyncio.gather(*(scheduler.submit(call, input_tokens=0) for _ in range(3)))
+    # One immediate, then two more at 10/s
+    assert time.monotonic() - start >= 0.18
+
+
+@pytest.mark.asyncio
+async def test_priority_order():
+    scheduler = _scheduler(requests_per_minute=600)
+    scheduler.requests.level = 0
+    order = []
+
+    def make(label):
+        async def call():
+            order.append(label)
+
+        return call
+
+    tasks = [
+        asyncio.ensure_future(scheduler.submit(make("normal-1"), 0, PRIORITY_NORMAL)),
+        asyncio.ensure_future(scheduler.submit(make("normal-2"), 0, PRIORITY_NORMAL)),
+        asyncio.ensure_future(scheduler.submit(make("critical"), 0, PRIORITY_CRITICAL)),
+    ]
+    await asyncio.gather(*tasks)
+    # normal-1 already held the gate; the critical call jumps ahead of normal-2
+    assert order == ["normal-1", "critical", "normal-2"]
+
+
+@pytest.mark.asyncio
+async def test_retries_rate_limit_with_retry_after():
+    scheduler = _scheduler()
+    attempts = []
+
+    async def call():
+        attempts.append(time.monotonic())
+        if len(attempts) < 3:
+            raise _status_error(anthropic.RateLimitError, 429, {"retry-after": "0.05"})
+        return "ok"
+
+    assert await scheduler.submit(call, input_tokens=10) == "ok"
+    assert len(attempts) == 3
+    assert attempts[1] - attempts[0] >= 0.05
+    stats = scheduler.stats()
+    assert stats["retries"] == 2
+    assert stats["rate_limited"] == 2
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_errors_raise():
+    scheduler = _scheduler()
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        raise _status_error(anthropic.BadRequestError, 400)
+
+    with pytest.raises(anthropic.BadRequestError):
+        await scheduler.submit(call, input_tokens=10)
+    assert len(attempts) == 1
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries():
+    scheduler = _scheduler(max_retries=2)
+
+    async def call():
+        raise _status_error(anthropic.InternalServerError, 529)
+
+    with pytest.raises(anthropic.InternalServerError):
+        await scheduler.submit(call, input_tokens=10)
+    assert scheduler.stats()["retries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_usage_corrects_token_buckets():
+    scheduler = _scheduler(input_tokens_per_minute=10_000, output_tokens_per_minute=10_000)
+
+    class Result:
+        class usage:  # noqa: N801 - mimics the SDK attribute
+            input_tokens = 500
+            cache_creation_input_tokens = 0
+            output_tokens = 2000
+
+    await scheduler.submit(lambda: asyncio.sleep(0, Result()), input_tokens=100)
+    assert scheduler.input_tokens.level == pytest.approx(9500, abs=5)
+    assert scheduler.output_tokens.level == pytest.approx(8000, abs=5)
+    assert scheduler.stats()["completed"] == 1
@@ -0,0 +1,62 @@
+"""Tests for model serialization."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict
+from datetime import date
+
+import pytest
+
+from it_agent import serialization
+from it_agent.db.models import Ticket, TicketComment, TicketPriority, TicketStatus
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson not installed")
+    return request.param
+
+
+def test_to_dict_matches_asdict_with_plain_values():
+    ticket = Ticket(id=1, title="VPN", status=TicketStatus.OPEN, priority=TicketPriority.HIGH)
+    data = ticket.to_dict()
+    assert data == asdict(ticket)
+    assert type(data["status"]) is str
+    assert type(data["priority"]) is str
+
+    comment = TicketComment(id=2, ticket_id=1, content="hi")
+    assert comment.to_dict() == asdict(comment)
+
+
+def test_from_row_uses_field_order():
+    row = (7, "t", "d", "open", "low", "hw", "U1", "U2", "c", "u", None)
+    ticket = Ticket.from_row(row)
+    assert ticket.id == 7
+    assert ticket.assignee_id == "U2"
+    assert ticket.resolved_at is None
+
+
+def test_dumps_is_compact_and_round_trips(backend):
+    value = {
+        "tickets": [Ticket(id=1, title="Café").to_dict()],
+        "status": TicketStatus.RESOLVED,
+        "when": date(2025, 1, 2),
+        "count": 1,
+    }
+    text = serialization.dumps(value)
+    assert ", " not in text
+    assert "Café" in text
+    decoded = serialization.loads(text)
+    assert decoded["status"] == "resolved"
+    assert decoded["when"] == "2025-01-02"
+    assert decoded["tickets"][0]["title"] == "Café"
+    assert decoded == json.loads(text)
+
+
+def test_dumps_handles_models_and_big_ints(backend):
+    assert serialization.loads(serialization.dumps({"t": Ticket(id=3)}))["t"]["id"] == 3
+    assert serialization.loads(serialization.dumps({"n": 2**70}))["n"] == 2**70
@@ -0,0 +1,73 @@
+"""Tests for progressive Slack replies."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from it_agent.bot.streaming import PLACEHOLDER_TEXT, StreamingReply
+
+
+class FakeSlackClient:
+    def __init__(self):
+        self.posts: list[dict] = []
+        self.updates: list[dict] = []
+
+    async def chat_postMessage(self, **kwargs):  # noqa: N802 - mirrors the Slack SDK
+        self.posts.append(kwargs)
+        return {"ts": f"100.{len(self.posts)}"}
+
+    async def chat_update(self, **kwargs):
+        self.updates.append(kwargs)
+        return {"ok": True}
+
+
+@pytest.mark.asyncio
+async def test_posts_placeholder_then_final():
+    client = FakeSlackClient()
+    reply = StreamingReply(client, "C1", "1.0", min_interval=0)
+    await reply.start()
+    assert client.posts[0]["text"] == PLACEHOLDER_TEXT
+
+    await reply.finish("All done")
+    assert client.updates[-1]["ts"] == "100.1"
+    assert client.updates[-1]["blocks"][0]["text"]["text"] == "All done"
+
+
+@pytest.mark.asyncio
+async def test_updates_are_rate_limited():
+    client = FakeSlackClient()
+    reply = StreamingReply(client, "C1", "1.0", min_interval=0.05)
+    await reply.start()
+    for word in ("one ", "two ", "three "):
+        await reply.on_text(word)
+    # All deltas arrived within the interval: no update yet, one pending
+    assert client.updates == []
+
+    await asyncio.sleep(0.1)
+    assert len(client.updates) == 1
+    assert client.updates[0]["text"] == "one two three"
+
+
+@pytest.mark.asyncio
+async def test_tool_progress_shown_as_context():
+    client = FakeSlackClient()
+    reply = StreamingReply(client, "C1", "1.0", min_interval=0)
+    await reply.start()
+    await reply.on_tool("ping_host", {"host": "vpn.corp"})
+    blocks = client.updates[-1]["blocks"]
+    assert blocks[-1]["type"] == "context"
+    assert "ping_host" in blocks[-1]["elements"][0]["text"]
+
+
+@pytest.mark.asyncio
+async def test_long_final_response_respects_block_limits():
+    client = FakeSlackClient()
+    reply = StreamingReply(client, "C1", "1.0", min_interval=0)
+    await reply.start()
+    await reply.finish("word " * 40_000)  # 200k chars -> more than 50 blocks
+    final_blocks = client.updates[-1]["blocks"]
+    assert len(final_blocks) == 50
+    assert all(len(b["text"]["text"]) <= 3000 for b in final_blocks)
+    assert len(client.posts) == 2  # placeholder + overflow message
@@ -0,0 +1,103 @@
+"""Tests for the read-through ticket cache."""
+
+from __future__ import annotations
+
+import pytest
+
+from it_agent.db import queries
+from it_agent.db.cache import MISSING, RowCache
+from it_agent.db.database import init_db
+from it_agent.db.models import Ticket, TicketComment
+
+
+@pytest.fixture
+async def db_path(tmp_path):
+    path = tmp_path / "cache.db"
+    await init_db(path)
+    queries.configure_ticket_cache(enabled=True)
+    yield path
+    queries.configure_ticket_cache(enabled=True)
+
+
+@pytest.mark.asyncio
+async def test_repeated_reads_hit_the_cache(db_path):
+    created = await queries.create_ticket(db_path, Ticket(title="Laptop"))
+    await queries.add_comment(db_path, TicketComment(ticket_id=created.id, content="hi"))
+
+    for _ in range(3):
+        ticket, comments = await queries.get_ticket_with_comments(db_path, created.id)
+        assert ticket.title == "Laptop"
+        assert len(comments) == 1
+    await queries.get_ticket(db_path, created.id)
+    await queries.get_comments(db_path, created.id)
+
+    stats = queries.ticket_cache_stats()
+    assert stats["hits"] == 6
+    assert stats["hit_rate"] > 0.5
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate(db_path):
+    created = await queries.create_ticket(db_path, Ticket(title="Laptop"))
+    await queries.get_ticket_with_comments(db_path, created.id)
+
+    await queries.update_ticket(db_path, created.id, status="in_progress")
+    assert (await queries.get_ticket(db_path, created.id)).status == "in_progress"
+
+    await queries.add_comment(db_path, TicketComment(ticket_id=created.id, content="on it"))
+    _, comments = await queries.get_ticket_with_comments(db_path, created.id)
+    assert [c.content for c in comments] == ["on it"]
+
+
+@pytest.mark.asyncio
+async def test_missing_ticket_is_not_cached(db_path):
+    assert await queries.get_ticket(db_path, 1) is None
+    assert await queries.get_ticket_with_comments(db_path, 1) is None
+    assert queries.ticket_cache_stats()["entries"] == 0
+    await queries.create_ticket(db_path, Ticket(title="New"))
+    assert (await queries.get_ticket(db_path, 1)).title == "New"
+
+
+@pytest.mark.asyncio
+async def test_returned_values_are_copies(db_path):
+    created = await queries.create_ticket(db_path, Ticket(title="Original"))
+    (await queries.get_ticket(db_path, created.id)).title = "Changed"
+    assert (await queries.get_ticket(db_path, created.id)).title == "Original"
+
+
+@pytest.mark.asyncio
+async def test_cache_can_be_disabled(db_path):
+    queries.configure_ticket_cache(enabled=False)
+    created = await queries.create_ticket(db_path, Ticket(title="Laptop"))
+    await queries.get_ticket(db_path, created.id)
+    await queries.get_ticket(db_path, created.id)
+    assert queries.ticket_cache_stats()["hits"] == 0
+    assert queries.ticket_cache_stats()["entries"] == 0
+
+
+def test_fill_after_invalidation_is_dropped():
+    cache = RowCache()
+    generation = cache.generation("k")
+    # A write lands while the read that started before it is still running
+    cache.invalidate("k")
+    cache.fill("k", "stale", generation)
+    assert cache.get("k") is MISSING
+
+    cache.fill("k", "fresh", cache.generation("k"))
+    assert cache.get("k") == "fresh"
+
+
+def test_lru_bound_and_generation_pruning():
+    cache = RowCache(maxsize=2)
+    for key in "abc":
+        cache.fill(key, key, cache.generation(key))
+    assert cache.get("a") is MISSING
+    assert cache.get("c") == "c"
+
+    pending = cache.generation("x")
+    cache.invalidate("x")
+    for i in range(20):
+        cache.invalidate(i)
+    assert len(cache._generations) <= 8
+    cache.fill("x", "stale", pending)
+    assert cache.get("x") is MISSING
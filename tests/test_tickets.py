@@ -4,17 +4,23 @@ from __future__ import annotations
 
 import pytest
 
-from it_agent.db import queries
-from it_agent.db.database import init_db
+from it_agent.db import database, queries
+from it_agent.db.database import close_pool, init_db, open_pool, start_batcher, stop_batcher
 from it_agent.db.models import Ticket, TicketComment, TicketPriority, TicketStatus
 
 
-@pytest.fixture
-async def db_path(tmp_path):
-    """Create a temporary database for testing."""
+@pytest.fixture(params=["direct", "pooled", "batched"])
+async def db_path(request, tmp_path):
+    """Create a temporary database for testing, with and without a pool and batcher."""
     path = tmp_path / "test_tickets.db"
     await init_db(path)
-    return path
+    if request.param != "direct":
+        await open_pool(path, readers=2)
+    if request.param == "batched":
+        start_batcher(path, max_latency=0.001)
+    yield path
+    await stop_batcher(path)
+    await close_pool(path)
 
 
 @pytest.mark.asyncio
@@ -104,3 +110,170 @@ async def test_add_and_get_comments(db_path):
     comments = await queries.get_comments(db_path, created.id)
     assert len(comments) == 1
     assert comments[0].content == "Working on it"
+
+
+@pytest.mark.asyncio
+async def test_update_ticket_with_comment(db_path):
+    created = await queries.create_ticket(db_path, Ticket(title="Printer", description="d"))
+    comment = TicketComment(author_id="U1", content="Replaced toner")
+
+    updated = await queries.update_ticket(
+        db_path, created.id, comment=comment, status=TicketStatus.RESOLVED
+    )
+    assert updated.status == "resolved"
+    assert comment.id is not None
+
+    ticket, comments = await queries.get_ticket_with_comments(db_path, created.id)
+    assert ticket.status == "resolved"
+    assert [c.content for c in comments] == ["Replaced toner"]
+
+
+@pytest.mark.asyncio
+async def test_update_missing_ticket_adds_no_comment(db_path):
+    comment = TicketComment(author_id="U1", content="orphan")
+    assert await queries.update_ticket(db_path, 42, comment=comment, status="closed") is None
+    assert await queries.get_comments(db_path, 42) == []
+
+
+@pytest.mark.asyncio
+async def test_get_ticket_with_comments(db_path):
+    created = await queries.create_ticket(db_path, Ticket(title="No comments"))
+    ticket, comments = await queries.get_ticket_with_comments(db_path, created.id)
+    assert ticket.title == "No comments"
+    assert comments == []
+
+    for text in ("first", "second"):
+        await queries.add_comment(db_path, TicketComment(ticket_id=created.id, content=text))
+    ticket, comments = await queries.get_ticket_with_comments(db_path, created.id)
+    assert ticket.id == created.id
+    assert [c.content for c in comments] == ["first", "second"]
+    assert all(c.ticket_id == created.id for c in comments)
+
+    assert await queries.get_ticket_with_comments(db_path, 9999) is None
+
+
+@pytest.mark.asyncio
+async def test_list_tickets_keyset_pagination(db_path):
+    # Identical timestamps: the id tiebreak must still give a stable order
+    for i in range(7):
+        await queries.create_ticket(
+            db_path, Ticket(title=f"T{i}", created_at="2025-01-01T00:00:00+00:00")
+        )
+
+    seen = []
+    cursor = None
+    while True:
+        page = await queries.list_tickets(db_path, limit=3, cursor=cursor)
+        seen.extend(t.title for t in page)
+        if len(page) < 3:
+            break
+        cursor = queries.encode_cursor(page[-1])
+    assert seen == [f"T{i}" for i in reversed(range(7))]
+
+
+@pytest.mark.asyncio
+async def test_list_tickets_rejects_bad_cursor(db_path):
+    with pytest.raises(ValueError):
+        await queries.list_tickets(db_path, cursor="not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_iter_tickets_streams_all_matches(db_path):
+    for i in range(12):
+        status = "open" if i % 3 else "closed"
+        await queries.create_ticket(db_path, Ticket(title=f"T{i}", status=status))
+
+    titles = [t.title async for t in queries.iter_tickets(db_path, status="open", batch_size=5)]
+    assert len(titles) == 8
+    assert titles[0] == "T11"
+
+
+@pytest.mark.asyncio
+async def test_search_tickets(db_path):
+    vpn = await queries.create_ticket(
+        db_path, Ticket(title="VPN keeps disconnecting", description="Drops every hour")
+    )
+    printer = await queries.create_ticket(
+        db_path, Ticket(title="Printer jam", description="Paper stuck on floor 3")
+    )
+    await queries.add_comment(
+        db_path, TicketComment(ticket_id=printer.id, content="Also the VPN client crashed")
+    )
+
+    hits = await queries.search_tickets(db_path, "vpn")
+    assert [h.id for h in hits] == [vpn.id, printer.id]
+    assert "*VPN*" in hits[0].snippet
+
+    # Stemming, and matches inside comments
+    hits = await queries.search_tickets(db_path, "crashing")
+    assert [h.id for h in hits] == [printer.id]
+
+    # Updates are reflected through the triggers
+    await queries.update_ticket(db_path, vpn.id, status="resolved")
+    assert await queries.search_tickets(db_path, "vpn", status="open") == [
+        h for h in await queries.search_tickets(db_path, "vpn") if h.id == printer.id
+    ]
+
+
+@pytest.mark.asyncio
+async def test_search_tickets_handles_odd_input(db_path):
+    await queries.create_ticket(db_path, Ticket(title="Outlook won't start"))
+    assert await queries.search_tickets(db_path, "???") == []
+    # FTS syntax in user text is treated literally
+    hits = await queries.search_tickets(db_path, 'outlook AND "NEAR(')
+    assert len(hits) == 1
+    # No ticket has both words, so any-word matching kicks in
+    hits = await queries.search_tickets(db_path, "outlook keyboard")
+    assert len(hits) == 1
+
+
+@pytest.mark.asyncio
+async def test_ticket_counts_follow_writes(db_path):
+    for priority, category in [("critical", "network"), ("critical", "network"), ("low", "")]:
+        await queries.create_ticket(
+            db_path, Ticket(title="t", priority=priority, category=category)
+        )
+
+    counts = await queries.ticket_counts(db_path, status="open", priority="critical")
+    assert counts["total"] == 2
+
+    await queries.update_ticket(db_path, 1, status=TicketStatus.RESOLVED)
+    counts = await queries.ticket_counts(db_path, group_by=["status"])
+    assert counts["total"] == 3
+    assert {g["status"]: g["count"] for g in counts["groups"]} == {"open": 2, "resolved": 1}
+
+    counts = await queries.ticket_counts(db_path, status="open", category="network")
+    assert counts["total"] == 1
+
+
+@pytest.mark.asyncio
+async def test_resolution_stats(db_path):
+    for _ in range(2):
+        await queries.create_ticket(
+            db_path,
+            Ticket(title="t", priority="high", created_at="2025-03-01T00:00:00+00:00"),
+        )
+    async with database.get_db(db_path) as db:
+        for ticket_id, hours in ((1, 2), (2, 4)):
+            await db.execute(
+                "UPDATE tickets SET status = 'resolved', resolved_at = ? WHERE id = ?",
+                (f"2025-03-01T{hours:02d}:00:00+00:00", ticket_id),
+            )
+        await db.commit()
+
+    stats = await queries.resolution_stats(db_path, since="2025-03-01", until="2025-03-01")
+    assert stats["resolved"] == 2
+    assert stats["mean_hours_to_resolve"] == pytest.approx(3.0)
+
+    # Re-resolving replaces the ticket's earlier contribution instead of adding to it
+    async with database.get_db(db_path) as db:
+        await db.execute(
+            "UPDATE tickets SET resolved_at = '2025-03-01T06:00:00+00:00' WHERE id = 1"
+        )
+        await db.commit()
+    stats = await queries.resolution_stats(db_path, group_by=["priority"])
+    assert stats["resolved"] == 2
+    assert stats["mean_hours_to_resolve"] == pytest.approx(5.0)
+    assert stats["groups"][0]["priority"] == "high"
+
+    assert (await queries.resolution_stats(db_path, since="2025-04-01"))["resolved"] == 0
@@ -16,6 +16,8 @@ def test_all_tools_present():
         "get_ticket",
         "update_ticket",
         "list_tickets",
+        "search_tickets",
+        "ticket_stats",
         "search_knowledge_base",
     }
     assert names == expected